@@ -0,0 +1,534 @@
+"""Performance benchmarks: python benchmarks/run.py [--save] [NAME ...]
+
+Times the hot paths of loading, sampling, simulating and browsing a model
+and compares them with the baselines in baselines.json. A benchmark fails
+when it takes more than --threshold times its baseline, the exit status is
+1 then. --save records the current timings as the new baselines.
+
+Baselines only mean something on the machine that recorded them, so
+baselines.json is not committed: run once with --save before a change and
+compare after it, save them again after moving to another machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np  # noqa: E402
+
+RESOURCES = ROOT / "tests" / "resources"
+BASELINES = Path(__file__).resolve().parent / "baselines.json"
+# Slower than the baseline by more than this factor fails
+THRESHOLD = 1.5
+# Shortest timed round in seconds
+MIN_ROUND = 0.2
+
+
+@dataclass
+class Benchmark:
+    name: str
+    # Prepares the inputs and returns the timed call
+    setup: Callable[[Path], Callable[[], Any]]
+    repeat: int = 5
+    # Units one call processes, timings are reported per unit
+    per: int = 1
+    unit: str = "call"
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, repeat: int = 5, per: int = 1, unit: str = "call"):
+    def register(setup: Callable[[Path], Callable[[], Any]]):
+        BENCHMARKS.append(Benchmark(name, setup, repeat, per, unit))
+        return setup
+
+    return register
+
+
+# ────────────────────────────────────────────────────────────── Loading ──
+
+
+def synthetic_fmu(path: Path, n_variables: int) -> Path:
+    """An FMU with only a modelDescription.xml of n_variables variables.
+
+    Names are nested four levels deep like those of large Modelica models,
+    40% are parameters, 10% inputs and the rest outputs.
+    """
+    variables, outputs = [], []
+    for i in range(n_variables):
+        name = f"sys{i % 7}.sub{i % 97}.block{i // 50}.x{i}"
+        kind = i % 10
+        if kind < 4:
+            attrs = 'causality="parameter" variability="tunable"'
+            element = f'<Real start="{i * 0.5}" unit="m"/>'
+        elif kind == 4:
+            attrs = 'causality="input"'
+            element = '<Real start="0.0"/>'
+        else:
+            attrs = 'causality="output"'
+            element = "<Real/>"
+            outputs.append(f'<Unknown index="{i + 1}"/>')
+        variables.append(
+            f'<ScalarVariable name="{name}" valueReference="{i}" {attrs} '
+            f'description="Variable {i}">{element}</ScalarVariable>'
+        )
+
+    xml = f"""<?xml version="1.0" encoding="UTF-8"?>
+<fmiModelDescription fmiVersion="2.0" modelName="Synthetic{n_variables}"
+  guid="{{00000000-0000-0000-0000-{n_variables:012d}}}" numberOfEventIndicators="0">
+<CoSimulation modelIdentifier="Synthetic"/>
+<UnitDefinitions><Unit name="m"><BaseUnit m="1"/></Unit></UnitDefinitions>
+<DefaultExperiment startTime="0.0" stopTime="1.0" stepSize="0.01"/>
+<ModelVariables>
+{chr(10).join(variables)}
+</ModelVariables>
+<ModelStructure><Outputs>{"".join(outputs)}</Outputs></ModelStructure>
+</fmiModelDescription>
+"""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("modelDescription.xml", xml)
+    return path
+
+
+def _fresh_cache(tmp: Path) -> None:
+    os.environ["FMU_INSIGHT_CACHE"] = tempfile.mkdtemp(dir=tmp)
+
+
+def _load(path: Path, cold: bool, tmp: Path) -> Callable[[], Any]:
+    from app.state import AppState
+
+    _fresh_cache(tmp)
+    AppState().load_fmu(path)  # fills the model cache for the warm runs
+
+    def run():
+        if cold:
+            _fresh_cache(tmp)
+        AppState().load_fmu(path)
+
+    return run
+
+
+@benchmark("load_fmu[BouncingBall,cold]")
+def _(tmp):
+    return _load(RESOURCES / "BouncingBall.fmu", True, tmp)
+
+
+@benchmark("load_fmu[BouncingBall,cached]")
+def _(tmp):
+    return _load(RESOURCES / "BouncingBall.fmu", False, tmp)
+
+
+@benchmark("load_fmu[10k,cold]")
+def _(tmp):
+    return _load(synthetic_fmu(tmp / "s10k.fmu", 10_000), True, tmp)
+
+
+@benchmark("load_fmu[10k,cached]")
+def _(tmp):
+    return _load(synthetic_fmu(tmp / "s10k.fmu", 10_000), False, tmp)
+
+
+@benchmark("load_fmu[100k,cold]", repeat=3)
+def _(tmp):
+    return _load(synthetic_fmu(tmp / "s100k.fmu", 100_000), True, tmp)
+
+
+@benchmark("load_fmu[100k,cached]")
+def _(tmp):
+    return _load(synthetic_fmu(tmp / "s100k.fmu", 100_000), False, tmp)
+
+
+# ────────────────────────────────────────────────────────────── Sampling ──
+
+
+def _ranges(n: int):
+    from app.study.doe import ParameterRange
+
+    return [
+        ParameterRange(f"p{i}", 0.0, 1.0 + i, "Normal" if i % 2 else "Uniform")
+        for i in range(n)
+    ]
+
+
+@benchmark("doe[monte_carlo,1M x 8]", per=1_000_000, unit="sample")
+def _(tmp):
+    from app.study.doe import MonteCarloDesign
+
+    design = MonteCarloDesign(_ranges(8), n_samples=1_000_000, seed=1)
+    return lambda: sum(len(points) for _, points in design.chunks())
+
+
+@benchmark("doe[latin_hypercube,1M x 8]", per=1_000_000, unit="sample")
+def _(tmp):
+    from app.study.doe import LatinHypercubeDesign
+
+    design = LatinHypercubeDesign(_ranges(8), n_samples=1_000_000, seed=1)
+    return lambda: sum(len(points) for _, points in design.chunks())
+
+
+@benchmark("doe[full_factorial,10^6]", per=1_000_000, unit="sample")
+def _(tmp):
+    from app.study.doe import FullFactorialDesign
+
+    design = FullFactorialDesign(_ranges(6), levels=10)
+    return lambda: sum(len(points) for _, points in design.chunks())
+
+
+@benchmark("doe[start_values]", per=10_000, unit="sample")
+def _(tmp):
+    from app.study.doe import LatinHypercubeDesign
+
+    design = LatinHypercubeDesign(_ranges(8), n_samples=1_000_000, seed=1)
+    # In order, as a worker asks for them
+    indices = range(500_000, 510_000)
+    return lambda: [design.start_values(i) for i in indices]
+
+
+# ──────────────────────────────────────────────────────────── Simulation ──
+
+
+def simulation_fmu(tmp: Path) -> Path:
+    """BouncingBall.fmu with a binary for this platform, see tests/conftest.py."""
+    from fmpy import platform as fmi_platform
+    from fmpy import supported_platforms
+    from fmpy.util import compile_platform_binary
+
+    src = RESOURCES / "BouncingBall.fmu"
+    if fmi_platform in supported_platforms(str(src)):
+        return src
+    dst = tmp / src.name
+    shutil.copy(src, dst)
+    compile_platform_binary(str(dst))
+    return dst
+
+
+@benchmark("simulate[BouncingBall,1 worker]", repeat=3, per=200, unit="sample")
+def _(tmp):
+    from app.study.doe import LatinHypercubeDesign, ParameterRange
+    from app.study.runner import StudyRunner
+
+    fmu = simulation_fmu(tmp)
+    _fresh_cache(tmp)
+    design = LatinHypercubeDesign(
+        [ParameterRange("h0", 1.0, 6.0), ParameterRange("e", 0.5, 0.9)],
+        n_samples=200,
+        seed=0,
+    )
+    runner = StudyRunner(fmu, design, n_workers=1, outputs=["h", "v"])
+    # Throughput of one core, without starting the worker process
+    return lambda: _busy_time(runner)
+
+
+def _busy_time(runner) -> float:
+    runner.run()
+    assert runner.telemetry is not None
+    return sum(runner.telemetry.busy.values())
+
+
+class _NullFmu:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def _start_value_setup(tmp: Path):
+    from app.model_cache import load_model_description
+    from app.study.doe import LatinHypercubeDesign, ParameterRange
+
+    model_description = load_model_description(synthetic_fmu(tmp / "s10k.fmu", 10_000))
+    names = [v.name for v in model_description.modelVariables][::10]
+    # 8 varied and 40 fixed parameters, as a typical study on a large model
+    ranges = [ParameterRange(n, 0.0, 1.0) for n in names[:8]]
+    fixed = {n: 1.0 for n in names[8:48]}
+    design = LatinHypercubeDesign(ranges, n_samples=1_000, seed=0, fixed=fixed)
+    return model_description, design
+
+
+@benchmark("start_values[fmpy,10k vars]", per=1_000, unit="sample")
+def _(tmp):
+    from fmpy.simulation import (
+        apply_start_values,
+        settable_in_initialization_mode,
+        settable_in_instantiated,
+    )
+
+    model_description, design = _start_value_setup(tmp)
+    fmu = _NullFmu()
+
+    def run():
+        for i in range(len(design)):
+            # What simulate_fmu does with a dict of start values
+            rest = apply_start_values(
+                fmu, model_description, design.start_values(i), settable_in_instantiated
+            )
+            apply_start_values(
+                fmu, model_description, rest, settable_in_initialization_mode
+            )
+
+    return run
+
+
+@benchmark("start_values[batched,10k vars]", per=1_000, unit="sample")
+def _(tmp):
+    from app.study.applicator import SampleApplicator
+
+    model_description, design = _start_value_setup(tmp)
+    applicator = SampleApplicator(design, model_description)
+    fmu = _NullFmu()
+
+    def run():
+        for i in range(len(design)):
+            applicator.initialize(fmu, i, 0.0, 1.0)
+
+    return run
+
+
+# ─────────────────────────────────────────────────────────────── Metrics ──
+
+
+def _metric_plan(signals: List[str]):
+    from app.schemas.metrics_spec import STATISTICS
+    from app.study.metrics import MetricPlan
+
+    return MetricPlan(
+        signals=tuple(s for s in signals for _ in STATISTICS),
+        statistics=STATISTICS * len(signals),
+        lower=(None,) * len(STATISTICS) * len(signals),
+        upper=(None,) * len(STATISTICS) * len(signals),
+    )
+
+
+@benchmark("metrics[evaluate,2k x 2k x 4]", per=2_000, unit="sample")
+def _(tmp):
+    from app.study.metrics import evaluate
+
+    rng = np.random.default_rng(0)
+    time_ = np.linspace(0.0, 10.0, 2_000)
+    signals = ["a", "b", "c", "d"]
+    data = {s: rng.normal(size=(2_000, 2_000)) for s in signals}
+    plan = _metric_plan(signals)
+    return lambda: evaluate(plan, time_, data)
+
+
+@benchmark("metrics[online,10k points x 4]", per=10_000, unit="point")
+def _(tmp):
+    from app.study.metrics import OnlineMetrics
+
+    rng = np.random.default_rng(0)
+    plan = _metric_plan(["a", "b", "c", "d"])
+    # One value per metric, as the worker passes them
+    cols = [ord(s) - ord("a") for s in plan.signals]
+    rows = rng.normal(size=(10_000, 4))[:, cols].tolist()
+    online = OnlineMetrics(plan)
+
+    def run():
+        online.reset()
+        for k, row in enumerate(rows):
+            online.update(k * 1e-3, row)
+        return online.values()
+
+    return run
+
+
+# ───────────────────────────────────────────────────────────── Analytics ──
+
+
+def _signal_store(tmp: Path, n_samples: int, n_points: int):
+    from app.study.results import ResultStore
+
+    rng = np.random.default_rng(0)
+    store = ResultStore.create(
+        tmp / "store", ["x"], n_samples, np.linspace(0.0, 1.0, n_points)
+    )
+    column = store.column("x")
+    for start in range(0, n_samples, 256):
+        column[start : start + 256] = rng.normal(size=column[start : start + 256].shape)
+    store.status[:] = 1
+    store.flush()
+    return store
+
+
+@benchmark("analytics[bands,2k x 10k]", repeat=3, per=2_000, unit="sample")
+def _(tmp):
+    from app.study.analytics import quantile_bands
+
+    store = _signal_store(tmp, 2_000, 10_000)
+    return lambda: quantile_bands(store, "x")
+
+
+@benchmark("analytics[sensitivity,1M x 8 x 4]", repeat=3, per=1_000_000, unit="sample")
+def _(tmp):
+    from app.study.analytics import sensitivity
+    from app.study.doe import LatinHypercubeDesign
+    from app.study.results import ResultStore
+
+    design = LatinHypercubeDesign(_ranges(8), n_samples=1_000_000, seed=0)
+    store = ResultStore.create(
+        tmp / "store", [], len(design), np.zeros(1), metrics=list("abcd")
+    )
+    x = design.points()
+    store.metric_values[:] = x[:, :4] + x[:, 4:] ** 2
+    store.status[:] = 1
+    return lambda: sensitivity(design, store)
+
+
+# ────────────────────────────────────────────────────────────────── GUI ──
+
+
+def _explorer(path: Path):
+    from PySide6 import QtWidgets
+
+    from app.components.model_explorer import ModelExplorer
+    from app.state import AppState
+
+    QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    state = AppState()
+    state.load_fmu(path)
+    return ModelExplorer(state)
+
+
+@benchmark("rebuild_tree[100k]")
+def _(tmp):
+    explorer = _explorer(synthetic_fmu(tmp / "s100k.fmu", 100_000))
+    return explorer.rebuild_tree
+
+
+@benchmark("filter_tree[100k]")
+def _(tmp):
+    from PySide6 import QtWidgets
+
+    explorer = _explorer(synthetic_fmu(tmp / "s100k.fmu", 100_000))
+    explorer.rebuild_tree()
+    queries = iter(f"block{k}" for k in range(1, 1_000))
+
+    def run():
+        # Until the matches are shown, the search itself runs on a thread
+        explorer.result_label.hide()
+        explorer._filter_tree(next(queries))
+        while explorer.result_label.isHidden():
+            QtWidgets.QApplication.processEvents()
+
+    return run
+
+
+# ─────────────────────────────────────────────────────────────── Runner ──
+
+
+def measure(bench: Benchmark, tmp: Path) -> float:
+    """Best time of bench in seconds per unit.
+
+    Short calls are repeated until a round takes MIN_ROUND seconds, so timer
+    resolution and scheduling noise do not dominate. A call may return its
+    own busy time in seconds, which then replaces the wall time around it.
+    """
+    call = bench.setup(tmp)
+    start = time.perf_counter()
+    call()  # warm up: imports, caches, lazy initialization
+    number = max(1, int(MIN_ROUND / max(time.perf_counter() - start, 1e-9)))
+
+    times = []
+    for _ in range(bench.repeat):
+        busy = 0.0
+        start = time.perf_counter()
+        for _ in range(number):
+            result = call()
+            if isinstance(result, float):
+                busy += result
+        elapsed = time.perf_counter() - start
+        times.append((busy or elapsed) / number)
+    return min(times) / bench.per
+
+
+def machine() -> Dict[str, Any]:
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _format(seconds: float) -> str:
+    for scale, suffix in ((1.0, "s"), (1e-3, "ms"), (1e-6, "µs")):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {suffix} "
+    return f"{seconds / 1e-9:8.2f} ns "
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="run only benchmarks containing these")
+    parser.add_argument("--save", action="store_true", help="store as new baselines")
+    parser.add_argument("--baselines", type=Path, default=BASELINES)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help=f"allowed slowdown against the baseline, default {THRESHOLD}",
+    )
+    parser.add_argument("--list", action="store_true", help="list the benchmarks")
+    args = parser.parse_args(argv)
+
+    selected = [
+        b for b in BENCHMARKS if not args.names or any(n in b.name for n in args.names)
+    ]
+    if args.list:
+        print("\n".join(b.name for b in selected))
+        return 0
+
+    saved = json.loads(args.baselines.read_text()) if args.baselines.exists() else {}
+    baselines: Dict[str, float] = saved.get("benchmarks", {})
+    if saved and saved.get("machine") != machine() and not args.save:
+        print("warning: baselines recorded on another machine", file=sys.stderr)
+
+    results: Dict[str, float] = {}
+    failed = []
+    for bench in selected:
+        with tempfile.TemporaryDirectory(prefix="fmu_insight_bench_") as tmp:
+            seconds = measure(bench, Path(tmp))
+        results[bench.name] = seconds
+
+        line = f"{bench.name:34} {_format(seconds)}/{bench.unit}"
+        base = baselines.get(bench.name)
+        if base is not None:
+            ratio = seconds / base
+            line += f"  {ratio:5.2f}x baseline"
+            if ratio > args.threshold:
+                line += "  SLOWER"
+                failed.append(bench.name)
+        print(line, flush=True)
+
+    if args.save:
+        # Benchmarks not run this time keep their baselines
+        data = {"machine": machine(), "benchmarks": {**baselines, **results}}
+        args.baselines.write_text(json.dumps(data, indent=1) + "\n")
+        print(f"Saved baselines to {args.baselines}")
+        return 0
+
+    if failed:
+        print(
+            f"{len(failed)} benchmarks slower than {args.threshold}x their baseline: "
+            + ", ".join(failed),
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
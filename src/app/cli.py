@@ -0,0 +1,218 @@
+"""Headless batch runner: python -m app.cli STUDY.toml
+
+Runs a study saved from the GUI on the worker pool and writes the result
+store plus a metrics.csv summary and a telemetry.json profile. Results are
+checkpointed as samples complete, running the study again after a crash or
+Ctrl+C only simulates the samples still missing. Never imports PySide6,
+fmpy is only imported by the worker processes or when an FMU is not in the
+model cache.
+
+With --serve the samples run on remote workers instead, started on every
+host with the worker command of the app and the same key:
+"FMU Insight.exe" worker HOST:PORT, or python src/main.py worker HOST:PORT.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import secrets
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from app.study.distributed import KEY_VARIABLE, Coordinator, parse_address
+from app.study.results import STATUS_CODES, ResultStore
+from app.study.runner import SampleResult, StudyRunner
+from app.study.telemetry import format_eta
+from app.study_file import load_study
+
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+
+def main(argv: Optional[List[str]] = None, prog: str = "python -m app.cli") -> int:
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Run a saved FMU Insight study."
+    )
+    parser.add_argument("study", type=Path, help="study file saved from the GUI")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="results directory, default: the one named in the study file",
+    )
+    parser.add_argument("-j", "--workers", type=int, help="worker processes")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="simulate every sample again"
+    )
+    parser.add_argument(
+        "--warm-start",
+        type=float,
+        metavar="T0",
+        help="simulate up to T0 once and start every sample from the saved FMU "
+        "state, where the FMU supports it",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="discard the results of an earlier run instead of resuming it",
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        help="also write a Chrome trace of the run (chrome://tracing, Perfetto)",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="[HOST:]PORT",
+        help="let remote workers simulate the samples, only metrics are kept",
+    )
+    parser.add_argument(
+        "--key",
+        help=f"shared key of the remote workers, default: ${KEY_VARIABLE} or a new one",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    try:
+        state = load_study(args.study)
+        if args.workers:
+            state.doe_settings["n_workers"] = args.workers
+        if args.no_cache:
+            state.doe_settings["use_cache"] = False
+        if args.warm_start is not None:
+            state.doe_settings["warm_start"] = args.warm_start
+        if args.serve:
+            # Remote workers only send metrics back
+            state.doe_settings["store_trajectories"] = False
+        output = args.output or state.results_root
+        runner = state.build_runner(output, resume=not args.restart)
+        coordinator = _serve(args, runner) if args.serve else None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    store = runner.store
+    assert store is not None
+    indices = store.missing()
+    total = len(indices)
+    if total < len(runner.design):
+        _log(args, f"Resuming, {len(runner.design) - total} samples done earlier")
+    if coordinator is None:
+        where = f"on {runner.n_workers} workers"
+    else:
+        where = "on remote workers"
+    _log(args, f"Running {total} {runner.design.method} samples {where}")
+
+    # Ctrl+C finishes the samples in flight and keeps what is done
+    previous = signal.signal(signal.SIGINT, lambda *_: runner.stop())
+    progress = _Progress(runner, total, quiet=args.quiet)
+    start = time.perf_counter()
+    try:
+        completed = runner.run(indices, on_result=progress, coordinator=coordinator)
+    finally:
+        signal.signal(signal.SIGINT, previous)
+        if coordinator is not None:
+            coordinator.close()
+    elapsed = time.perf_counter() - start
+    progress.close()
+
+    _write_summary(runner, store, output / "metrics.csv")
+    telemetry = runner.telemetry
+    assert telemetry is not None
+    telemetry.save(output / "telemetry.json")
+    if args.trace:
+        telemetry.save_trace(args.trace)
+
+    _log(
+        args,
+        f"{completed} of {total} samples in {elapsed:.1f} s: "
+        f"{store.count('ok')} ok, {store.count('infeasible')} infeasible, "
+        f"{store.count('failed')} failed, {runner.cache_hits} from cache",
+    )
+    _log(args, telemetry.report())
+    _log(args, f"Results written to {output}")
+
+    return 130 if runner.cancelled else 0
+
+
+def _serve(args: argparse.Namespace, runner: StudyRunner) -> Coordinator:
+    Coordinator.check(runner)
+    key = args.key or os.environ.get(KEY_VARIABLE)
+    if not key:
+        key = secrets.token_hex(16)
+        # Always shown, the workers cannot connect without it
+        print(f"Key of this run: {key}", file=sys.stderr)
+
+    coordinator = Coordinator(parse_address(args.serve), key)
+    host, port = coordinator.address
+    _log(args, f"Waiting for workers on {host}:{port}")
+    return coordinator
+
+
+class _Progress:
+    def __init__(
+        self, runner: StudyRunner, total: int, quiet: bool, interval: float = 1.0
+    ):
+        self.runner = runner
+        self.total = total
+        self.done = 0
+        self.quiet = quiet or not sys.stderr.isatty()
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, result: SampleResult) -> None:
+        self.done += 1
+        if result.status == "failed":
+            print(f"Sample {result.index} failed:\n{result.error}", file=sys.stderr)
+
+        now = time.perf_counter()
+        if not self.quiet and now - self._last >= self.interval:
+            self._last = now
+            print(f"\r{self._line()}", end="", file=sys.stderr)
+
+    def close(self) -> None:
+        if not self.quiet:
+            print(f"\r{self._line()}", file=sys.stderr)
+
+    def _line(self) -> str:
+        line = f"{self.done}/{self.total} samples"
+        telemetry = self.runner.telemetry
+        if telemetry is not None:
+            line += (
+                f", {telemetry.rate():.2f}/s, ETA {format_eta(telemetry.eta())}"
+                "   "  # clears what a longer line left behind
+            )
+        return line
+
+
+def _write_summary(runner: StudyRunner, store: ResultStore, path: Path) -> None:
+    """One row per sample: status, parameter values and metric values."""
+    design = runner.design
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["sample", "status", *design.names, *store.metrics])
+        for indices, points in design.chunks():
+            status = store.status[indices]
+            metrics = store.metric_values[indices]
+            for k, index in enumerate(indices.tolist()):
+                writer.writerow(
+                    [
+                        index,
+                        STATUS_NAMES[int(status[k])],
+                        *points[k].tolist(),
+                        *metrics[k].tolist(),
+                    ]
+                )
+
+
+def _log(args: argparse.Namespace, msg: str) -> None:
+    if not args.quiet:
+        print(msg, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
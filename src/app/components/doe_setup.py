@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import os
+
 from PySide6 import QtWidgets
 
 from app.state import AppState
+from app.study.doe import METHODS, FullFactorialDesign
 
 
 class DOESetup(QtWidgets.QWidget):
@@ -12,13 +15,125 @@ class DOESetup(QtWidgets.QWidget):
 
         layout = QtWidgets.QFormLayout(self)
         self.method_combo = QtWidgets.QComboBox()
-        self.method_combo.addItems(["Monte Carlo", "Latin Hypercube", "Full Factorial"])
+        self.method_combo.addItems(list(METHODS))
         self.n_spin = QtWidgets.QSpinBox()
-        self.n_spin.setRange(1, 10_000)
+        # Designs are evaluated per sample index, so size is bounded by disk only
+        self.n_spin.setRange(1, 2**31 - 1)
+        self.n_spin.setGroupSeparatorShown(True)
         self.n_spin.setValue(100)
+        self.levels_spin = QtWidgets.QSpinBox()
+        self.levels_spin.setRange(1, 1000)
+        self.levels_spin.setValue(3)
         self.seed_spin = QtWidgets.QSpinBox()
         self.seed_spin.setRange(0, 1_000_000)
+        self.workers_spin = QtWidgets.QSpinBox()
+        self.workers_spin.setRange(1, 256)
+        self.workers_spin.setValue(os.cpu_count() or 1)
+        self.store_check = QtWidgets.QCheckBox("Store trajectories")
+        self.store_check.setToolTip(
+            "When unchecked only metric values are kept, trajectories are "
+            "reduced while the simulation runs"
+        )
+        self.store_check.setChecked(True)
+        self.early_stop_check = QtWidgets.QCheckBox("Stop infeasible samples early")
+        self.early_stop_check.setToolTip(
+            "Abort a sample as soon as a running max/min has crossed a metric "
+            "bound, the sample is recorded as infeasible"
+        )
+        self.cache_check = QtWidgets.QCheckBox("Reuse cached simulations")
+        self.cache_check.setToolTip(
+            "Samples already simulated with the same FMU, start values and "
+            "experiment settings are read from the cache instead of run again"
+        )
+        self.cache_check.setChecked(True)
+        self.warm_check = QtWidgets.QCheckBox("Warm start from t0 =")
+        self.warm_check.setToolTip(
+            "Simulate up to t0 once with the fixed values and start every sample "
+            "from the saved FMU state. Needs an FMU that can serialize its state "
+            "and only tunable parameters or inputs varied, else samples run "
+            "from the start."
+        )
+        self.warm_spin = QtWidgets.QDoubleSpinBox()
+        self.warm_spin.setRange(0.0, 1e9)
+        self.warm_spin.setDecimals(6)
+        self.warm_spin.setSuffix(" s")
+        warm_row = QtWidgets.QHBoxLayout()
+        warm_row.addWidget(self.warm_check)
+        warm_row.addWidget(self.warm_spin, 1)
         layout.addRow("Method:", self.method_combo)
         layout.addRow("Number of samples:", self.n_spin)
+        layout.addRow("Levels per parameter:", self.levels_spin)
         layout.addRow("Random seed:", self.seed_spin)
-        # TODO: connect widgets to self._state.doe_settings
+        layout.addRow("Worker processes:", self.workers_spin)
+        layout.addRow("", self.store_check)
+        layout.addRow("", self.early_stop_check)
+        layout.addRow("", self.cache_check)
+        layout.addRow("", warm_row)
+
+        self.method_combo.currentTextChanged.connect(self._commit)
+        for spin in (self.n_spin, self.levels_spin, self.seed_spin, self.workers_spin):
+            spin.valueChanged.connect(self._commit)
+        self.warm_spin.valueChanged.connect(self._commit)
+        checks = (self.store_check, self.early_stop_check, self.cache_check)
+        for check in checks + (self.warm_check,):
+            check.toggled.connect(self._commit)
+
+        self._commit()
+
+    def load_settings(self) -> None:
+        """Show the settings of the study in the state, e.g. one opened from a file."""
+        doe = self._state.doe_settings
+        widgets = (
+            self.method_combo,
+            self.n_spin,
+            self.levels_spin,
+            self.seed_spin,
+            self.workers_spin,
+            self.store_check,
+            self.early_stop_check,
+            self.cache_check,
+            self.warm_check,
+            self.warm_spin,
+        )
+        for w in widgets:
+            w.blockSignals(True)
+        # Settings a study file leaves out keep what the widgets show
+        self.method_combo.setCurrentText(
+            doe.get("method", self.method_combo.currentText())
+        )
+        self.n_spin.setValue(doe.get("n_samples", self.n_spin.value()))
+        self.levels_spin.setValue(doe.get("levels", self.levels_spin.value()))
+        self.seed_spin.setValue(doe.get("seed", self.seed_spin.value()))
+        self.workers_spin.setValue(doe.get("n_workers") or self.workers_spin.value())
+        self.store_check.setChecked(doe.get("store_trajectories", True))
+        self.early_stop_check.setChecked(doe.get("early_stop", False))
+        self.cache_check.setChecked(doe.get("use_cache", True))
+        warm = doe.get("warm_start")
+        self.warm_check.setChecked(warm is not None)
+        if warm is not None:
+            self.warm_spin.setValue(warm)
+        for w in widgets:
+            w.blockSignals(False)
+
+        self._commit()
+
+    def _commit(self) -> None:
+        method = self.method_combo.currentText()
+        factorial = method == FullFactorialDesign.method
+        self.n_spin.setEnabled(not factorial)
+        self.levels_spin.setEnabled(factorial)
+        self.seed_spin.setEnabled(not factorial)
+        warm = self.warm_check.isChecked()
+        self.warm_spin.setEnabled(warm)
+
+        self._state.doe_settings.update(
+            method=method,
+            n_samples=self.n_spin.value(),
+            levels=self.levels_spin.value(),
+            seed=self.seed_spin.value(),
+            n_workers=self.workers_spin.value(),
+            store_trajectories=self.store_check.isChecked(),
+            early_stop=self.early_stop_check.isChecked(),
+            use_cache=self.cache_check.isChecked(),
+            warm_start=self.warm_spin.value() if warm else None,
+        )
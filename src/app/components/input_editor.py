@@ -1,14 +1,178 @@
 from __future__ import annotations
 
-from PySide6 import QtWidgets
+from pathlib import Path
+from typing import Dict, List
 
+from PySide6 import QtCore, QtWidgets
+
+from app.schemas.fmu import FmuInput
 from app.state import AppState
+from app.study.signals import Recording
+
+COLUMNS = ["Input", "Unit", "Recording", "Column"]
 
 
 class InputEditor(QtWidgets.QWidget):
+    """Assigns recorded time series to the FMU inputs.
+
+    Checked inputs are driven during the study, resampled onto the simulation
+    grid when it starts.
+    """
+
     def __init__(self, state: AppState, parent: QtWidgets.QWidget | None = None):
         super().__init__(parent)
         self._state = state
+        self._inputs: List[FmuInput] = []
+        # Opened once per file, the columns stay memory-mapped
+        self._recordings: Dict[str, Recording] = {}
 
         layout = QtWidgets.QVBoxLayout(self)
-        layout.addWidget(QtWidgets.QLabel("Input signal editor – TODO"))
+
+        self.input_table = QtWidgets.QTableWidget(0, len(COLUMNS))
+        self.input_table.setHorizontalHeaderLabels(COLUMNS)
+        self.input_table.verticalHeader().setVisible(False)
+        self.input_table.horizontalHeader().setStretchLastSection(True)
+        self.input_table.setSelectionBehavior(
+            QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        layout.addWidget(self.input_table)
+
+        btn_row = QtWidgets.QHBoxLayout()
+        self.btn_load = QtWidgets.QPushButton("Load recording for selection…")
+        self.btn_clear = QtWidgets.QPushButton("Clear selected")
+        btn_row.addWidget(self.btn_load)
+        btn_row.addWidget(self.btn_clear)
+        btn_row.addStretch(1)
+        layout.addLayout(btn_row)
+
+        self.info_label = QtWidgets.QLabel("")
+        layout.addWidget(self.info_label)
+
+        # Signal Wiring
+        self.btn_load.clicked.connect(self._load_recording)
+        self.btn_clear.clicked.connect(self._clear_selected)
+        self.input_table.itemChanged.connect(self._on_item_changed)
+
+    # Public Helpers
+
+    def rebuild_inputs(self) -> None:
+        catalog = self._state.catalog
+        names = catalog.names_of("input") if catalog is not None else []
+        self._inputs = [self._state.fmu_variables[name] for name in names]
+
+        self.input_table.blockSignals(True)
+        self.input_table.setRowCount(0)
+        for row, var in enumerate(self._inputs):
+            self.input_table.insertRow(row)
+            name = QtWidgets.QTableWidgetItem(var.name)
+            name.setFlags(
+                (name.flags() | QtCore.Qt.ItemFlag.ItemIsUserCheckable)
+                & ~QtCore.Qt.ItemFlag.ItemIsEditable
+            )
+            self.input_table.setItem(row, 0, name)
+            unit = QtWidgets.QTableWidgetItem(var.unit or "")
+            unit.setFlags(unit.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
+            self.input_table.setItem(row, 1, unit)
+            self._update_row(row)
+        self.input_table.blockSignals(False)
+
+        self.info_label.setText(
+            f"{len(names)} inputs" if names else "The FMU has no inputs"
+        )
+
+    # Callbacks
+
+    def _load_recording(self) -> None:
+        rows = self._selected_rows()
+        if not rows:
+            self.info_label.setText("Select the inputs to drive first")
+            return
+
+        file_path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self,
+            caption="Select recording",
+            dir="",
+            filter="Recordings (*.csv *.txt *.tsv *.npy)",
+        )
+        if not file_path:
+            return
+
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.CursorShape.WaitCursor)
+        try:
+            recording = self._recording(file_path)
+        except (OSError, ValueError) as e:
+            self.info_label.setText(f"Could not read {Path(file_path).name}: {e}")
+            return
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+
+        for row in rows:
+            var = self._inputs[row]
+            var.source = file_path
+            # Columns named like the input are matched, others take the first one
+            var.column = var.name if var.name in recording else recording.names[0]
+            self._state.inputs[var.name] = var
+            self._update_row(row)
+
+        t = recording.time
+        self.info_label.setText(
+            f"{Path(file_path).name}: {len(recording):,} rows, "
+            f"{len(recording.names)} signals, t = {t[0]:g} … {t[-1]:g}"
+        )
+
+    def _clear_selected(self) -> None:
+        for row in self._selected_rows():
+            var = self._inputs[row]
+            var.source = var.column = None
+            self._state.inputs.pop(var.name, None)
+            self._update_row(row)
+
+    def _on_item_changed(self, item: QtWidgets.QTableWidgetItem) -> None:
+        if item.column() != 0:
+            return
+        var = self._inputs[item.row()]
+        if item.checkState() == QtCore.Qt.CheckState.Checked and var.source:
+            self._state.inputs[var.name] = var
+        else:
+            self._state.inputs.pop(var.name, None)
+            if item.checkState() == QtCore.Qt.CheckState.Checked:
+                self._update_row(item.row())  # nothing to drive it with yet
+
+    # Helpers
+
+    def _recording(self, path: str) -> Recording:
+        recording = self._recordings.get(path)
+        if recording is None:
+            recording = self._recordings[path] = Recording(Path(path))
+        if not recording.names:
+            raise ValueError("no signal columns besides time")
+        return recording
+
+    def _selected_rows(self) -> List[int]:
+        return sorted({i.row() for i in self.input_table.selectedIndexes()})
+
+    def _update_row(self, row: int) -> None:
+        var = self._inputs[row]
+        self.input_table.blockSignals(True)
+
+        checked = var.name in self._state.inputs
+        self.input_table.item(row, 0).setCheckState(
+            QtCore.Qt.CheckState.Checked if checked else QtCore.Qt.CheckState.Unchecked
+        )
+        source = QtWidgets.QTableWidgetItem(Path(var.source).name if var.source else "")
+        source.setToolTip(var.source or "")
+        source.setFlags(source.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
+        self.input_table.setItem(row, 2, source)
+
+        if var.source:
+            column_combo = QtWidgets.QComboBox()
+            column_combo.addItems(self._recording(var.source).names)
+            column_combo.setCurrentText(var.column or var.name)
+            column_combo.currentTextChanged.connect(
+                lambda text, v=var: setattr(v, "column", text)
+            )
+            self.input_table.setCellWidget(row, 3, column_combo)
+        else:
+            self.input_table.removeCellWidget(row, 3)
+
+        self.input_table.blockSignals(False)
@@ -0,0 +1,97 @@
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from app.log_sink import LEVELS, MAX_LINES, LogBuffer, log_file
+
+FLUSH_MS = 200
+
+
+class LogView(QtWidgets.QWidget):
+    """Shows the lines of a LogBuffer, a batch per timer tick.
+
+    Only the ring buffer of recent lines is kept, the full log is in the
+    rotating log file. While hidden the view is not updated at all, it
+    catches up from the ring buffer when shown again.
+    """
+
+    def __init__(self, buffer: LogBuffer, parent: QtWidgets.QWidget | None = None):
+        super().__init__(parent)
+        self._buffer = buffer
+        self._stale = False
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        row = QtWidgets.QHBoxLayout()
+        self.level_combo = QtWidgets.QComboBox()
+        self.level_combo.addItems(list(LEVELS))
+        self.level_combo.setCurrentText("Info")
+        self.btn_open = QtWidgets.QPushButton("Open log file")
+        row.addWidget(QtWidgets.QLabel("Level:"))
+        row.addWidget(self.level_combo)
+        row.addStretch(1)
+        row.addWidget(self.btn_open)
+        layout.addLayout(row)
+
+        self.text = QtWidgets.QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setMaximumBlockCount(MAX_LINES)
+        self.text.setFont(
+            QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont)
+        )
+        layout.addWidget(self.text)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(FLUSH_MS)
+        self._timer.start()
+
+        # Signal Wiring
+        self._timer.timeout.connect(self.flush)
+        self.level_combo.currentTextChanged.connect(lambda _: self._reload())
+        self.btn_open.clicked.connect(self._open_file)
+
+    @property
+    def level(self) -> int:
+        return LEVELS[self.level_combo.currentText()]
+
+    def flush(self) -> None:
+        lines, dropped = self._buffer.drain()
+        if not lines:
+            return
+        if not self.isVisible():
+            self._stale = True
+            return
+
+        level = self.level
+        shown = [text for lvl, text in lines if lvl >= level]
+        if dropped:
+            shown.insert(0, f"… {dropped} lines not shown, see the log file")
+        if shown:
+            self._append("\n".join(shown))
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        super().showEvent(event)
+        if self._stale:
+            self._reload()
+
+    # Helpers
+
+    def _reload(self) -> None:
+        self._buffer.drain()  # all of it is in the ring buffer
+        self._stale = False
+        self.text.clear()
+        lines = self._buffer.recent(self.level)
+        if lines:
+            self._append("\n".join(lines))
+
+    def _append(self, text: str) -> None:
+        bar = self.text.verticalScrollBar()
+        at_end = bar.value() == bar.maximum()
+        # One block of text per batch, not one layout pass per line
+        self.text.appendPlainText(text)
+        if at_end:
+            bar.setValue(bar.maximum())
+
+    def _open_file(self) -> None:
+        path = log_file()
+        if path is not None:
+            QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(str(path)))
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from PySide6 import QtWidgets
+from PySide6 import QtCore, QtWidgets
 
+from app.schemas.metrics_spec import OBJECTIVES, STATISTICS, MetricSpec
 from app.state import AppState
 
 
@@ -16,8 +17,10 @@ class MetricsSetup(QtWidgets.QWidget):
         left_box = QtWidgets.QGroupBox("Available outputs / signals")
         left_layout = QtWidgets.QVBoxLayout(left_box)
         self.signal_list = QtWidgets.QListWidget()
+        self.signal_list.setSelectionMode(
+            QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection
+        )
         left_layout.addWidget(self.signal_list)
-        # TODO: populate this list from FMU after load
 
         # Right – metric table ----------------------------------------------------------
         right_box = QtWidgets.QGroupBox("Metrics & constraints")
@@ -35,6 +38,9 @@ class MetricsSetup(QtWidgets.QWidget):
         )
         self.metric_table.verticalHeader().setVisible(False)
         self.metric_table.horizontalHeader().setStretchLastSection(True)
+        self.metric_table.setSelectionBehavior(
+            QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows
+        )
         right_layout.addWidget(self.metric_table)
 
         btn_row = QtWidgets.QHBoxLayout()
@@ -44,7 +50,89 @@ class MetricsSetup(QtWidgets.QWidget):
         btn_row.addWidget(self.btn_remove)
         btn_row.addStretch(1)
         right_layout.addLayout(btn_row)
-        # TODO: wire buttons to modify self.metric_table & self._state.metrics
 
         main.addWidget(left_box, 2)
         main.addWidget(right_box, 3)
+
+        # Signal Wiring
+        self.btn_add.clicked.connect(self._add_selected)
+        self.btn_remove.clicked.connect(self._remove_selected)
+        self.metric_table.itemChanged.connect(self._on_item_changed)
+
+    # Public Helpers
+
+    def rebuild_signals(self) -> None:
+        self._state.metrics.clear()
+        self.show_metrics()
+
+    def show_metrics(self) -> None:
+        """Outputs of the FMU and the metrics already part of the study."""
+        self.signal_list.clear()
+        self.signal_list.addItems(self._state.output_names())
+
+        self.metric_table.setRowCount(0)
+        for spec in self._state.metrics:
+            self._append_row(spec)
+
+    # Callbacks
+
+    def _add_selected(self) -> None:
+        for item in self.signal_list.selectedItems():
+            spec = MetricSpec(signal=self._state.fmu_variables[item.text()])
+            self._state.metrics.append(spec)
+            self._append_row(spec)
+
+    def _remove_selected(self) -> None:
+        rows = sorted(
+            {i.row() for i in self.metric_table.selectedIndexes()}, reverse=True
+        )
+        for row in rows:
+            self.metric_table.removeRow(row)
+            del self._state.metrics[row]
+
+    def _on_item_changed(self, item: QtWidgets.QTableWidgetItem) -> None:
+        spec = self._state.metrics[item.row()]
+        text = item.text().strip()
+
+        try:
+            value = float(text) if text else None
+        except ValueError:
+            value = None
+            item.setText("")
+
+        if item.column() == 2:
+            spec.lower = value
+        elif item.column() == 3:
+            spec.upper = value
+
+    # Helpers
+
+    def _append_row(self, spec: MetricSpec) -> None:
+        row = self.metric_table.rowCount()
+        self.metric_table.blockSignals(True)
+        self.metric_table.insertRow(row)
+
+        signal = QtWidgets.QTableWidgetItem(spec.signal.name)
+        signal.setFlags(signal.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
+        self.metric_table.setItem(row, 0, signal)
+        for column, bound in ((2, spec.lower), (3, spec.upper)):
+            text = f"{bound:g}" if bound is not None else ""
+            self.metric_table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+
+        stat_combo = QtWidgets.QComboBox()
+        stat_combo.addItems(STATISTICS)
+        stat_combo.setCurrentText(spec.statistic)
+        stat_combo.currentTextChanged.connect(
+            lambda text, s=spec: setattr(s, "statistic", text)
+        )
+        self.metric_table.setCellWidget(row, 1, stat_combo)
+
+        obj_combo = QtWidgets.QComboBox()
+        obj_combo.addItems(["", *OBJECTIVES])
+        obj_combo.setCurrentText(spec.objective or "")
+        obj_combo.currentTextChanged.connect(
+            lambda text, s=spec: setattr(s, "objective", text or None)
+        )
+        self.metric_table.setCellWidget(row, 4, obj_combo)
+
+        self.metric_table.blockSignals(False)
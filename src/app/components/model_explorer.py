@@ -1,13 +1,21 @@
-from PySide6 import QtWidgets
+import numpy as np
+from PySide6 import QtCore, QtWidgets
 from PySide6.QtCore import Qt
 
+from app.components.variable_tree import CATEGORIES, VariableTreeModel
 from app.schemas.fmu import FmuInput, FmuOutput, FmuParameter
 from app.state import AppState
+from app.workers import NameSearch
 
 DESCRIPTION_PLACEHOLDER = "Select a property to view more details"
+SEARCH_DELAY_MS = 150
 
 
 class ModelExplorer(QtWidgets.QWidget):
+    variable_selected = QtCore.Signal(
+        object
+    )  # FmuParameter | FmuInput | FmuOutput | None
+
     def __init__(self, state: AppState, parent: QtWidgets.QWidget | None = None):
         super().__init__(parent)
         self._state = state
@@ -16,9 +24,22 @@ class ModelExplorer(QtWidgets.QWidget):
 
         self.search_box = QtWidgets.QLineEdit()
         self.search_box.setPlaceholderText("Filter")
-
-        self.tree_view = QtWidgets.QTreeWidget()
+        self.search_box.setClearButtonEnabled(True)
+        self.result_label = QtWidgets.QLabel(self)
+        self.result_label.hide()
+
+        # Queries wait for a typing pause and run off the GUI thread
+        self._search = NameSearch(self)
+        self._query = 0
+        self._search_timer = QtCore.QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DELAY_MS)
+
+        self.tree_model = VariableTreeModel(self)
+        self.tree_view = QtWidgets.QTreeView()
         self.tree_view.setHeaderHidden(True)
+        self.tree_view.setUniformRowHeights(True)
+        self.tree_view.setModel(self.tree_model)
 
         self.description = QtWidgets.QLabel(DESCRIPTION_PLACEHOLDER, self)
         self.description.setAlignment(
@@ -40,68 +61,80 @@ class ModelExplorer(QtWidgets.QWidget):
         self._layout = QtWidgets.QVBoxLayout()
         self._layout.setContentsMargins(5, 0, 5, 0)
         self._layout.addWidget(self.search_box)
+        self._layout.addWidget(self.result_label)
         self._layout.addWidget(self._splitter)
         self.setLayout(self._layout)
 
         # Signal Wiring
-        self.tree_view.itemSelectionChanged.connect(self._on_selection_changed)
-        self.search_box.textChanged.connect(self._filter_tree)
+        self.tree_view.selectionModel().selectionChanged.connect(
+            self._on_selection_changed
+        )
+        self.search_box.textChanged.connect(self._search_timer.start)
+        self._search_timer.timeout.connect(
+            lambda: self._filter_tree(self.search_box.text())
+        )
+        self._search.finished.connect(self._on_search_finished)
 
     # Callbacks
 
     def _on_selection_changed(self):
-        items = self.tree_view.selectedItems()
+        indexes = self.tree_view.selectionModel().selectedIndexes()
+        name = indexes[0].data(Qt.ItemDataRole.UserRole) if indexes else None
         v: FmuParameter | FmuInput | FmuOutput | None = (
-            items[0].data(0, Qt.ItemDataRole.UserRole) if items else None
+            self._state.fmu_variables[name] if name is not None else None
         )
         self.update_description(v)
+        self.variable_selected.emit(v)
 
     def _filter_tree(self, text: str):
-        text = text.lower().strip()
+        text = text.strip()
+        catalog = self._state.catalog
 
-        for i in range(self.tree_view.topLevelItemCount()):
-            category = self.tree_view.topLevelItem(i)
-            if category is None:
-                continue
+        if not text or catalog is None:
+            self._query = 0
+            self.result_label.hide()
+            self.tree_model.set_catalog(catalog)
+            return
 
-            any_child_visible = False
+        self._query = self._search.search(text)
 
-            for j in range(category.childCount()):
-                child = category.child(j)
-                match = text in child.text(0).lower() if text else True
-                child.setHidden(not match)
-                any_child_visible |= match
+    def _on_search_finished(self, query: int, rows: np.ndarray):
+        if query != self._query:
+            return  # superseded by a newer query or a cleared filter
 
-            category.setHidden(not any_child_visible)
+        # Only the matches become rows, flat under their category
+        self.tree_model.set_catalog(self._state.catalog, rows, flat=True)
+        self.tree_view.expandToDepth(0)
+        self.result_label.setText(f"{len(rows):,} matches")
+        self.result_label.show()
 
     # Public Helpers
 
     def rebuild_tree(self):
-        self.tree_view.clear()
-
-        param_root = QtWidgets.QTreeWidgetItem(self.tree_view, ["Parameters"])
-        input_root = QtWidgets.QTreeWidgetItem(self.tree_view, ["Inputs"])
-        output_root = QtWidgets.QTreeWidgetItem(self.tree_view, ["Outputs"])
-
-        for name, var in self._state.fmu_variables.items():
-            if isinstance(var, FmuParameter):
-                item = QtWidgets.QTreeWidgetItem(param_root, [name])
-                item.setData(0, Qt.ItemDataRole.UserRole, var)
-            elif isinstance(var, FmuInput):
-                item = QtWidgets.QTreeWidgetItem(input_root, [name])
-                item.setData(0, Qt.ItemDataRole.UserRole, var)
-            elif isinstance(var, FmuOutput):
-                item = QtWidgets.QTreeWidgetItem(output_root, [name])
-                item.setData(0, Qt.ItemDataRole.UserRole, var)
+        self.search_box.blockSignals(True)
+        self.search_box.clear()
+        self.search_box.blockSignals(False)
+        self._search_timer.stop()
+        self._query = 0
+        self.result_label.hide()
+
+        catalog = self._state.catalog
+        self.tree_model.set_catalog(catalog)
+        shown = (
+            catalog.rows(*(causality for _, causality in CATEGORIES))
+            if catalog is not None
+            else np.empty(0, dtype=np.intp)
+        )
+        self._search.set_catalog(catalog, shown)
 
     def update_description(self, v: FmuParameter | FmuInput | FmuOutput | None):
         if v is not None:
             self.description.setText(f"""
 Name = {v.name}
-Description = {v._raw.description}
-Unit = {v._raw.unit}
-Type = {v._raw.type}
-Default = {v._raw.start}
+Description = {v.description}
+Unit = {v.unit}
+Type = {v.type}
+Default = {v.start}
             """)
         else:
             self.description.setText(DESCRIPTION_PLACEHOLDER)
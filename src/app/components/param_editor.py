@@ -1,5 +1,6 @@
 from PySide6 import QtWidgets
 
+from app.schemas.fmu import FmuInput, FmuOutput, FmuParameter
 from app.state import AppState
 
 
@@ -7,6 +8,7 @@ class ParamEditor(QtWidgets.QWidget):
     def __init__(self, state: AppState, parent: QtWidgets.QWidget | None = None):
         super().__init__(parent)
         self._state = state
+        self._param: FmuParameter | None = None
 
         self.form = QtWidgets.QFormLayout(self)
         self.name_edit = QtWidgets.QLineEdit()
@@ -26,7 +28,85 @@ class ParamEditor(QtWidgets.QWidget):
         self.form.addRow("Fixed value:", self.value_edit)
         self.form.addRow("Range:", self._hbox(self.min_edit, self.max_edit))
         self.form.addRow("Distribution:", self.dist_combo)
-        # TODO: populate/commit edits according to selection in model explorer
+
+        for edit in (self.value_edit, self.min_edit, self.max_edit):
+            edit.editingFinished.connect(self._commit)
+        self.dist_combo.currentTextChanged.connect(self._commit)
+
+        self.set_variable(None)
+
+    # Public Helpers
+
+    def set_variable(self, v: FmuParameter | FmuInput | FmuOutput | None) -> None:
+        self._param = None  # don't commit while the fields are being filled
+
+        param = v if isinstance(v, FmuParameter) else None
+        if param is not None:
+            # Keep editing the instance that is already part of the study
+            param = self._state.parameters.get(param.name, param)
+
+        self.name_edit.setText(param.name if param else "")
+        self.unit_edit.setText((param.unit or "") if param else "")
+        self.value_edit.setText(str(param.fixed_value) if param else "")
+        self.min_edit.setText(self._fmt(param.lower) if param else "")
+        self.max_edit.setText(self._fmt(param.upper) if param else "")
+        self.dist_combo.setCurrentText(param.distribution if param else "Uniform")
+
+        for w in (self.value_edit, self.min_edit, self.max_edit, self.dist_combo):
+            w.setEnabled(param is not None)
+
+        self._param = param
+
+    # Callbacks
+
+    def _commit(self) -> None:
+        param = self._param
+        if param is None:
+            return
+
+        text = self.value_edit.text().strip()
+        value = self._parse(text) if text else None
+        if value is None or value == param.default_value:
+            param.value = None
+        else:
+            param.value = value
+
+        param.lower = self._parse_float(self.min_edit.text())
+        param.upper = self._parse_float(self.max_edit.text())
+        if param.is_varied and param.upper < param.lower:
+            param.lower, param.upper = param.upper, param.lower
+            self.min_edit.setText(self._fmt(param.lower))
+            self.max_edit.setText(self._fmt(param.upper))
+        param.distribution = self.dist_combo.currentText()
+
+        # Parameters only take part in the study once they differ from the FMU
+        if param.is_varied or param.value is not None:
+            self._state.parameters[param.name] = param
+        else:
+            self._state.parameters.pop(param.name, None)
+
+    # Helpers
+
+    @staticmethod
+    def _parse(text: str) -> str | float | None:
+        text = text.strip()
+        if not text:
+            return None
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+    @staticmethod
+    def _parse_float(text: str) -> float | None:
+        try:
+            return float(text)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _fmt(value: float | None) -> str:
+        return "" if value is None else f"{value:g}"
 
     @staticmethod
     def _hbox(*widgets: QtWidgets.QWidget) -> QtWidgets.QWidget:
@@ -1,14 +1,161 @@
-from PySide6 import QtCore, QtWidgets
+from typing import Optional
 
+import numpy as np
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from app.components.trajectory_plot import TrajectoryPlot
 from app.state import AppState
+from app.study.analytics import Bands, Sensitivity
+from app.study.doe import Design
+from app.workers import Analytics
+
+MEASURES = ["First-order Sobol index", "Correlation"]
 
 
 class ResultsView(QtWidgets.QWidget):
     def __init__(self, state: AppState, parent: QtWidgets.QWidget | None = None):
         super().__init__(parent)
         self._state = state
+        self._design: Optional[Design] = None
+        self.sensitivity: Optional[Sensitivity] = None
+
+        self.analytics = Analytics(self)
+        self._bands_request = 0
+        self._sensitivity_request = 0
 
         layout = QtWidgets.QVBoxLayout(self)
-        self.placeholder = QtWidgets.QLabel("Results plots – appear after run")
+        self.placeholder = QtWidgets.QLabel("Results plots – appear after run")
         self.placeholder.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.placeholder)
+
+        signal_row = QtWidgets.QHBoxLayout()
+        self.signal_combo = QtWidgets.QComboBox()
+        self.signal_combo.setMinimumContentsLength(24)
+        self.bands_check = QtWidgets.QCheckBox("Quantile bands")
+        self.bands_check.setChecked(True)
+        self.bands_check.setToolTip(
+            "Median solid, 25–75 % dashed and 5–95 % dotted, at every time point"
+        )
+        self.lod_label = QtWidgets.QLabel("")
+        signal_row.addWidget(QtWidgets.QLabel("Signal:"))
+        signal_row.addWidget(self.signal_combo)
+        signal_row.addWidget(self.bands_check)
+        signal_row.addStretch(1)
+        signal_row.addWidget(self.lod_label)
+        layout.addLayout(signal_row)
+
+        self.plot = TrajectoryPlot()
+        layout.addWidget(self.plot, 3)
+
+        group = QtWidgets.QGroupBox("Sensitivity of the metrics")
+        group_layout = QtWidgets.QVBoxLayout(group)
+        measure_row = QtWidgets.QHBoxLayout()
+        self.measure_combo = QtWidgets.QComboBox()
+        self.measure_combo.addItems(MEASURES)
+        self.sensitivity_label = QtWidgets.QLabel("")
+        measure_row.addWidget(self.measure_combo)
+        measure_row.addWidget(self.sensitivity_label, 1)
+        group_layout.addLayout(measure_row)
+        self.sensitivity_table = QtWidgets.QTableWidget()
+        self.sensitivity_table.setEditTriggers(
+            QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers
+        )
+        group_layout.addWidget(self.sensitivity_table)
+        layout.addWidget(group, 1)
+
+        self.signal_combo.currentTextChanged.connect(self._show_signal)
+        self.bands_check.toggled.connect(
+            lambda _: self._show_signal(self.signal_combo.currentText())
+        )
+        self.measure_combo.currentTextChanged.connect(lambda _: self._fill_table())
+        self.plot.rendered.connect(
+            lambda image: self.lod_label.setText(
+                f"{image.n_runs} runs × {image.n_points:,} points in view"
+            )
+        )
+        self.analytics.bands_ready.connect(self._on_bands)
+        self.analytics.sensitivity_ready.connect(self._on_sensitivity)
+
+    def refresh(self, design: Optional[Design] = None) -> None:
+        """Show the current results, design is the one they were sampled from."""
+        store = self._state.results
+        self._design = design
+        self.sensitivity = None
+        self.analytics.cancel()
+        self._fill_table()
+        if store is None:
+            self.placeholder.setText("Results plots – appear after run")
+            self.signal_combo.clear()
+            self.plot.set_signal(None, None)
+            return
+
+        # Counts come from the status column only, trajectories stay on disk
+        self.placeholder.setText(
+            f"{store.count('ok')} of {store.n_samples} samples completed, "
+            f"{store.count('infeasible')} stopped as infeasible, "
+            f"{store.count('failed')} failed\n"
+            f"{len(store.signals)} signals × {len(store.time)} points in {store.root}"
+        )
+
+        current = self.signal_combo.currentText()
+        self.signal_combo.blockSignals(True)
+        self.signal_combo.clear()
+        self.signal_combo.addItems(store.signals)
+        if current in store.signals:
+            self.signal_combo.setCurrentText(current)
+        self.signal_combo.blockSignals(False)
+        self._show_signal(self.signal_combo.currentText())
+
+        if design is not None and store.metrics:
+            self.sensitivity_label.setText("Computing…")
+            self._sensitivity_request = self.analytics.sensitivity(design, store)
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self.analytics.wait(msecs) and self.plot.wait(msecs)
+
+    # Callbacks
+
+    def _show_signal(self, signal: str) -> None:
+        store = self._state.results
+        self.plot.set_signal(store, signal or None)
+        if store is not None and signal and self.bands_check.isChecked():
+            self._bands_request = self.analytics.bands(store, signal)
+
+    def _on_bands(self, request: int, bands: Bands) -> None:
+        if request == self._bands_request and self.bands_check.isChecked():
+            self.plot.set_bands(bands)
+
+    def _on_sensitivity(self, request: int, result: Sensitivity) -> None:
+        if request != self._sensitivity_request:
+            return
+        self.sensitivity = result
+        self._fill_table()
+
+    # Helpers
+
+    def _fill_table(self) -> None:
+        table, result = self.sensitivity_table, self.sensitivity
+        if result is None:
+            table.clear()
+            table.setRowCount(0)
+            table.setColumnCount(0)
+            if self._design is None or self._state.results is None:
+                self.sensitivity_label.setText("")
+            return
+
+        correlation = self.measure_combo.currentText() == "Correlation"
+        values = result.parameter_metric if correlation else result.first_order
+        self.sensitivity_label.setText(f"over {result.n_samples} completed samples")
+
+        table.setRowCount(len(result.parameters))
+        table.setColumnCount(len(result.metrics))
+        table.setVerticalHeaderLabels(result.parameters)
+        table.setHorizontalHeaderLabels(result.metrics)
+        for (row, col), value in np.ndenumerate(values):
+            item = QtWidgets.QTableWidgetItem("" if np.isnan(value) else f"{value:.3f}")
+            item.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignRight)
+            if not np.isnan(value):
+                # Stronger effects in stronger colors, red for negative correlation
+                hue = 0.0 if value < 0 else (0.6 if correlation else 0.33)
+                item.setBackground(QtGui.QColor.fromHsvF(hue, 0.6 * abs(value), 1.0))
+            table.setItem(row, col, item)
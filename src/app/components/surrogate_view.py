@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+import numpy as np
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from app.log_sink import get_logger
+from app.state import AppState
+from app.study.doe import Design
+from app.study.runner import SampleResult
+from app.study.surrogate import SURROGATES, Samples, Surrogate, feasibility, propose
+from app.workers import StudyWorker, SurrogateFitter
+
+COLUMNS = ["Metric", "Prediction", "± 2σ", "Bounds", "P(within bounds)"]
+
+
+class SurrogateView(QtWidgets.QWidget):
+    """Cheap models of the metrics, fitted on the samples completed so far.
+
+    What-if values are predicted instantly for any parameter combination.
+    Adaptive rounds simulate the points the model is least sure about, or
+    where a metric bound is still undecided, and refit on the results.
+    Samples are read and models fitted on a background thread.
+    """
+
+    trainable = QtCore.Signal(bool)  # whether there are samples to fit on
+
+    def __init__(self, state: AppState, parent: QtWidgets.QWidget | None = None):
+        super().__init__(parent)
+        self._state = state
+        self._design: Optional[Design] = None
+        self._base: Optional[Samples] = None
+        self.model: Optional[Surrogate] = None
+        self._spins: List[QtWidgets.QDoubleSpinBox] = []
+
+        self._thread: QtCore.QThread | None = None
+        self._worker: StudyWorker | None = None
+        self._results: List[SampleResult] = []
+
+        self.fitter = SurrogateFitter(self)
+        # Samples or fit still to come, 0 when nothing is pending
+        self._request = 0
+
+        layout = QtWidgets.QVBoxLayout(self)
+
+        fit_row = QtWidgets.QHBoxLayout()
+        self.kind_combo = QtWidgets.QComboBox()
+        self.kind_combo.addItems(list(SURROGATES))
+        self.kind_combo.setCurrentText("Gaussian process")
+        self.btn_fit = QtWidgets.QPushButton("Fit")
+        fit_row.addWidget(QtWidgets.QLabel("Model:"))
+        fit_row.addWidget(self.kind_combo)
+        fit_row.addWidget(self.btn_fit)
+        fit_row.addStretch(1)
+        layout.addLayout(fit_row)
+        self.fit_label = QtWidgets.QLabel("Run a study with metrics first")
+        self.fit_label.setWordWrap(True)
+        layout.addWidget(self.fit_label)
+
+        what_if = QtWidgets.QGroupBox("What if")
+        what_if_layout = QtWidgets.QHBoxLayout(what_if)
+        self.param_form = QtWidgets.QFormLayout()
+        what_if_layout.addLayout(self.param_form)
+        self.prediction_table = QtWidgets.QTableWidget(0, len(COLUMNS))
+        self.prediction_table.setHorizontalHeaderLabels(COLUMNS)
+        self.prediction_table.verticalHeader().setVisible(False)
+        self.prediction_table.horizontalHeader().setStretchLastSection(True)
+        self.prediction_table.setEditTriggers(
+            QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers
+        )
+        what_if_layout.addWidget(self.prediction_table, 1)
+        layout.addWidget(what_if, 1)
+
+        adaptive = QtWidgets.QGroupBox("Adaptive sampling")
+        adaptive_layout = QtWidgets.QHBoxLayout(adaptive)
+        self.n_spin = QtWidgets.QSpinBox()
+        self.n_spin.setRange(1, 10_000)
+        self.n_spin.setValue(10)
+        self.btn_propose = QtWidgets.QPushButton("Simulate proposals")
+        self.btn_propose.setToolTip(
+            "Simulate the points where the model is least certain, or where it "
+            "cannot tell yet whether a metric stays within its bounds, then refit"
+        )
+        self.adaptive_label = QtWidgets.QLabel("")
+        adaptive_layout.addWidget(QtWidgets.QLabel("Samples per round:"))
+        adaptive_layout.addWidget(self.n_spin)
+        adaptive_layout.addWidget(self.btn_propose)
+        adaptive_layout.addWidget(self.adaptive_label, 1)
+        layout.addWidget(adaptive)
+
+        # Signal Wiring
+        self.btn_fit.clicked.connect(self.fit)
+        self.btn_propose.clicked.connect(self._run_proposals)
+        self.fitter.samples_ready.connect(self._on_samples)
+        self.fitter.fitted.connect(self._on_fitted)
+        self.fitter.failed.connect(self._on_fit_failed)
+
+        self._update_buttons()
+
+    # Public Helpers
+
+    @property
+    def busy(self) -> bool:
+        return self._thread is not None
+
+    def set_design(self, design: Optional[Design]) -> None:
+        """Train on the completed samples of the study results for design.
+
+        They are read in the background, trainable reports the outcome.
+        """
+        store = self._state.results
+        self._design = design
+        self._base = None
+        self.model = None
+        self._request = 0
+        self.fitter.cancel()
+        if design is not None and store is not None and store.metrics:
+            self._request = self.fitter.samples(design, store)
+            self.fit_label.setText("Reading the completed samples…")
+        else:
+            self.fit_label.setText("Run a study with metrics first")
+            self.trainable.emit(False)
+        self._rebuild_params()
+        self._update_buttons()
+
+    def samples(self) -> Optional[Samples]:
+        base = self._base
+        if base is None:
+            return None
+        adaptive = self._state.adaptive
+        if adaptive is not None and adaptive.matches(base) and len(adaptive):
+            return base.add(adaptive.x, adaptive.y)
+        return base
+
+    def fit(self) -> None:
+        samples = self.samples()
+        if samples is None or self._design is None:
+            return
+
+        kind = self.kind_combo.currentText()
+        self._request = self.fitter.fit(kind, self._design.ranges, samples)
+        self.fit_label.setText(f"Fitting a {kind} on {len(samples)} samples…")
+        self._update_buttons()
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self.fitter.wait(msecs)
+
+    # Callbacks
+
+    def _on_samples(self, request: int, samples: Samples) -> None:
+        if request != self._request:
+            return
+        self._request = 0
+        self._base = samples
+        self._update_buttons()
+        self.fit_label.setText(f"{len(self.samples())} completed samples to fit on")
+        self.trainable.emit(True)
+
+    def _on_fitted(self, request: int, model: Surrogate) -> None:
+        if request != self._request or self._base is None:
+            return
+        self._request = 0
+        self.model = model
+        self._update_buttons()
+
+        quality = ", ".join(
+            f"{name} {r2:.3f}" for name, r2 in zip(self._base.metrics, model.r2)
+        )
+        self.fit_label.setText(
+            f"{model.kind} fitted on {model.n_samples} samples. "
+            f"Leave-one-out R²: {quality}"
+        )
+        self._predict()
+
+    def _on_fit_failed(self, request: int, msg: str) -> None:
+        if request != self._request:
+            return
+        self._request = 0
+        self.model = None
+        self._update_buttons()
+        self._predict()
+        if self._base is None:
+            self.fit_label.setText(f"Could not read the samples: {msg}")
+            self.trainable.emit(False)
+        else:
+            self.fit_label.setText(f"Could not fit: {msg}")
+
+    def _predict(self) -> None:
+        model, samples = self.model, self._base
+        if model is None or samples is None:
+            self.prediction_table.setRowCount(0)
+            return
+
+        x = np.array([[spin.value() for spin in self._spins]])
+        mean, std = model.predict(x)
+        bounds = self._bounds()
+
+        self.prediction_table.setRowCount(len(samples.metrics))
+        for row, name in enumerate(samples.metrics):
+            lower, upper = bounds.get(name, (None, None))
+            m, s = float(mean[0, row]), float(std[0, row])
+            p = float(feasibility(mean[0, row], std[0, row], lower, upper))
+            texts = [
+                name,
+                f"{m:.6g}",
+                f"{2 * s:.3g}",
+                _format_bounds(lower, upper),
+                f"{100 * p:.0f}%" if lower is not None or upper is not None else "",
+            ]
+            for col, text in enumerate(texts):
+                item = QtWidgets.QTableWidgetItem(text)
+                self.prediction_table.setItem(row, col, item)
+
+            if lower is not None or upper is not None:
+                # Green when surely within the bounds, red when surely not
+                color = QtGui.QColor.fromHsvF(p / 3.0, 0.35, 1.0)
+                self.prediction_table.item(row, 4).setBackground(color)
+
+    def _run_proposals(self) -> None:
+        model, samples = self.model, self._base
+        if model is None or samples is None or self.busy:
+            return
+
+        bounds = self._bounds()
+        lower = [bounds.get(name, (None, None))[0] for name in samples.metrics]
+        upper = [bounds.get(name, (None, None))[1] for name in samples.metrics]
+        # A new candidate set every round
+        round_seed = len(self._state.adaptive or []) + model.n_samples
+        points = propose(model, self.n_spin.value(), lower, upper, seed=round_seed)
+
+        try:
+            runner = self._state.build_point_runner(points)
+        except (OSError, ValueError) as e:
+            self.adaptive_label.setText(str(e))
+            return
+
+        self._results = []
+        self._thread = QtCore.QThread(self)
+        self._worker = StudyWorker(runner)
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._worker.sample_finished.connect(self._on_sample)
+        self._worker.progress.connect(
+            lambda done, total: self.adaptive_label.setText(
+                f"Simulating proposals: {done} of {total}"
+            )
+        )
+        self._worker.finished.connect(self._on_finished)
+        self._worker.failed.connect(self._on_failed)
+
+        self._update_buttons()
+        self._thread.start()
+
+    def _on_sample(self, result: SampleResult) -> None:
+        self._results.append(result)
+
+    def _on_finished(self, completed: int) -> None:
+        assert self._worker is not None and self._base is not None
+        design = self._worker.runner.design
+        ok = [r for r in self._results if r.ok and r.metrics is not None]
+        self._teardown()
+
+        adaptive = self._state.adaptive
+        if adaptive is None or not adaptive.matches(self._base):
+            adaptive = Samples.empty(self._base.names, self._base.metrics)
+        if ok:
+            x = design.points([r.index for r in ok])
+            y = np.array([r.metrics for r in ok], dtype=np.float64)
+            adaptive = adaptive.add(x, y)
+        self._state.adaptive = adaptive
+
+        failed = completed - len(ok)
+        self.adaptive_label.setText(
+            f"{len(ok)} proposals simulated"
+            + (f", {failed} failed or infeasible" if failed else "")
+            + f", {len(adaptive)} adaptive samples in total"
+        )
+        get_logger().info("Adaptive round: %d of %d samples ok", len(ok), completed)
+        self.fit()
+
+    def _on_failed(self, msg: str) -> None:
+        self._teardown()
+        self.adaptive_label.setText(f"Proposals failed: {msg}")
+
+    # Helpers
+
+    def _teardown(self) -> None:
+        assert self._thread is not None
+        self._thread.quit()
+        self._thread.wait()
+        self._thread = None
+        self._worker = None
+        self._update_buttons()
+
+    def _bounds(self) -> Dict[str, tuple]:
+        return {m.name: (m.lower, m.upper) for m in self._state.metrics}
+
+    def _rebuild_params(self) -> None:
+        while self.param_form.rowCount():
+            self.param_form.removeRow(0)
+        self._spins = []
+
+        for r in self._design.ranges if self._design is not None else []:
+            spin = QtWidgets.QDoubleSpinBox()
+            spin.setDecimals(6)
+            spin.setRange(r.lower, r.upper)
+            spin.setSingleStep((r.upper - r.lower) / 100 or 1.0)
+            spin.setValue(0.5 * (r.lower + r.upper))
+            spin.valueChanged.connect(self._predict)
+            self.param_form.addRow(f"{r.name}:", spin)
+            self._spins.append(spin)
+        self._predict()
+
+    def _update_buttons(self) -> None:
+        idle = not self.busy and not self._request
+        self.btn_fit.setEnabled(self._base is not None and idle)
+        self.btn_propose.setEnabled(self.model is not None and idle)
+
+
+def _format_bounds(lower: Optional[float], upper: Optional[float]) -> str:
+    if lower is None and upper is None:
+        return ""
+    lo = f"{lower:g}" if lower is not None else "-∞"
+    hi = f"{upper:g}" if upper is not None else "∞"
+    return f"[{lo}, {hi}]"
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import math
+from typing import List, Optional
+
+import numpy as np
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from app.plot_lod import PlotImage, PlotView, visible
+from app.study.analytics import Bands
+from app.study.results import ResultStore
+from app.workers import PlotRenderer
+
+MARGIN_LEFT = 64
+MARGIN_BOTTOM = 28
+MARGIN = 8
+ZOOM_STEP = 1.25
+BAND_COLOR = QtGui.QColor(255, 127, 14)
+
+
+class TrajectoryPlot(QtWidgets.QWidget):
+    """Overlay of all completed runs of one stored signal.
+
+    The runs are decimated and drawn into an image off the GUI thread for
+    the current view and size. Zooming and panning move the last image
+    right away and request a new level of detail in the background, so
+    painting costs the same for ten runs as for ten thousand.
+
+    Quantile bands, when set, are drawn as lines on top: the median solid,
+    the quartiles dashed and the outer quantiles dotted.
+
+    Wheel zooms time around the cursor, with Ctrl the value axis. Dragging
+    pans, a double click fits the view to the data again.
+    """
+
+    rendered = QtCore.Signal(object)  # PlotImage
+
+    def __init__(self, parent: QtWidgets.QWidget | None = None):
+        super().__init__(parent)
+        self.setMinimumSize(320, 200)
+        self.setMouseTracking(False)
+
+        self._renderer = PlotRenderer(self)
+        self._renderer.finished.connect(self._on_rendered)
+        self._request = 0
+
+        self._store: Optional[ResultStore] = None
+        self._signal: Optional[str] = None
+        self.view: Optional[PlotView] = None
+        self._autoscale = True
+        self._image: Optional[PlotImage] = None
+        self._bands: Optional[Bands] = None
+        self._drag: Optional[QtCore.QPointF] = None
+
+    # Public Helpers
+
+    def set_signal(self, store: Optional[ResultStore], signal: Optional[str]) -> None:
+        self._store = store if signal else None
+        self._signal = signal
+        self._image = None
+        self._bands = None
+        self.reset_view()
+
+    def set_bands(self, bands: Optional[Bands]) -> None:
+        """Overlay quantile bands, ignored unless they are of the shown signal."""
+        if bands is not None and bands.signal != self._signal:
+            return
+        self._bands = bands
+        self.update()
+
+    def reset_view(self) -> None:
+        store = self._store
+        if store is None or not len(store.time):
+            self.view = None
+            self._renderer.cancel()
+            self.update()
+            return
+
+        t0, t1 = float(store.time[0]), float(store.time[-1])
+        if t1 <= t0:
+            t1 = t0 + 1.0
+        self.view = PlotView(t0, t1, 0.0, 1.0)
+        self._autoscale = True
+        self._request_image()
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self._renderer.wait(msecs)
+
+    # Events
+
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        painter = QtGui.QPainter(self)
+        palette = self.palette()
+        painter.fillRect(self.rect(), palette.color(QtGui.QPalette.ColorRole.Base))
+        area = self._area()
+
+        view = self.view
+        if view is None:
+            painter.setPen(palette.color(QtGui.QPalette.ColorRole.PlaceholderText))
+            painter.drawText(
+                self.rect(), QtCore.Qt.AlignmentFlag.AlignCenter, "No trajectories"
+            )
+            return
+
+        image = self._image
+        if image is not None:
+            # The last image stays in place, stretched to the current view
+            # until the new level of detail arrives
+            iv = image.view
+            sx = area.width() / (view.t1 - view.t0)
+            sy = area.height() / (view.y1 - view.y0)
+            target = QtCore.QRectF(
+                area.left() + (iv.t0 - view.t0) * sx,
+                area.top() + (view.y1 - iv.y1) * sy,
+                (iv.t1 - iv.t0) * sx,
+                (iv.y1 - iv.y0) * sy,
+            )
+            painter.save()
+            painter.setClipRect(area)
+            painter.drawImage(target, image.image)
+            painter.restore()
+
+        if self._bands is not None:
+            painter.save()
+            painter.setClipRect(area)
+            self._draw_bands(painter, area, view, self._bands)
+            painter.restore()
+
+        self._draw_axes(painter, area, view)
+
+    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
+        super().resizeEvent(event)
+        if self.view is not None:
+            self._request_image()
+
+    def wheelEvent(self, event: QtGui.QWheelEvent) -> None:
+        view = self.view
+        if view is None:
+            return
+        factor = ZOOM_STEP ** (-event.angleDelta().y() / 120)
+        area = self._area()
+        pos = event.position()
+
+        if event.modifiers() & QtCore.Qt.KeyboardModifier.ControlModifier:
+            y = view.y1 - (pos.y() - area.top()) / area.height() * (view.y1 - view.y0)
+            self._set_view(
+                PlotView(
+                    view.t0,
+                    view.t1,
+                    y - (y - view.y0) * factor,
+                    y + (view.y1 - y) * factor,
+                )
+            )
+        else:
+            t = view.t0 + (pos.x() - area.left()) / area.width() * (view.t1 - view.t0)
+            self._set_view(
+                PlotView(
+                    t - (t - view.t0) * factor,
+                    t + (view.t1 - t) * factor,
+                    view.y0,
+                    view.y1,
+                )
+            )
+        event.accept()
+
+    def mousePressEvent(self, event: QtGui.QMouseEvent) -> None:
+        if event.button() == QtCore.Qt.MouseButton.LeftButton:
+            self._drag = event.position()
+
+    def mouseMoveEvent(self, event: QtGui.QMouseEvent) -> None:
+        view = self.view
+        if self._drag is None or view is None:
+            return
+        delta = event.position() - self._drag
+        self._drag = event.position()
+        area = self._area()
+        dt = delta.x() / area.width() * (view.t1 - view.t0)
+        dy = delta.y() / area.height() * (view.y1 - view.y0)
+        self._set_view(PlotView(view.t0 - dt, view.t1 - dt, view.y0 + dy, view.y1 + dy))
+
+    def mouseReleaseEvent(self, event: QtGui.QMouseEvent) -> None:
+        self._drag = None
+
+    def mouseDoubleClickEvent(self, event: QtGui.QMouseEvent) -> None:
+        self.reset_view()
+
+    # Helpers
+
+    def _area(self) -> QtCore.QRectF:
+        return QtCore.QRectF(self.rect()).adjusted(
+            MARGIN_LEFT, MARGIN, -MARGIN, -MARGIN_BOTTOM
+        )
+
+    def _set_view(self, view: PlotView) -> None:
+        if view.t1 - view.t0 <= 0 or view.y1 - view.y0 <= 0:
+            return
+        self.view = view
+        self._autoscale = False
+        self.update()
+        self._request_image()
+
+    def _request_image(self) -> None:
+        if self._store is None or self._signal is None or self.view is None:
+            return
+        size = self._area().size().toSize()
+        self._request = self._renderer.render(
+            self._store, self._signal, self.view, size, self._autoscale
+        )
+
+    def _on_rendered(self, request: int, image: PlotImage) -> None:
+        if request != self._request:
+            return
+        if self._autoscale:
+            self.view = image.view
+        self._image = image
+        self.update()
+        self.rendered.emit(image)
+
+    def _draw_bands(
+        self, painter: QtGui.QPainter, area: QtCore.QRectF, view: PlotView, bands: Bands
+    ) -> None:
+        w = visible(bands.time, view.t0, view.t1)
+        # About two points per pixel column are plenty for a smooth line
+        step = max(1, (w.stop - w.start) // max(2 * int(area.width()), 1))
+        t = bands.time[w][::step]
+        x = area.left() + (t - view.t0) / (view.t1 - view.t0) * area.width()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+
+        for q, values in zip(bands.quantiles, bands.values):
+            y = (
+                area.bottom()
+                - (values[w][::step] - view.y0) / (view.y1 - view.y0) * area.height()
+            )
+            pen = QtGui.QPen(BAND_COLOR, 2.0 if q == 0.5 else 1.2)
+            if q != 0.5:
+                inner = abs(q - 0.5) < 0.4
+                pen.setStyle(
+                    QtCore.Qt.PenStyle.DashLine if inner else QtCore.Qt.PenStyle.DotLine
+                )
+            painter.setPen(pen)
+            for line in _polylines(x, y):
+                painter.drawPolyline(line)
+
+    def _draw_axes(
+        self, painter: QtGui.QPainter, area: QtCore.QRectF, view: PlotView
+    ) -> None:
+        palette = self.palette()
+        painter.setPen(palette.color(QtGui.QPalette.ColorRole.Text))
+        painter.drawRect(area)
+        metrics = painter.fontMetrics()
+
+        P = QtCore.QPointF
+        for t in _ticks(view.t0, view.t1, max(2, int(area.width() // 80))):
+            x = area.left() + (t - view.t0) / (view.t1 - view.t0) * area.width()
+            painter.drawLine(P(x, area.bottom()), P(x, area.bottom() + 4))
+            label = f"{t:g}"
+            left = x - metrics.horizontalAdvance(label) / 2
+            painter.drawText(P(left, area.bottom() + 6 + metrics.ascent()), label)
+
+        for y in _ticks(view.y0, view.y1, max(2, int(area.height() // 40))):
+            py = area.bottom() - (y - view.y0) / (view.y1 - view.y0) * area.height()
+            painter.drawLine(P(area.left() - 4, py), P(area.left(), py))
+            label = f"{y:.4g}"
+            left = area.left() - 6 - metrics.horizontalAdvance(label)
+            painter.drawText(P(left, py + metrics.ascent() / 2 - 1), label)
+
+
+def _polylines(x: np.ndarray, y: np.ndarray) -> List[QtGui.QPolygonF]:
+    # One line per run of finite points, gaps stay open
+    finite = np.isfinite(y)
+    edges = np.flatnonzero(np.diff(np.r_[False, finite, False].astype(np.int8)))
+    P = QtCore.QPointF
+    return [
+        QtGui.QPolygonF([P(a, b) for a, b in zip(x[i:j].tolist(), y[i:j].tolist())])
+        for i, j in zip(edges[::2], edges[1::2])
+        if j - i > 1
+    ]
+
+
+def _ticks(lo: float, hi: float, n: int) -> List[float]:
+    # Round steps of 1, 2 or 5 times a power of ten
+    raw = (hi - lo) / n
+    if not raw > 0 or not math.isfinite(raw):
+        return []
+    base = 10 ** math.floor(math.log10(raw))
+    step = next(m * base for m in (1, 2, 5, 10) if m * base >= raw)
+    first = math.ceil(lo / step)
+    return [k * step for k in range(first, math.floor(hi / step) + 1)]
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional
+
+import numpy as np
+from PySide6 import QtCore
+from PySide6.QtCore import QModelIndex, QPersistentModelIndex, Qt
+
+from app.schemas.catalog import VariableCatalog
+
+CATEGORIES = (("Parameters", "parameter"), ("Inputs", "input"), ("Outputs", "output"))
+
+# Variables handed to the view per fetch, more follow as it scrolls
+FETCH_BATCH = 1000
+
+_Index = QModelIndex | QPersistentModelIndex
+
+
+class _Node:
+    """A group in the tree. Variables below it stay catalog rows until expanded."""
+
+    __slots__ = (
+        "parent",
+        "row",
+        "label",
+        "depth",
+        "rows",
+        "groups",
+        "leaves",
+        "shown",
+    )
+
+    def __init__(
+        self,
+        parent: Optional[_Node],
+        row: int,
+        label: str,
+        depth: int,
+        rows: np.ndarray,
+    ):
+        self.parent = parent
+        self.row = row
+        self.label = label
+        self.depth = depth  # number of name segments consumed above the children
+        self.rows = rows
+        self.groups: Optional[List[_Node]] = None
+        self.leaves: Optional[np.ndarray] = None
+        self.shown = 0  # leaves the view knows about so far
+
+    @property
+    def built(self) -> bool:
+        return self.groups is not None
+
+    def child_count(self) -> int:
+        assert self.groups is not None
+        return len(self.groups) + self.shown
+
+
+class VariableTreeModel(QtCore.QAbstractItemModel):
+    """Catalog variables grouped by causality and then by dotted name.
+
+    Only the internal pointer of an index refers to a Python object, and that
+    object is the parent group, so variables never get one of their own. A
+    group is split into subgroups the first time the view asks for its
+    children, which keeps opening a model of any size instant. Variables are
+    handed to the view in batches through fetchMore(), so a group or filter
+    result with 100k entries costs no more than one with a thousand.
+
+    With flat=True every variable is listed with its full name directly below
+    its category, which is how filter results are shown.
+    """
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self._catalog: Optional[VariableCatalog] = None
+        self._flat = False
+        self._root = self._make_root(None)
+
+    # ───────────────────────────────────────────────────────────── Contents ──
+
+    def set_catalog(
+        self,
+        catalog: Optional[VariableCatalog],
+        rows: Optional[np.ndarray] = None,
+        flat: bool = False,
+    ) -> None:
+        """Show the catalog, or only the given catalog rows of it."""
+        self.beginResetModel()
+        self._catalog = catalog
+        self._flat = flat
+        self._root = self._make_root(rows)
+        self.endResetModel()
+
+    def catalog_row(self, index: _Index) -> Optional[int]:
+        """The catalog row of a variable, None for groups."""
+        if not index.isValid():
+            return None
+        parent: _Node = index.internalPointer()
+        if parent is self._root:
+            return None
+        n_groups = len(parent.groups)
+        if index.row() < n_groups:
+            return None
+        return int(parent.leaves[index.row() - n_groups])
+
+    # ──────────────────────────────────────────────────────── Model / View ──
+
+    def index(
+        self, row: int, column: int, parent: _Index = QModelIndex()
+    ) -> QModelIndex:
+        node = self._node(parent)
+        if node is None or column != 0 or not 0 <= row < self._children(node):
+            return QModelIndex()
+        return self.createIndex(row, column, node)
+
+    def parent(self, index: _Index) -> QModelIndex:  # type: ignore[override]
+        if not index.isValid():
+            return QModelIndex()
+        node: _Node = index.internalPointer()
+        if node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node.parent)
+
+    def rowCount(self, parent: _Index = QModelIndex()) -> int:
+        node = self._node(parent)
+        return 0 if node is None else self._children(node)
+
+    def columnCount(self, parent: _Index = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: _Index = QModelIndex()) -> bool:
+        node = self._node(parent)
+        if node is None:
+            return False
+        # Answered without splitting the group, which may never be expanded
+        return node.child_count() > 0 if node.built else len(node.rows) > 0
+
+    def canFetchMore(self, parent: _Index) -> bool:
+        node = self._node(parent)
+        return node is not None and node.built and node.shown < len(node.leaves)
+
+    def fetchMore(self, parent: _Index) -> None:
+        node = self._node(parent)
+        if node is None or not node.built:
+            return
+        n = min(FETCH_BATCH, len(node.leaves) - node.shown)
+        if n <= 0:
+            return
+        first = len(node.groups) + node.shown
+        self.beginInsertRows(parent, first, first + n - 1)
+        node.shown += n
+        self.endInsertRows()
+
+    def data(self, index: _Index, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        parent: _Node = index.internalPointer()
+        n_groups = len(parent.groups)
+        if index.row() < n_groups:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return parent.groups[index.row()].label
+            return None
+
+        assert self._catalog is not None
+        row = int(parent.leaves[index.row() - n_groups])
+        name = self._catalog.names[row]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return name if self._flat else _split(name)[-1]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return name
+        if role == Qt.ItemDataRole.UserRole:
+            return name
+        return None
+
+    # ────────────────────────────────────────────────────────────── Helpers ──
+
+    def _make_root(self, rows: Optional[np.ndarray]) -> _Node:
+        root = _Node(None, 0, "", 0, np.empty(0, dtype=np.intp))
+        root.groups = []
+        root.leaves = np.empty(0, dtype=np.intp)
+        if self._catalog is None:
+            return root
+
+        for label, causality in CATEGORIES:
+            members = self._catalog.rows(causality)
+            if rows is not None:
+                members = members[np.isin(members, rows, assume_unique=True)]
+                if not len(members):
+                    continue
+            root.groups.append(_Node(root, len(root.groups), label, 0, members))
+        return root
+
+    def _node(self, index: _Index) -> Optional[_Node]:
+        if not index.isValid():
+            return self._root
+        parent: _Node = index.internalPointer()
+        if index.row() < len(parent.groups):
+            return parent.groups[index.row()]
+        return None  # a variable
+
+    def _children(self, node: _Node) -> int:
+        if not node.built:
+            self._build(node)
+        return node.child_count()
+
+    def _build(self, node: _Node) -> None:
+        assert self._catalog is not None
+        node.groups = []
+
+        if self._flat:
+            node.leaves = node.rows
+            node.shown = min(len(node.leaves), FETCH_BATCH)
+            return
+
+        names = self._catalog.names
+        depth = node.depth
+        members: dict[str, List[int]] = {}
+        leaves: List[int] = []
+        for row in node.rows.tolist():
+            parts = _split(names[row])
+            if len(parts) > depth + 1:
+                members.setdefault(parts[depth], []).append(row)
+            else:
+                leaves.append(row)
+
+        for label, rows in members.items():
+            group = _Node(node, len(node.groups), label, depth + 1, np.array(rows))
+            node.groups.append(group)
+        node.leaves = np.array(leaves, dtype=np.intp)
+        node.shown = min(len(node.leaves), FETCH_BATCH)
+
+
+def _split(name: str) -> List[str]:
+    """Dotted name segments, dots inside der(...) or [...] do not split."""
+    if "(" not in name and "[" not in name:
+        return name.split(".")
+
+    parts, level, start = [], 0, 0
+    for i, ch in enumerate(name):
+        if ch in "([":
+            level += 1
+        elif ch in ")]":
+            level -= 1
+        elif ch == "." and level == 0:
+            parts.append(name[start:i])
+            start = i + 1
+    parts.append(name[start:])
+    return parts
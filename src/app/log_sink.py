@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+from app.model_cache import cache_dir
+
+LOGGER = "fmu_insight"
+
+# Lines kept in memory for the log view, older ones only remain in the file
+MAX_LINES = 5_000
+LOG_FILE = "fmu_insight.log"
+LOG_FILE_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+LEVELS = {
+    "Debug": logging.DEBUG,
+    "Info": logging.INFO,
+    "Warning": logging.WARNING,
+    "Error": logging.ERROR,
+}
+
+Line = Tuple[int, str]  # level, formatted message
+
+
+def get_logger() -> logging.Logger:
+    return logging.getLogger(LOGGER)
+
+
+def log_dir() -> Path:
+    return cache_dir() / "logs"
+
+
+class LogBuffer(logging.Handler):
+    """Recent log lines in a ring buffer, plus those not shown yet.
+
+    Any thread may log, the GUI collects new lines in batches with drain().
+    Both buffers are bounded: when nobody drains, the oldest pending lines
+    are dropped and counted instead of piling up.
+    """
+
+    def __init__(self, capacity: int = MAX_LINES, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.lines: Deque[Line] = deque(maxlen=capacity)
+        self._pending: Deque[Line] = deque(maxlen=capacity)
+        self._dropped = 0
+        self._guard = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = (record.levelno, self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+
+        with self._guard:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1
+            self._pending.append(line)
+            self.lines.append(line)
+
+    def drain(self) -> Tuple[List[Line], int]:
+        """Lines logged since the last call and how many were dropped."""
+        with self._guard:
+            lines = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+        return lines, dropped
+
+    def recent(self, level: int = logging.NOTSET) -> List[str]:
+        with self._guard:
+            return [text for lvl, text in self.lines if lvl >= level]
+
+
+def setup_logging(
+    buffer: Optional[LogBuffer] = None, path: Optional[Path] = None
+) -> logging.Logger:
+    """Log everything to a rotating file and, if given, to buffer.
+
+    Calling it again replaces the handlers installed before.
+    """
+    logger = get_logger()
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    path = path or log_dir() / LOG_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = RotatingFileHandler(
+        path,
+        maxBytes=LOG_FILE_BYTES,
+        backupCount=LOG_FILE_BACKUPS,
+        encoding="utf-8",
+        delay=True,
+    )
+    file_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)-7s %(threadName)s: %(message)s")
+    )
+    logger.addHandler(file_handler)
+
+    if buffer is not None:
+        buffer.setFormatter(logging.Formatter("%(asctime)s %(message)s", "%H:%M:%S"))
+        logger.addHandler(buffer)
+
+    return logger
+
+
+def log_file(logger: Optional[logging.Logger] = None) -> Optional[Path]:
+    """Path of the current log file, None when logging was not set up."""
+    for handler in (logger or get_logger()).handlers:
+        if isinstance(handler, RotatingFileHandler):
+            return Path(handler.baseFilename)
+    return None
@@ -1,14 +1,25 @@
+import logging
+import shutil
+import tempfile
 from pathlib import Path
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
+from app import study_file
 from app.components.doe_setup import DOESetup
 from app.components.input_editor import InputEditor
+from app.components.log_view import LogView
 from app.components.metrics_setup import MetricsSetup
 from app.components.model_explorer import ModelExplorer
 from app.components.param_editor import ParamEditor
 from app.components.result_view import ResultsView
+from app.components.surrogate_view import SurrogateView
+from app.log_sink import LogBuffer, setup_logging
+from app.model_cache import ParsedFmu
 from app.state import AppState
+from app.study.doe import Design
+from app.study.telemetry import RunTelemetry, format_eta
+from app.workers import FmuLoader, StudyWorker
 
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -18,12 +29,35 @@ class MainWindow(QtWidgets.QMainWindow):
         self.setWindowTitle("FMU Insight")
         self.setMinimumSize(1200, 800)
 
+        # Messages from any thread, shown in batches by the log dock
+        self.log_buffer = LogBuffer()
+        self._logger = setup_logging(self.log_buffer)
+
         self._build_menu()
         self._build_toolbar()
         self._build_docks()
         self._build_central_tabs()
         self._build_status_bar()
 
+        self.model_explorer.variable_selected.connect(self.param_editor.set_variable)
+
+        self._study_thread: QtCore.QThread | None = None
+        self._study_worker: StudyWorker | None = None
+
+        # FMUs are parsed off the GUI thread, 0 while nothing is loading
+        self.fmu_loader = FmuLoader(self)
+        self._loading = 0
+        # Study file whose FMU is loading, applied once the FMU is parsed
+        self._opening: Path | None = None
+        self.fmu_loader.progress.connect(self._on_load_progress)
+        self.fmu_loader.catalog_ready.connect(self._on_catalog_ready)
+        self.fmu_loader.info_ready.connect(self._on_info_ready)
+        self.fmu_loader.failed.connect(self._on_load_failed)
+        # Timings of the last run, for Export Run Profile
+        self._telemetry: RunTelemetry | None = None
+        # Result store of an unsaved run, owned and deleted by the window
+        self._scratch: Path | None = None
+
     # ─────────────────────────────────────────────────────────────────── Menu ──
 
     def _build_menu(self) -> None:
@@ -31,10 +65,17 @@ class MainWindow(QtWidgets.QMainWindow):
         file_menu = mbar.addMenu("&File")
         act_open = QtGui.QAction("Open FMU…", self)
         act_open.triggered.connect(self.load_fmu)
+        act_open_study = QtGui.QAction("Open Study…", self)
+        act_open_study.triggered.connect(self.open_study)
         act_save = QtGui.QAction("Save Study…", self)
+        act_save.triggered.connect(self.save_study)
+        act_profile = QtGui.QAction("Export Run Profile…", self)
+        act_profile.triggered.connect(self.export_profile)
         act_quit = QtGui.QAction("Quit", self)
         act_quit.triggered.connect(QtWidgets.QApplication.quit)
-        file_menu.addActions([act_open, act_save])
+        file_menu.addActions([act_open, act_open_study, act_save])
+        file_menu.addSeparator()
+        file_menu.addAction(act_profile)
         file_menu.addSeparator()
         file_menu.addAction(act_quit)
 
@@ -67,10 +108,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self.addDockWidget(QtCore.Qt.DockWidgetArea.LeftDockWidgetArea, explorer_dock)
 
         # Log dock (bottom)
-        self.log_edit = QtWidgets.QTextEdit()
-        self.log_edit.setReadOnly(True)
+        self.log_view = LogView(self.log_buffer)
         log_dock = QtWidgets.QDockWidget("Log", self)
-        log_dock.setWidget(self.log_edit)
+        log_dock.setWidget(self.log_view)
         self.addDockWidget(QtCore.Qt.DockWidgetArea.BottomDockWidgetArea, log_dock)
         log_dock.hide()
 
@@ -86,22 +126,35 @@ class MainWindow(QtWidgets.QMainWindow):
         self.metrics_tab = MetricsSetup(self.state)
         self.doe_tab = DOESetup(self.state)
         self.results_tab = ResultsView(self.state)
+        self.surrogate_tab = SurrogateView(self.state)
 
         tabs.addTab(self.param_editor, "Parameter Editor")
         tabs.addTab(self.input_tab, "Input Signals")
         tabs.addTab(self.metrics_tab, "Metrics Setup")
         tabs.addTab(self.doe_tab, "DOE Setup")
         tabs.addTab(self.results_tab, "Results")
+        tabs.addTab(self.surrogate_tab, "Surrogate")
 
         # Disable Results until a run is completed
         tabs.setTabEnabled(tabs.indexOf(self.results_tab), False)
+        tabs.setTabEnabled(tabs.indexOf(self.surrogate_tab), False)
+        self.surrogate_tab.trainable.connect(
+            lambda ok: tabs.setTabEnabled(tabs.indexOf(self.surrogate_tab), ok)
+        )
         self._tabs = tabs
 
     # ────────────────────────────────────────────────────────── Status bar ──
 
     def _build_status_bar(self) -> None:
         self.progress = QtWidgets.QProgressBar(maximum=100)
+        self.rate_label = QtWidgets.QLabel("")
+        self.cancel_load_button = QtWidgets.QToolButton(text="Cancel")
+        self.cancel_load_button.setToolTip("Stop loading the FMU")
+        self.cancel_load_button.clicked.connect(self.cancel_load)
+        self.cancel_load_button.hide()
+        self.statusBar().addPermanentWidget(self.rate_label)
         self.statusBar().addPermanentWidget(self.progress)
+        self.statusBar().addPermanentWidget(self.cancel_load_button)
         self.statusBar().showMessage("Ready", timeout=10000)
 
     # ────────────────────────────────────────────────────────── Callbacks ──
@@ -115,29 +168,320 @@ class MainWindow(QtWidgets.QMainWindow):
         )
 
         if file_path:
-            info = self.state.load_fmu(Path(file_path), return_info=True)
-            assert info is not None, "Could not load FMU"
+            self.open_fmu(Path(file_path))
+
+    def open_study(self) -> None:
+        file_path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self,
+            caption="Open study",
+            dir="",
+            filter="Study files (*.toml)",
+        )
+
+        if file_path:
+            self.open_study_file(Path(file_path))
+
+    def open_study_file(self, path: Path) -> None:
+        """Open a saved study, its FMU is loaded in the background first."""
+        try:
+            fmu_path = study_file.study_fmu(path)
+        except (OSError, ValueError, KeyError) as e:
+            self.update_status(f"Could not open the study: {e}")
+            return
 
-            self.update_status("Loaded FMU")
-            self.log("-------------------------------------")
-            self.log(info)
-            self.log("-------------------------------------")
+        self.open_fmu(fmu_path, study=path)
 
-            self.model_explorer.rebuild_tree()
-            self.log("Rebuilt model_explorer tree")
+    def open_fmu(self, fmu_path: Path, study: Path | None = None) -> None:
+        """Start loading an FMU, the window stays usable meanwhile.
+
+        With study, the saved study is opened once the FMU is loaded.
+        """
+        if self._study_thread is not None:
+            self.update_status("Stop the study before loading another FMU")
+            return
+        if self.surrogate_tab.busy:
+            self.update_status("Wait for the adaptive samples to finish")
+            return
+
+        self._loading = self.fmu_loader.load(fmu_path)
+        self._opening = study
+        self.progress.setValue(0)
+        self.cancel_load_button.show()
+        self.update_status(f"Loading {fmu_path.name}…")
+
+    def cancel_load(self) -> None:
+        if not self._loading:
+            return
+        self.fmu_loader.cancel()
+        self._finish_loading()
+        self.update_status("Loading cancelled")
 
     def run_study(self) -> None:
-        # TODO: spawn worker processes, update progress, enable results tab
-        self.log("Run Study - not implemented yet")
+        if self._study_thread is not None:
+            self.log("A study is already running")
+            return
+        if self.surrogate_tab.busy:
+            self.update_status("Wait for the adaptive samples to finish")
+            return
+        if self._loading:
+            self.update_status("Wait for the FMU to load")
+            return
+
+        if self.state.fmu_path is None:
+            self.update_status("Load an FMU first")
+            return
+
+        if not self.state.has_study():
+            self.update_status("Select the parameters to study first")
+            return
+
+        # A saved study checkpoints next to its file and resumes from there
+        saved = self.state.results_root
+        root = saved or Path(tempfile.mkdtemp(prefix="fmu_insight_"))
+        try:
+            runner = self.state.build_runner(root, resume=saved is not None)
+        except (OSError, ValueError) as e:
+            if saved is None:
+                shutil.rmtree(root, ignore_errors=True)
+            self._discard_scratch()
+            self.update_status(str(e))
+            return
+        # The new store replaces the one of an earlier unsaved run
+        self._discard_scratch()
+        if saved is None:
+            self._scratch = root
+        design = runner.design
+        assert runner.store is not None
+        indices = runner.store.missing()
+        done = len(design) - len(indices)
+        if done:
+            self.log(f"Resuming study, {done} samples done earlier")
+
+        self._study_thread = QtCore.QThread(self)
+        self._study_worker = StudyWorker(runner, indices, total=len(indices))
+        self._study_worker.moveToThread(self._study_thread)
+
+        self._study_thread.started.connect(self._study_worker.run)
+        self._study_worker.progress.connect(self._on_study_progress)
+        self._study_worker.finished.connect(self._on_study_finished)
+        self._study_worker.failed.connect(self._on_study_failed)
+
+        self.progress.setValue(0)
+        self.rate_label.setText("")
+        self.update_status(
+            f"Running {len(indices)} {design.method} samples on {runner.n_workers} workers"
+        )
+        self._study_thread.start()
+
+    def save_study(self) -> None:
+        if self.state.fmu_path is None:
+            self.update_status("Load an FMU first")
+            return
+        if self._study_thread is not None:
+            self.update_status("Stop the study before saving it")
+            return
+        if self._loading:
+            self.update_status("Wait for the FMU to load")
+            return
+
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self,
+            caption="Save study",
+            dir=str(self.state.study_path or self.state.fmu_path.with_suffix(".toml")),
+            filter="Study files (*.toml)",
+        )
+        if not file_path:
+            return
+
+        try:
+            study_file.save_study(self.state, Path(file_path))
+        except (OSError, ValueError) as e:
+            self.update_status(f"Could not save the study: {e}")
+            return
+
+        # Results of an unsaved run were copied next to the study file
+        self._discard_scratch()
+        self.update_status(f"Saved study to {file_path}")
+        self.log(f"Study results are kept in {self.state.results_root}")
+
+    def export_profile(self) -> None:
+        if self._telemetry is None:
+            self.update_status("Run a study first")
+            return
+
+        file_path, selected = QtWidgets.QFileDialog.getSaveFileName(
+            self,
+            caption="Export run profile",
+            dir="run_profile.json",
+            filter="Chrome trace (*.json);;Timing summary (*.json)",
+        )
+        if not file_path:
+            return
+
+        try:
+            if selected.startswith("Chrome"):
+                self._telemetry.save_trace(Path(file_path))
+            else:
+                self._telemetry.save(Path(file_path))
+        except OSError as e:
+            self.update_status(f"Could not export the profile: {e}")
+            return
+        self.update_status(f"Exported run profile to {file_path}")
 
     def stop_study(self) -> None:
-        # TODO: Stop
-        self.log("Stop Study - not implemented yet")
+        if self._study_worker is None:
+            return
+
+        self._study_worker.runner.stop()
+        self.update_status("Stopping study…")
+
+    def _on_load_progress(self, request: int, message: str, percent: int) -> None:
+        if request == self._loading:
+            self.progress.setValue(percent)
+            self.statusBar().showMessage(f"{message}…")
+
+    def _on_catalog_ready(self, request: int, fmu_path: Path, fmu: ParsedFmu) -> None:
+        if request != self._loading:
+            return
+
+        study, self._opening = self._opening, None
+        if study is not None:
+            try:
+                opened = study_file.load_study(study, fmu)
+            except (OSError, ValueError, KeyError) as e:
+                # The current study stays open
+                self._finish_loading()
+                self.update_status(f"Could not open the study: {e}")
+                return
+
+        # A new model or study closes the previous one and its results
+        self._close_results()
+        if study is None:
+            self.state.set_fmu(fmu_path, fmu)
+            self.update_status(f"Loaded {fmu_path.name}, reading the model info…")
+        else:
+            self.state.assign(opened)
+            self.update_status(f"Opened {study.name}, reading the model info…")
+
+        self.model_explorer.rebuild_tree()
+        self.log("Rebuilt model_explorer tree")
+        self.param_editor.set_variable(None)
+        self.input_tab.rebuild_inputs()
+        if study is None:
+            self.metrics_tab.rebuild_signals()
+            self._show_results(None, False)
+            return
+
+        self.metrics_tab.show_metrics()
+        self.doe_tab.load_settings()
+        store = self.state.results
+        missing = len(store.missing()) if store is not None else 0
+        done = store is not None and missing < store.n_samples
+        self._show_results(self.state.build_design() if done else None, done)
+        if missing:
+            self.log(f"{missing} samples of the study still to run, Run Study resumes")
+
+    def _on_info_ready(self, request: int, info: str) -> None:
+        if request != self._loading:
+            return
+        self._finish_loading()
+        self.update_status("Loaded FMU")
+        self.log("-------------------------------------")
+        self.log(info)
+        self.log("-------------------------------------")
+
+    def _on_load_failed(self, request: int, msg: str) -> None:
+        if request != self._loading:
+            return
+        self._finish_loading()
+        self.update_status("Could not load the FMU")
+        self.log(f"Could not load the FMU: {msg}", logging.ERROR)
+
+    def _finish_loading(self) -> None:
+        self._loading = 0
+        self._opening = None
+        self.progress.reset()
+        self.cancel_load_button.hide()
+
+    def _on_study_progress(self, done: int, total: int) -> None:
+        self.progress.setValue(100 * done // max(total, 1))
+        worker = self._study_worker
+        telemetry = worker.runner.telemetry if worker is not None else None
+        if telemetry is not None:
+            self.rate_label.setText(
+                f"{telemetry.rate():.2f} samples/s · ETA {format_eta(telemetry.eta())}"
+            )
+
+    def _on_study_finished(self, completed: int) -> None:
+        runner = self._study_worker.runner if self._study_worker is not None else None
+        cancelled = runner is not None and runner.cancelled
+        self._teardown_study()
+
+        if runner is not None and runner.cache_hits:
+            self.log(f"{runner.cache_hits} samples reused from the simulation cache")
+        if runner is not None and runner.telemetry is not None:
+            self._telemetry = runner.telemetry
+            self.log(self._telemetry.report())
+            self.rate_label.setText(f"{self._telemetry.rate():.2f} samples/s")
+
+        if cancelled:
+            self.update_status(f"Study stopped after {completed} samples")
+        else:
+            self.update_status(f"Study finished: {completed} samples")
+
+        design = runner.design if runner is not None else None
+        self._show_results(design, completed > 0)
+
+    def _show_results(self, design: Design | None, enabled: bool) -> None:
+        self.results_tab.refresh(design)
+        self._tabs.setTabEnabled(self._tabs.indexOf(self.results_tab), enabled)
+        # Enabled once the surrogate tab has read samples to fit on
+        self._tabs.setTabEnabled(self._tabs.indexOf(self.surrogate_tab), False)
+        self.surrogate_tab.set_design(design)
+
+    def _on_study_failed(self, msg: str) -> None:
+        self._teardown_study()
+        self.update_status("Study failed")
+        self.log(f"Study failed: {msg}", logging.ERROR)
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        worker = self._study_worker
+        if worker is not None:
+            # Samples in flight still write to the store, let them finish
+            worker.finished.disconnect(self._on_study_finished)
+            worker.failed.disconnect(self._on_study_failed)
+            worker.runner.stop()
+            self._teardown_study()
+        self._close_results()
+        super().closeEvent(event)
+
+    def _close_results(self) -> None:
+        """Stop showing the current results, deleting them if never saved."""
+        self.state.results = None
+        self.results_tab.refresh(None)
+        self._tabs.setTabEnabled(self._tabs.indexOf(self.results_tab), False)
+        self._discard_scratch()
+
+    def _discard_scratch(self) -> None:
+        # Kept while it holds the results on display
+        scratch = self._scratch
+        store = self.state.results
+        if scratch is None or (store is not None and store.root == scratch):
+            return
+        self._scratch = None
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    def _teardown_study(self) -> None:
+        assert self._study_thread is not None
+        self._study_thread.quit()
+        self._study_thread.wait()
+        self._study_thread = None
+        self._study_worker = None
 
     # ─────────────────────────────────────────────────────────── Helpers ──
 
     def update_status(self, msg: str):
         self.statusBar().showMessage(msg, timeout=10000)
 
-    def log(self, msg: str) -> None:
-        self.log_edit.append(msg)
+    def log(self, msg: str, level: int = logging.INFO) -> None:
+        self._logger.log(level, msg)
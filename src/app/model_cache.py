@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import gc
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from app.schemas.catalog import VariableCatalog
+
+if TYPE_CHECKING:
+    from fmpy.model_description import ModelDescription
+
+# fmpy is only imported when an archive actually has to be parsed, a cached
+# catalog is read without it
+
+# Bump when the pickled layout changes, old entries are then simply ignored
+CACHE_VERSION = 3
+PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+def cache_dir() -> Path:
+    """Per-user cache directory, overridable with FMU_INSIGHT_CACHE."""
+    if "FMU_INSIGHT_CACHE" in os.environ:
+        root = Path(os.environ["FMU_INSIGHT_CACHE"])
+    elif sys.platform == "win32":
+        root = (
+            Path(os.environ.get("LOCALAPPDATA", Path.home())) / "FMU Insight" / "cache"
+        )
+    else:
+        root = (
+            Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+            / "fmu_insight"
+        )
+    return root
+
+
+class DefaultExperiment(NamedTuple):
+    # Same attribute names as fmpy's, values as written in the XML
+    startTime: Optional[str] = None
+    stopTime: Optional[str] = None
+    tolerance: Optional[str] = None
+    stepSize: Optional[str] = None
+
+
+@dataclass
+class ParsedFmu:
+    """Everything the GUI needs from modelDescription.xml, without the XML objects."""
+
+    fmi_version: str
+    fmi_types: List[str]
+    model_name: str
+    description: Optional[str]
+    platforms: List[str]
+    n_states: int
+    n_event_indicators: int
+    generation_tool: Optional[str]
+    generation_date: Optional[str]
+    default_experiment: Optional[DefaultExperiment]
+    catalog: VariableCatalog = field(repr=False)
+
+    @classmethod
+    def from_model_description(
+        cls, md: ModelDescription, platforms: List[str]
+    ) -> ParsedFmu:
+        ex = md.defaultExperiment
+        fmi_types = []
+        if md.modelExchange is not None:
+            fmi_types.append("Model Exchange")
+        if md.coSimulation is not None:
+            fmi_types.append("Co-Simulation")
+
+        return cls(
+            fmi_version=md.fmiVersion,
+            fmi_types=fmi_types,
+            model_name=md.modelName,
+            description=md.description,
+            platforms=platforms,
+            n_states=md.numberOfContinuousStates,
+            n_event_indicators=md.numberOfEventIndicators,
+            generation_tool=md.generationTool,
+            generation_date=md.generationDateAndTime,
+            default_experiment=DefaultExperiment(
+                ex.startTime, ex.stopTime, ex.tolerance, ex.stepSize
+            )
+            if ex is not None
+            else None,
+            catalog=VariableCatalog.from_variables(md.modelVariables),
+        )
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    # Building 100k+ small objects otherwise triggers a full collection cascade
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _key(fmu_path: Path, *extra: str) -> str:
+    # Path, size and mtime identify an unchanged archive without reading it
+    st = fmu_path.stat()
+    raw = f"{CACHE_VERSION}|{fmu_path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+    raw = "|".join([raw, *extra])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def parse_fmu(
+    fmu_path: Path,
+    use_cache: bool = True,
+    progress: Callable[[str, int], None] = lambda message, percent: None,
+) -> ParsedFmu:
+    """Parse modelDescription.xml once, reusing the on-disk cache when possible.
+
+    Only the compact catalog is loaded back for the GUI, the full model
+    description is cached next to it for load_model_description().
+    progress is called with a message and a percentage as each stage starts,
+    an exception raised from it abandons the parse.
+    """
+    fmu_path = Path(fmu_path)
+    key = _key(fmu_path)
+
+    progress("Reading the model cache", 0)
+    parsed = _read(_entry(key, "catalog")) if use_cache else None
+    if parsed is None:
+        from fmpy import supported_platforms
+
+        progress("Parsing modelDescription.xml", 10)
+        md = load_model_description(fmu_path, use_cache)
+        progress("Building the variable catalog", 60)
+        with gc_paused():
+            parsed = ParsedFmu.from_model_description(
+                md, supported_platforms(str(fmu_path))
+            )
+        if use_cache:
+            _write_atomic(_entry(key, "catalog"), pickle.dumps(parsed, PROTOCOL))
+
+    return parsed
+
+
+def load_model_description(fmu_path: Path, use_cache: bool = True) -> ModelDescription:
+    """The full fmpy model description needed to simulate, cached like parse_fmu()."""
+    import fmpy
+    from fmpy import read_model_description
+
+    fmu_path = Path(fmu_path)
+    # Pickled fmpy objects, only valid for the fmpy version that made them
+    entry = _entry(_key(fmu_path, fmpy.__version__), "model")
+
+    md = _read(entry) if use_cache else None
+    if md is None:
+        with gc_paused():
+            md = read_model_description(str(fmu_path))
+        if use_cache:
+            _write_atomic(entry, pickle.dumps(md, PROTOCOL))
+
+    return md
+
+
+def fmu_digest(fmu_path: Path) -> str:
+    """sha256 of the archive content, remembered per path, size and mtime."""
+    fmu_path = Path(fmu_path)
+    entry = cache_dir() / "digests" / f"{_key(fmu_path)}.txt"
+
+    try:
+        return entry.read_text()
+    except OSError:
+        pass
+
+    h = hashlib.sha256()
+    with fmu_path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()
+
+    _write_atomic(entry, digest.encode())
+    return digest
+
+
+def _entry(key: str, kind: str) -> Path:
+    return cache_dir() / "models" / f"{key}.{kind}.pickle"
+
+
+def _read(entry: Path) -> Any:
+    if not entry.is_file():
+        return None
+    try:
+        with entry.open("rb") as f, gc_paused():
+            return pickle.load(f)
+    except Exception:
+        return None  # Stale or truncated entry, parse again
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # The cache is an optimization only
+
+
+def format_info(parsed: ParsedFmu, causalities: Sequence[str]) -> str:
+    """Same text as fmpy.util.fmu_info, without opening the archive again."""
+    catalog = parsed.catalog
+
+    lines = [
+        f"""
+Model Info
+
+  FMI Version        {parsed.fmi_version}
+  FMI Type           {", ".join(parsed.fmi_types)}
+  Model Name         {parsed.model_name}
+  Description        {parsed.description}
+  Platforms          {", ".join(parsed.platforms)}
+  Continuous States  {parsed.n_states}
+  Event Indicators   {parsed.n_event_indicators}
+  Variables          {len(catalog)}
+  Generation Tool    {parsed.generation_tool}
+  Generation Date    {parsed.generation_date}
+"""
+    ]
+
+    if parsed.default_experiment:
+        ex = parsed.default_experiment
+        lines.append("Default Experiment")
+        lines.append("")
+        if ex.startTime:
+            lines.append(f"  Start Time         {ex.startTime}")
+        if ex.stopTime:
+            lines.append(f"  Stop Time          {ex.stopTime}")
+        if ex.tolerance:
+            lines.append(f"  Tolerance          {ex.tolerance}")
+        if ex.stepSize:
+            lines.append(f"  Step Size          {ex.stepSize}")
+
+    lines.append("")
+    lines.append("Variables (%s)" % ", ".join(causalities))
+    lines.append("")
+    lines.append(
+        "  Name               Causality              Start Value  Unit     Description"
+    )
+    for row in catalog.rows(*causalities).tolist():
+        name = catalog.names[row]
+        if len(name) > 18:
+            name = "..." + name[-15:]
+
+        start = catalog.start[row]
+        args = [
+            "" if s is None else str(s)
+            for s in [
+                name,
+                catalog.causality_of(row),
+                start,
+                catalog.unit_of(row),
+                catalog.description[row],
+            ]
+        ]
+        lines.append("  {:18} {:10} {:>23}  {:8} {}".format(*args))
+
+    return "\n".join(lines)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+_SEP = 10  # "\n", never part of a variable name
+
+
+class NameIndex:
+    """Case-insensitive substring search over variable names.
+
+    All names are lowercased into one separator-joined byte string and the
+    position of every byte trigram starting inside a name is indexed, sorted
+    by trigram. A match of a longer query is a position p where each of its
+    trigrams occurs at p + offset, so candidates of the rarest trigram are
+    checked against the others with a position mask and nothing is compared
+    in Python. Queries of one or two bytes are the contiguous range of
+    trigrams starting with them, which is why separators pad the text.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        self.n_names = len(names)
+        text = ("\n".join(names) + "\n\n\n").lower().encode()
+        data = np.frombuffer(text, dtype=np.uint8)
+
+        sep = data == _SEP
+        ends = np.flatnonzero(sep)[: self.n_names] + 1
+        self._starts = np.concatenate(([0], ends)).astype(np.uint32)
+
+        codes = (
+            data[:-2].astype(np.uint32) << 16
+            | data[1:-1].astype(np.uint32) << 8
+            | data[2:].astype(np.uint32)
+        )
+        positions = np.flatnonzero(~sep[:-2]).astype(np.uint32)
+        codes = codes[positions]
+
+        # Stable, so positions ascend within every trigram
+        order = np.argsort(codes, kind="stable")
+        self._codes = codes[order]
+        self._positions = positions[order]
+
+    def search(self, query: str) -> np.ndarray:
+        """Sorted rows of all names containing query."""
+        q = query.lower().encode()
+        if not q:
+            return np.arange(self.n_names)
+        if len(q) < 3:
+            # All trigrams with this prefix form one contiguous code range
+            lo = int.from_bytes(q.ljust(3, b"\0"), "big")
+            return self._rows(self._range(lo, lo + (1 << 8 * (3 - len(q)))))
+
+        # Offsets of the trigrams covering q, the last one aligned to the end
+        offsets = sorted({*range(0, len(q) - 2, 3), len(q) - 3})
+        postings = sorted(
+            ((self._range(*_gram(q, k)), k) for k in offsets), key=lambda p: len(p[0])
+        )
+
+        positions, k0 = postings[0]
+        starts = positions[positions >= k0] - np.uint32(k0)
+        for posting, k in postings[1:]:
+            if not len(starts) or not len(posting):
+                starts = starts[:0]
+                break
+            # Postings are sorted, membership is a binary search per candidate
+            wanted = starts + np.uint32(k)
+            found = np.searchsorted(posting, wanted)
+            found[found == len(posting)] = 0
+            starts = starts[posting[found] == wanted]
+
+        return self._rows(starts)
+
+    def _rows(self, positions: np.ndarray) -> np.ndarray:
+        rows = np.searchsorted(self._starts, positions, side="right") - 1
+        mask = np.zeros(self.n_names, dtype=bool)
+        mask[rows] = True
+        return np.flatnonzero(mask)
+
+    def _range(self, lo: int, hi: int) -> np.ndarray:
+        # Same dtype as the codes, or numpy would convert the whole array
+        i, j = np.searchsorted(self._codes, np.array([lo, hi], dtype=np.uint32))
+        return self._positions[i:j]
+
+
+def _gram(q: bytes, k: int) -> tuple[int, int]:
+    code = int.from_bytes(q[k : k + 3], "big")
+    return code, code + 1
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from PySide6 import QtCore, QtGui
+
+from app.study.results import ResultStore
+
+# Samples per block read from the store, a block holds at most this many values
+BLOCK_VALUES = 1 << 22
+
+
+@dataclass(frozen=True)
+class PlotView:
+    """Visible data range of a plot."""
+
+    t0: float
+    t1: float
+    y0: float
+    y1: float
+
+
+@dataclass
+class PlotImage:
+    """Trajectories of one signal rendered for a view, transparent background."""
+
+    image: QtGui.QImage
+    view: PlotView
+    n_runs: int
+    n_points: int  # read per run, before decimation
+
+
+def visible(time: np.ndarray, t0: float, t1: float) -> slice:
+    """Grid points inside [t0, t1] plus one on either side, so lines reach the edges."""
+    i0 = max(int(np.searchsorted(time, t0, side="right")) - 1, 0)
+    i1 = min(int(np.searchsorted(time, t1, side="left")) + 1, len(time))
+    return slice(i0, i1)
+
+
+def decimate(
+    t: np.ndarray, block: np.ndarray, width: int, t0: float, t1: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Min and max of every row per pixel column, rows share the time points t.
+
+    Returns (lo, hi), both (rows, width). A column holds the extremes of the
+    points that fall into it and the line through its center, so peaks of
+    any width stay visible and columns between sparse points are filled.
+    Columns without data are NaN, as is the unused tail of a run cut short.
+    All rows are reduced at once, there is no loop over runs.
+    """
+    rows = len(block)
+    scale = width / (t1 - t0)
+    lo = np.full((rows, width), np.nan)
+    if len(t) == 0:
+        return lo, lo.copy()
+
+    # The line at the column centers, one shared index and weight per column
+    centers = t0 + (np.arange(width) + 0.5) / scale
+    inside = (centers >= t[0]) & (centers <= t[-1])
+    c = centers[inside]
+    i = np.clip(np.searchsorted(t, c, side="right") - 1, 0, max(len(t) - 2, 0))
+    if len(t) > 1:
+        dt = t[i + 1] - t[i]
+        w = np.divide(c - t[i], dt, out=np.zeros_like(c), where=dt > 0)
+        lo[:, inside] = block[:, i] * (1 - w) + block[:, i + 1] * w
+    else:
+        lo[:, inside] = block[:, i]
+    hi = lo.copy()
+
+    # Extremes of the points inside each column, fmin/fmax skip NaN
+    px = np.floor((t - t0) * scale)
+    sel = np.flatnonzero((px >= 0) & (px < width))
+    if len(sel):
+        starts = sel[np.r_[True, px[sel][1:] != px[sel][:-1]]]
+        cols = px[starts].astype(np.intp)
+        data = block[:, sel[0] : sel[-1] + 1]
+        offsets = starts - sel[0]
+        lo[:, cols] = np.fmin(lo[:, cols], np.fmin.reduceat(data, offsets, axis=1))
+        hi[:, cols] = np.fmax(hi[:, cols], np.fmax.reduceat(data, offsets, axis=1))
+
+    return lo, hi
+
+
+def rasterize(
+    lo: np.ndarray, hi: np.ndarray, view: PlotView, height: int
+) -> np.ndarray:
+    """How many runs cover each pixel, (height, width) with row 0 at the top.
+
+    Each run covers the pixel span of its column range, joined to the range
+    of the previous column so the drawn line is connected. Spans are summed
+    with a difference image, the cost does not depend on how many runs
+    overlap a pixel.
+    """
+    width = lo.shape[1]
+    sy = height / (view.y1 - view.y0)
+    top = (view.y1 - hi) * sy
+    bottom = (view.y1 - lo) * sy
+    drawn = np.isfinite(top) & np.isfinite(bottom)
+
+    # Connect to the neighbour on the left
+    top[:, 1:] = np.fmin(top[:, 1:], bottom[:, :-1])
+    bottom[:, 1:] = np.fmax(bottom[:, 1:], top[:, :-1])
+
+    valid = drawn & (bottom >= 0) & (top < height)
+    col = np.broadcast_to(np.arange(width), top.shape)[valid]
+    y0 = np.clip(np.floor(top[valid]), 0, height - 1).astype(np.intp)
+    y1 = np.clip(np.floor(bottom[valid]), 0, height - 1).astype(np.intp) + 1
+
+    n = (height + 1) * width
+    diff = np.bincount(y0 * width + col, minlength=n)
+    diff -= np.bincount(y1 * width + col, minlength=n)
+    return np.cumsum(diff.reshape(height + 1, width), axis=0)[:height]
+
+
+def render(
+    store: ResultStore,
+    signal: str,
+    view: PlotView,
+    size: QtCore.QSize,
+    autoscale: bool = False,
+    color: QtGui.QColor = QtGui.QColor(31, 119, 180),
+    cancelled: Callable[[], bool] = lambda: False,
+) -> Optional[PlotImage]:
+    """Draw all completed runs of signal into an image, None when cancelled.
+
+    Only the visible part of the memory-mapped column is read, a bounded
+    block of runs at a time, and reduced to pixel columns right away. With
+    autoscale the y range of the returned view is fitted to the data.
+    """
+    width, height = max(size.width(), 1), max(size.height(), 1)
+    w = visible(store.time, view.t0, view.t1)
+    t = np.asarray(store.time[w])
+    rows = max(1, BLOCK_VALUES // max(len(t), width, 1))
+
+    ranges: List[Tuple[np.ndarray, np.ndarray]] = []
+    for _, block in store.chunks(signal, rows=rows, window=w):
+        if cancelled():
+            return None
+        block = np.asarray(block, dtype=np.float64)
+        ranges.append(decimate(t, block, width, view.t0, view.t1))
+
+    if autoscale:
+        view = _fit(view, ranges)
+
+    counts = np.zeros((height, width), dtype=np.intp)
+    for lo, hi in ranges:
+        if cancelled():
+            return None
+        counts += rasterize(lo, hi, view, height)
+
+    n_runs = sum(len(lo) for lo, _ in ranges)
+    return PlotImage(_image(counts, color, n_runs), view, n_runs, len(t))
+
+
+def _image(counts: np.ndarray, color: QtGui.QColor, n_runs: int) -> QtGui.QImage:
+    # Every run adds the same translucent layer, denser bundles turn opaque
+    alpha = max(0.05, min(1.0, 8.0 / max(n_runs, 1)))
+    coverage = 1.0 - (1.0 - alpha) ** counts
+    a = (coverage * 255).astype(np.uint32)
+    # Premultiplied ARGB32, one uint32 per pixel
+    argb = (
+        a << 24
+        | (a * color.red() // 255) << 16
+        | (a * color.green() // 255) << 8
+        | (a * color.blue() // 255)
+    )
+    height, width = counts.shape
+    image = QtGui.QImage(
+        argb.astype(np.uint32).tobytes(),
+        width,
+        height,
+        4 * width,
+        QtGui.QImage.Format.Format_ARGB32_Premultiplied,
+    )
+    return image.copy()  # own the pixels, the bytes above are temporary
+
+
+def _fit(view: PlotView, ranges: List[Tuple[np.ndarray, np.ndarray]]) -> PlotView:
+    los = [np.nanmin(lo) for lo, _ in ranges if np.isfinite(lo).any()]
+    his = [np.nanmax(hi) for _, hi in ranges if np.isfinite(hi).any()]
+    if not los:
+        return PlotView(view.t0, view.t1, 0.0, 1.0)
+    lo, hi = float(min(los)), float(max(his))
+    pad = 0.05 * (hi - lo) if hi > lo else max(abs(lo), 1.0) * 0.05
+    return PlotView(view.t0, view.t1, lo - pad, hi + pad)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from fmpy.model_description import ScalarVariable
+
+
+class VariableCatalog:
+    """Column-oriented table of all model variables.
+
+    One entry per column instead of one object per variable: names, start
+    values and descriptions are plain string lists, causality, type and unit
+    are small integer codes into a lookup table and value references are a
+    uint32 array. Lookups by name, causality and value reference go through
+    indexes built on first use, which are not pickled.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        causality: np.ndarray,
+        causalities: Sequence[str],
+        type: np.ndarray,
+        types: Sequence[str],
+        unit: np.ndarray,
+        units: Sequence[Optional[str]],
+        value_reference: np.ndarray,
+        start: List[Optional[str]],
+        description: List[Optional[str]],
+    ):
+        self.names = names
+        self.causality = causality
+        self.causalities = tuple(causalities)
+        self.type = type
+        self.types = tuple(types)
+        self.unit = unit
+        self.units = tuple(units)
+        self.value_reference = value_reference
+        self.start = start
+        self.description = description
+
+    @classmethod
+    def from_variables(cls, variables: Sequence[ScalarVariable]) -> VariableCatalog:
+        causality, causalities = _encode(v.causality for v in variables)
+        type_, types = _encode(v.type for v in variables)
+        unit, units = _encode(
+            v.unit or (v.declaredType.unit if v.declaredType else None)
+            for v in variables
+        )
+
+        return cls(
+            names=[v.name for v in variables],
+            causality=causality,
+            causalities=causalities,
+            type=type_,
+            types=types,
+            unit=unit,
+            units=units,
+            value_reference=np.fromiter(
+                (v.valueReference for v in variables), np.uint32, len(variables)
+            ),
+            start=[v.start for v in variables],
+            description=[v.description for v in variables],
+        )
+
+    def __reduce__(self):
+        # Only the columns, the indexes are rebuilt lazily after unpickling
+        return (
+            VariableCatalog,
+            (
+                self.names,
+                self.causality,
+                self.causalities,
+                self.type,
+                self.types,
+                self.unit,
+                self.units,
+                self.value_reference,
+                self.start,
+                self.description,
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._by_name
+
+    # ────────────────────────────────────────────────────────────── Indexes ──
+
+    @cached_property
+    def _by_name(self) -> Dict[str, int]:
+        return {name: row for row, name in enumerate(self.names)}
+
+    @cached_property
+    def _by_causality(self) -> Dict[str, np.ndarray]:
+        order = np.argsort(self.causality, kind="stable")
+        bounds = np.searchsorted(
+            self.causality[order], np.arange(len(self.causalities) + 1)
+        )
+        return {
+            c: order[bounds[k] : bounds[k + 1]] for k, c in enumerate(self.causalities)
+        }
+
+    @cached_property
+    def _by_value_reference(self) -> Dict[Tuple[str, int], int]:
+        # Aliases share a value reference, the first declared variable wins
+        index: Dict[Tuple[str, int], int] = {}
+        types = self.types
+        pairs = zip(self.type.tolist(), self.value_reference.tolist())
+        for row, (t, vr) in enumerate(pairs):
+            index.setdefault((types[t], vr), row)
+        return index
+
+    # ─────────────────────────────────────────────────────────────── Lookup ──
+
+    def row(self, name: str) -> int:
+        return self._by_name[name]
+
+    def rows(self, *causalities: str) -> np.ndarray:
+        """Rows with any of the given causalities, in declaration order."""
+        parts = [self._by_causality.get(c) for c in causalities]
+        parts = [p for p in parts if p is not None]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts))
+
+    def names_of(self, *causalities: str) -> List[str]:
+        names = self.names
+        return [names[row] for row in self.rows(*causalities).tolist()]
+
+    def find(self, value_reference: int, type: str = "Real") -> Optional[int]:
+        return self._by_value_reference.get((type, int(value_reference)))
+
+    def causality_of(self, row: int) -> str:
+        return self.causalities[self.causality[row]]
+
+    def type_of(self, row: int) -> str:
+        return self.types[self.type[row]]
+
+    def unit_of(self, row: int) -> Optional[str]:
+        return self.units[self.unit[row]]
+
+
+def _encode(values: Iterable[Optional[str]]) -> Tuple[np.ndarray, List[Optional[str]]]:
+    table: Dict[Optional[str], int] = {}
+    codes = [table.setdefault(v, len(table)) for v in values]
+    dtype = np.uint8 if len(table) <= 256 else np.uint32
+    return np.array(codes, dtype=dtype), list(table)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Self
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from fmpy.model_description import DefaultExperiment, ModelDescription
+
+DEFAULT_POINTS = 500
+
+
+@dataclass
+class Experiment:
+    start_time: float = 0.0
+    stop_time: float = 1.0
+    output_interval: float = 1.0 / DEFAULT_POINTS
+    tolerance: Optional[float] = None
+
+    @classmethod
+    def from_model_description(cls, md: ModelDescription) -> Self:
+        return cls.from_default_experiment(md.defaultExperiment)
+
+    @classmethod
+    def from_default_experiment(cls, ex: Optional[DefaultExperiment]) -> Self:
+        start = float(ex.startTime) if ex and ex.startTime else 0.0
+        stop = float(ex.stopTime) if ex and ex.stopTime else start + 1.0
+
+        if ex and ex.stepSize:
+            interval = float(ex.stepSize)
+        else:
+            interval = (stop - start) / DEFAULT_POINTS
+
+        return cls(
+            start_time=start,
+            stop_time=stop,
+            output_interval=interval,
+            tolerance=float(ex.tolerance) if ex and ex.tolerance else None,
+        )
+
+    @property
+    def n_points(self) -> int:
+        return int(round((self.stop_time - self.start_time) / self.output_interval)) + 1
+
+    def grid(self) -> np.ndarray:
+        return self.start_time + self.output_interval * np.arange(self.n_points)
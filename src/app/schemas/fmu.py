@@ -1,62 +1,111 @@
-from dataclasses import dataclass
-from typing import Self
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from typing import Dict, Optional
 
-from fmpy.model_description import ScalarVariable
+from app.schemas.catalog import VariableCatalog
 
 
-@dataclass
-class FmuParameter:
-    _raw: ScalarVariable
-    name: str
-    unit: str
-    type: str
-    default_value: str | float
+@dataclass(eq=False, slots=True)
+class _CatalogView:
+    # One row of the catalog, nothing is copied out of it
+    catalog: VariableCatalog = field(repr=False)
+    row: int
 
-    @classmethod
-    def from_scalar_variable(cls, v: ScalarVariable) -> Self:
+    @property
+    def name(self) -> str:
+        return self.catalog.names[self.row]
+
+    @property
+    def unit(self) -> Optional[str]:
+        return self.catalog.unit_of(self.row)
+
+    @property
+    def type(self) -> str:
+        return self.catalog.type_of(self.row)
+
+    @property
+    def start(self) -> Optional[str]:
+        return self.catalog.start[self.row]
+
+    @property
+    def description(self) -> Optional[str]:
+        return self.catalog.description[self.row]
+
+    @property
+    def value_reference(self) -> int:
+        return int(self.catalog.value_reference[self.row])
+
+
+@dataclass(eq=False, slots=True)
+class FmuParameter(_CatalogView):
+    # Study settings, edited in the parameter editor
+    value: Optional[str | float] = None
+    lower: Optional[float] = None
+    upper: Optional[float] = None
+    distribution: str = "Uniform"
+
+    @property
+    def default_value(self) -> str | float:
         try:
-            default = float(v.start)
+            return float(self.start)
         except (TypeError, ValueError):
-            default = v.start
-
-        return cls(
-            _raw=v,
-            name=v.name,
-            unit=v.unit,
-            type=v.type,
-            default_value=default,
-        )
+            return self.start
 
+    @property
+    def fixed_value(self) -> str | float:
+        return self.default_value if self.value is None else self.value
+
+    @property
+    def is_varied(self) -> bool:
+        return self.lower is not None and self.upper is not None
 
-@dataclass
-class FmuInput:
-    _raw: ScalarVariable
-    name: str
-    unit: str
-    type: str
-
-    @classmethod
-    def from_scalar_variable(cls, v: ScalarVariable) -> Self:
-        return cls(
-            _raw=v,
-            name=v.name,
-            unit=v.unit,
-            type=v.type,
-        )
 
+@dataclass(eq=False, slots=True)
+class FmuInput(_CatalogView):
+    # Study settings, edited in the input signal editor: the recording that
+    # drives the input and its column, the input's own name when unset
+    source: Optional[str] = None
+    column: Optional[str] = None
 
-@dataclass
-class FmuOutput:
-    _raw: ScalarVariable
-    name: str
-    unit: str
-    type: str
-
-    @classmethod
-    def from_scalar_variable(cls, v: ScalarVariable) -> Self:
-        return cls(
-            _raw=v,
-            name=v.name,
-            unit=v.unit,
-            type=v.type,
+
+@dataclass(eq=False, slots=True)
+class FmuOutput(_CatalogView):
+    pass
+
+
+VIEWS = {"parameter": FmuParameter, "input": FmuInput, "output": FmuOutput}
+
+
+class FmuVariables(Mapping):
+    """Parameters, inputs and outputs by name, views are created on first access.
+
+    A view is kept once created so study settings stored on it persist.
+    """
+
+    def __init__(self, catalog: VariableCatalog):
+        self.catalog = catalog
+        self._rows = catalog.rows(*VIEWS)
+        self._views: Dict[str, FmuParameter | FmuInput | FmuOutput] = {}
+
+    def __getitem__(self, name: str) -> FmuParameter | FmuInput | FmuOutput:
+        view = self._views.get(name)
+        if view is None:
+            row = self.catalog.row(name)
+            cls = VIEWS.get(self.catalog.causality_of(row))
+            if cls is None:
+                raise KeyError(name)
+            view = self._views[name] = cls(self.catalog, row)
+        return view
+
+    def __contains__(self, name: object) -> bool:
+        return (
+            name in self.catalog
+            and self.catalog.causality_of(self.catalog.row(name)) in VIEWS
         )
+
+    def __iter__(self) -> Iterator[str]:
+        names = self.catalog.names
+        return (names[row] for row in self._rows.tolist())
+
+    def __len__(self) -> int:
+        return len(self._rows)
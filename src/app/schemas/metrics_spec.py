@@ -5,6 +5,9 @@ from typing import Optional
 
 from app.schemas.fmu import FmuOutput
 
+STATISTICS = ("max", "min", "mean", "rms", "final", "integral")
+OBJECTIVES = ("minimize", "maximize")
+
 
 @dataclass
 class MetricSpec:
@@ -13,3 +16,14 @@ class MetricSpec:
     lower: Optional[float] = None
     upper: Optional[float] = None
     objective: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.statistic}({self.signal.name})"
+
+    def is_feasible(self, value: float) -> bool:
+        if self.lower is not None and not value >= self.lower:
+            return False
+        if self.upper is not None and not value <= self.upper:
+            return False
+        return True
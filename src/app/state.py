@@ -1,18 +1,31 @@
-from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field, fields
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 
-from fmpy import read_model_description
-from fmpy.util import fmu_info
+import numpy as np
 
-from app.schemas.fmu import FmuInput, FmuOutput, FmuParameter
+from app.model_cache import ParsedFmu, fmu_digest, format_info, parse_fmu
+from app.schemas.catalog import VariableCatalog
+from app.schemas.experiment import Experiment
+from app.schemas.fmu import FmuInput, FmuOutput, FmuParameter, FmuVariables
 from app.schemas.metrics_spec import MetricSpec
+from app.study.doe import Design, ParameterRange, PointDesign, make_design
+from app.study.metrics import MetricPlan
+from app.study.results import ResultStore
+from app.study.runner import StudyRunner
+from app.study.signals import InputSignals
+from app.study.sim_cache import SimulationCache
+from app.study.surrogate import Samples
 
 
 @dataclass
 class AppState:
     fmu_path: Optional[Path] = None
-    fmu_variables: Dict[str, FmuParameter | FmuInput | FmuOutput] = field(
+    fmu: Optional[ParsedFmu] = field(default=None, repr=False)
+    fmu_variables: Mapping[str, FmuParameter | FmuInput | FmuOutput] = field(
         default_factory=dict
     )
 
@@ -20,25 +33,199 @@ class AppState:
     inputs: Dict[str, FmuInput] = field(default_factory=dict)
     metrics: List[MetricSpec] = field(default_factory=list)
     doe_settings: Dict[str, Any] = field(default_factory=dict)
+    experiment: Experiment = field(default_factory=Experiment)
 
-    results: Optional[Any] = None
+    results: Optional[ResultStore] = None
+    # Set once the study is saved, its runs then checkpoint into results_root
+    study_path: Optional[Path] = None
+    results_root: Optional[Path] = None
+    # Simulated on top of the DOE to train the surrogate, see app.study.surrogate
+    adaptive: Optional[Samples] = None
+
+    def assign(self, other: "AppState") -> None:
+        """Take over the whole study of other, widgets keep referring to self."""
+        for f in fields(self):
+            setattr(self, f.name, getattr(other, f.name))
 
     def has_study(self) -> bool:
         return bool(self.parameters) and bool(self.doe_settings)
 
-    def load_fmu(self, fmu_path: Path, return_info: bool = False) -> str | None:
-        self.fmu_path = fmu_path
+    @property
+    def catalog(self) -> Optional[VariableCatalog]:
+        return self.fmu.catalog if self.fmu is not None else None
+
+    def output_names(self) -> List[str]:
+        return self.catalog.names_of("output") if self.catalog is not None else []
+
+    def parameter_ranges(self) -> List[ParameterRange]:
+        return [
+            ParameterRange(p.name, p.lower, p.upper, p.distribution)
+            for p in self.parameters.values()
+            if p.lower is not None and p.upper is not None
+        ]
+
+    def fixed_values(self) -> Dict[str, Any]:
+        return {
+            p.name: p.fixed_value for p in self.parameters.values() if not p.is_varied
+        }
+
+    def build_design(self) -> Design:
+        return make_design(
+            self.doe_settings.get("method", "Monte Carlo"),
+            self.parameter_ranges(),
+            n_samples=self.doe_settings.get("n_samples", 100),
+            seed=self.doe_settings.get("seed", 0),
+            levels=self.doe_settings.get("levels", 3),
+            fixed=self.fixed_values(),
+        )
+
+    def build_runner(self, store_root: Path, resume: bool = False) -> StudyRunner:
+        """Design, result store and runner for the current study settings.
+
+        With resume, results an earlier run of the same study left in store_root
+        are kept and the runner only simulates the samples still missing.
+        """
+        if self.fmu_path is None:
+            raise ValueError("Load an FMU first")
+        if not self.has_study():
+            raise ValueError("Select the parameters to study first")
+
+        design = self.build_design()
+        metrics = MetricPlan.from_specs(self.metrics)
+
+        if self.doe_settings.get("store_trajectories", True):
+            signals = self.output_names()
+        elif len(metrics):
+            signals = []
+        else:
+            raise ValueError("Define metrics or store trajectories")
+
+        inputs = self._input_signals()
 
-        # Get variables
-        model_vars = read_model_description(str(fmu_path))
+        # Unmap earlier results first, Windows cannot truncate mapped files
+        self.results = None
+        fingerprint = self._fingerprint(signals, metrics, inputs)
+        store = ResultStore.resume(store_root, fingerprint) if resume else None
+        if store is None:
+            # Trajectories go straight to disk, the calling process never holds them
+            store = ResultStore.create(
+                store_root,
+                signals,
+                len(design),
+                self.experiment.grid(),
+                metrics=metrics.names,
+                fingerprint=fingerprint,
+            )
+        self.results = store
 
-        for v in model_vars.modelVariables:
-            if v.causality == "output":
-                self.fmu_variables[v.name] = FmuOutput.from_scalar_variable(v)
-            elif v.causality == "parameter":
-                self.fmu_variables[v.name] = FmuParameter.from_scalar_variable(v)
-            elif v.causality == "input":
-                self.fmu_variables[v.name] = FmuInput.from_scalar_variable(v)
+        return StudyRunner(
+            self.fmu_path,
+            design,
+            n_workers=self.doe_settings.get("n_workers"),
+            experiment=self.experiment,
+            store=store,
+            metrics=metrics,
+            early_stop=self.doe_settings.get("early_stop", False),
+            cache=self._simulation_cache(inputs),
+            inputs=inputs,
+            warm_start=self.doe_settings.get("warm_start"),
+        )
+
+    def build_point_runner(self, values: np.ndarray) -> StudyRunner:
+        """Runner for explicit parameter values, metrics only and no store.
+
+        Used for the samples adaptive sampling proposes, SampleResult.metrics
+        holds the outcome of each.
+        """
+        if self.fmu_path is None:
+            raise ValueError("Load an FMU first")
+        metrics = MetricPlan.from_specs(self.metrics)
+        if not len(metrics):
+            raise ValueError("Define metrics first")
+
+        design = PointDesign(self.parameter_ranges(), values, fixed=self.fixed_values())
+        inputs = self._input_signals()
+        # No more workers to start than there are samples
+        n_workers = self.doe_settings.get("n_workers") or os.cpu_count() or 1
+        return StudyRunner(
+            self.fmu_path,
+            design,
+            n_workers=min(n_workers, len(design)),
+            experiment=self.experiment,
+            metrics=metrics,
+            cache=self._simulation_cache(inputs),
+            inputs=inputs,
+            warm_start=self.doe_settings.get("warm_start"),
+        )
+
+    def _input_signals(self) -> Optional[InputSignals]:
+        # Resampled once here, not per sample in every worker
+        if not self.inputs:
+            return None
+        return InputSignals.resample(self.inputs.values(), self.experiment.grid())
+
+    def _simulation_cache(
+        self, inputs: Optional[InputSignals]
+    ) -> Optional[SimulationCache]:
+        if not self.doe_settings.get("use_cache", True):
+            return None
+        assert self.fmu_path is not None
+        return SimulationCache.for_study(
+            self.fmu_path,
+            self.experiment,
+            inputs=inputs.digest if inputs is not None else "",
+        )
+
+    def _fingerprint(
+        self,
+        signals: Sequence[str],
+        metrics: MetricPlan,
+        inputs: Optional[InputSignals],
+    ) -> str:
+        # Everything that decides what a sample's stored result is
+        assert self.fmu_path is not None
+        doe = self.doe_settings
+        study = {
+            "fmu": fmu_digest(self.fmu_path),
+            "experiment": asdict(self.experiment),
+            "doe": [doe.get(k) for k in ("method", "n_samples", "seed", "levels")],
+            "parameters": [
+                [p.name, p.lower, p.upper, p.distribution, p.fixed_value]
+                for p in self.parameters.values()
+            ],
+            "inputs": inputs.digest if inputs is not None else "",
+            "signals": list(signals),
+            "metrics": asdict(metrics),
+            "early_stop": doe.get("early_stop", False),
+            "warm_start": doe.get("warm_start"),
+        }
+        text = json.dumps(study, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def load_fmu(self, fmu_path: Path, return_info: bool = False) -> str | None:
+        # Parsed once, or straight from the cache for an unchanged archive
+        self.set_fmu(fmu_path, parse_fmu(fmu_path))
 
         if return_info:
-            return fmu_info(str(fmu_path), ["input", "output", "parameter"])
+            return self.fmu_info()
+
+    def set_fmu(self, fmu_path: Path, fmu: ParsedFmu) -> None:
+        """Make an FMU parsed elsewhere, e.g. on a loader thread, the current one."""
+        self.fmu_path = fmu_path
+        self.fmu = fmu
+        self.experiment = Experiment.from_default_experiment(
+            self.fmu.default_experiment
+        )
+        self.fmu_variables = FmuVariables(self.fmu.catalog)
+        self.parameters = {}
+        self.inputs = {}
+        # A different model starts a new, unsaved study
+        self.study_path = None
+        self.results_root = None
+        self.adaptive = None
+
+    def fmu_info(
+        self, causalities: Sequence[str] = ("input", "output", "parameter")
+    ) -> str:
+        assert self.fmu is not None, "No FMU loaded"
+        return format_info(self.fmu, list(causalities))
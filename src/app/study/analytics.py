@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.study.doe import Design
+from app.study.results import ResultStore
+
+# Values held in memory at once while streaming over the store
+BLOCK_VALUES = 1 << 22
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Conditional means of first-order indices are taken over at most this many bins
+MAX_BINS = 32
+
+
+@dataclass
+class Bands:
+    """Per-time-point statistics of one signal over all completed samples."""
+
+    signal: str
+    time: np.ndarray
+    quantiles: Tuple[float, ...]
+    values: np.ndarray  # (len(quantiles), n_points)
+    mean: np.ndarray
+    std: np.ndarray
+    count: np.ndarray  # samples with a finite value at each point
+
+    def band(self, q: float) -> np.ndarray:
+        return self.values[self.quantiles.index(q)]
+
+
+@dataclass
+class Sensitivity:
+    """How the metrics depend on the parameters, over the completed samples.
+
+    correlation is the Pearson matrix of parameters and metrics together, in
+    that order. first_order holds the Sobol index of every parameter for
+    every metric: the share of the metric's variance explained by that
+    parameter alone.
+    """
+
+    parameters: List[str]
+    metrics: List[str]
+    n_samples: int
+    correlation: np.ndarray  # (p + m, p + m)
+    first_order: np.ndarray  # (p, m)
+
+    @property
+    def parameter_metric(self) -> np.ndarray:
+        """Correlation of every parameter with every metric, (p, m)."""
+        p = len(self.parameters)
+        return self.correlation[:p, p:]
+
+
+# ──────────────────────────────────────────────────────────────── Bands ──
+
+
+def quantile_bands(
+    store: ResultStore,
+    signal: str,
+    quantiles: Sequence[float] = QUANTILES,
+    window: slice = slice(None),
+    cancelled: Callable[[], bool] = lambda: False,
+) -> Optional[Bands]:
+    """Exact quantiles, mean and std of signal at every time point.
+
+    Quantiles need all samples of a time point at once, so the column is
+    read in tiles of every completed sample by as many time points as fit
+    into BLOCK_VALUES. Each tile is sorted along the samples in one call,
+    NaN tails of runs cut short are skipped. Returns None when cancelled.
+    """
+    quantiles = tuple(float(q) for q in quantiles)
+    time = np.asarray(store.time[window], dtype=np.float64)
+    n_runs, n_points = len(store.completed()), len(time)
+    values = np.full((len(quantiles), n_points), np.nan)
+    mean = np.full(n_points, np.nan)
+    std = np.full(n_points, np.nan)
+    count = np.zeros(n_points, dtype=np.int64)
+
+    start = window.start or 0
+    cols = max(1, BLOCK_VALUES // max(n_runs, 1))
+    tile = np.empty((n_runs, min(cols, n_points)))
+    for c0 in range(0, n_points if n_runs else 0, cols):
+        c1 = min(c0 + cols, n_points)
+        block = tile[:, : c1 - c0]
+        rows, row = max(1, BLOCK_VALUES // (c1 - c0)), 0
+        tile_window = slice(start + c0, start + c1)
+        for indices, chunk in store.chunks(signal, rows=rows, window=tile_window):
+            if cancelled():
+                return None
+            block[row : row + len(indices)] = chunk
+            row += len(indices)
+
+        values[:, c0:c1], mean[c0:c1], std[c0:c1], count[c0:c1] = _column_stats(
+            block, quantiles
+        )
+
+    return Bands(signal, time, quantiles, values, mean, std, count)
+
+
+def _column_stats(
+    block: np.ndarray, quantiles: Tuple[float, ...]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    finite = np.isfinite(block)
+    n = finite.sum(axis=0)
+    # Missing values sort to the end, the first n of every column are valid
+    ordered = np.sort(np.where(finite, block, np.inf), axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = np.where(finite, block, 0.0).sum(axis=0)
+        mean = total / n
+        dev = np.where(finite, block - mean, 0.0)
+        std = np.sqrt((dev * dev).sum(axis=0) / n)
+
+    # Linear interpolation between order statistics, as numpy.quantile does
+    out = np.full((len(quantiles), block.shape[1]), np.nan)
+    has = n > 0
+    cols = np.flatnonzero(has)
+    for k, q in enumerate(quantiles):
+        pos = q * (n[has] - 1)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, n[has] - 1)
+        frac = pos - lo
+        out[k, has] = ordered[lo, cols] * (1 - frac) + ordered[hi, cols] * frac
+
+    return out, mean, std, n
+
+
+# ─────────────────────────────────────────────────────────── Sensitivity ──
+
+
+def sensitivity(
+    design: Design,
+    store: ResultStore,
+    bins: Optional[int] = None,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> Optional[Sensitivity]:
+    """Correlations and first-order Sobol indices of the stored metrics.
+
+    A single pass over blocks of completed samples, the design matrix is
+    regenerated per block from the sample indices. Only running sums are
+    kept: the co-moments of parameters and metrics, merged block by block,
+    and per-bin metric sums of every parameter. The first-order index of a
+    parameter is the variance of the metric's bin means over its range,
+    less the part explained by sampling noise. This works on any design,
+    total-order indices would need a dedicated sampling scheme. Samples
+    with a non-finite metric are left out. Returns None when cancelled.
+    """
+    names, metrics = design.names, list(store.metrics)
+    p, m = len(names), len(metrics)
+    done = store.completed()
+    if bins is None:
+        bins = min(MAX_BINS, max(2, int(math.sqrt(len(done)))))
+
+    # Bin edges at equal-probability points of each parameter's distribution
+    inner = np.linspace(0.0, 1.0, bins + 1)[1:-1]
+    edges = [r.ppf(inner) for r in design.ranges]
+
+    moments = _Moments(p + m)
+    counts = np.zeros((p, bins))
+    sums = np.zeros((p, bins, m))
+    shift: Optional[np.ndarray] = None
+
+    rows = max(1, BLOCK_VALUES // max(p + m, 1))
+    for start in range(0, len(done), rows):
+        if cancelled():
+            return None
+        indices = done[start : start + rows]
+        x = design.points(indices)
+        y = np.asarray(store.metric_values[indices], dtype=np.float64)
+        keep = np.isfinite(x).all(axis=1) & np.isfinite(y).all(axis=1)
+        x, y = x[keep], y[keep]
+        if not len(x):
+            continue
+
+        moments.update(np.hstack([x, y]))
+        if shift is None:
+            shift = y.mean(axis=0)
+        # Relative to a shift, so the sums of squares below do not cancel out
+        yc = y - shift
+        flat = np.arange(m)
+        for j in range(p):
+            b = np.searchsorted(edges[j], x[:, j], side="right")
+            counts[j] += np.bincount(b, minlength=bins)
+            cells = (b[:, None] * m + flat).ravel()
+            binned = np.bincount(cells, weights=yc.ravel(), minlength=bins * m)
+            sums[j] += binned.reshape(bins, m)
+
+    n = moments.n
+    corr = moments.correlation()
+    first = np.full((p, m), np.nan)
+    if n > 1 and m:
+        total = sums[0].sum(axis=0) if p else np.zeros(m)
+        sst = moments.comoment.diagonal()[p:]
+        for j in range(p):
+            occupied = counts[j] > 0
+            k = int(occupied.sum())
+            if k < 2 or n <= k:
+                continue
+            c = counts[j, occupied][:, None]
+            ssb = (sums[j, occupied] ** 2 / c).sum(axis=0) - total**2 / n
+            ssw = sst - ssb
+            # Bin means scatter by (k - 1) residual variances even without an effect
+            with np.errstate(invalid="ignore", divide="ignore"):
+                s1 = (ssb - (k - 1) * ssw / (n - k)) / sst
+            first[j] = np.where(sst > 0, np.clip(s1, 0.0, 1.0), np.nan)
+
+    return Sensitivity(names, metrics, n, corr, first)
+
+
+class _Moments:
+    """Running mean and co-moment matrix, merged per block (Chan et al.)."""
+
+    def __init__(self, k: int):
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def update(self, block: np.ndarray) -> None:
+        nb = len(block)
+        mean_b = block.mean(axis=0)
+        dev = block - mean_b
+        n = self.n + nb
+        delta = mean_b - self.mean
+        self.comoment += dev.T @ dev + np.outer(delta, delta) * (self.n * nb / n)
+        self.mean += delta * (nb / n)
+        self.n = n
+
+    def correlation(self) -> np.ndarray:
+        var = self.comoment.diagonal()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scale = np.sqrt(np.outer(var, var))
+            corr = np.where(scale > 0, self.comoment / scale, np.nan)
+        return np.clip(corr, -1.0, 1.0)
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.study.doe import Design
+
+if TYPE_CHECKING:
+    from fmpy.model_description import ModelDescription, ScalarVariable
+
+# Python type of the values of each variable type, others are left to fmpy
+_PYTHON_TYPES: Dict[str, Callable[[Any], Any]] = {
+    "Real": float,
+    "Float32": float,
+    "Float64": float,
+    "Boolean": bool,
+    "String": str,
+    **dict.fromkeys(
+        ["Integer", "Enumeration"]
+        + [f"{s}Int{n}" for s in ("", "U") for n in (8, 16, 32, 64)],
+        int,
+    ),
+}
+
+
+@dataclass
+class _Batch:
+    """Variables of one setter: fixed values first, then design columns."""
+
+    setter: str
+    convert: Callable[[Any], Any]
+    value_references: List[int] = field(default_factory=list)
+    fixed: List[Any] = field(default_factory=list)
+    columns: List[int] = field(default_factory=list)
+
+    def values(self, point: np.ndarray) -> List[Any]:
+        if not self.columns:
+            return self.fixed
+        return self.fixed + self.varied(point)
+
+    def varied(self, point: np.ndarray) -> List[Any]:
+        varied = point[self.columns].tolist()
+        if self.setter not in ("setReal", "setFloat64"):
+            varied = [self.convert(v) for v in varied]
+        return varied
+
+
+class SampleApplicator:
+    """Start values of a design, compiled against one model description.
+
+    Names are resolved to value references and setters once. Every sample
+    then takes one batched set call per variable type, with the values of
+    its design row, instead of a scan over all model variables and a call
+    per variable. Values only settable during initialization, arrays and
+    values with a unit are left to fmpy, as are unknown names so its error
+    message stays the same.
+    """
+
+    def __init__(self, design: Design, model_description: ModelDescription):
+        from fmpy.simulation import has_start_value, settable_in_instantiated
+
+        self.design = design
+        self.model_description = model_description
+        self._batches: Dict[str, _Batch] = {}
+        self._fixed_rest: Dict[str, Any] = {}
+        self._varied_rest: Dict[str, int] = {}
+
+        fmi1 = model_description.fmiVersion == "1.0"
+        settable = has_start_value if fmi1 else settable_in_instantiated
+        variables = {v.name: v for v in model_description.modelVariables}
+
+        for name, value in design.fixed.items():
+            v = variables.get(name)
+            if not self._compiles(v, settable) or isinstance(value, tuple):
+                self._fixed_rest[name] = value
+                continue
+            try:
+                value = _convert(v, value)
+            except (TypeError, ValueError):
+                # Fails every sample, with fmpy's message
+                self._fixed_rest[name] = value
+                continue
+            batch = self._batch(v, model_description.fmiVersion)
+            batch.value_references.append(v.valueReference)
+            batch.fixed.append(value)
+
+        # All fixed values are in place, design columns follow them per batch
+        for column, name in enumerate(design.names):
+            v = variables.get(name)
+            if not self._compiles(v, settable):
+                self._varied_rest[name] = column
+                continue
+            batch = self._batch(v, model_description.fmiVersion)
+            batch.value_references.append(v.valueReference)
+            batch.columns.append(column)
+
+    @property
+    def n_calls(self) -> int:
+        """Set calls per sample."""
+        return len(self._batches)
+
+    def apply(self, fmu, index: Optional[int]) -> Dict[str, Any]:
+        """Set the start values of sample index on an instantiated FMU.
+
+        With index None only the fixed values are set. Returns the start
+        values fmpy still has to apply.
+        """
+        point = self.design.point(index) if index is not None else None
+        for batch in self._batches.values():
+            if point is not None:
+                getattr(fmu, batch.setter)(batch.value_references, batch.values(point))
+            elif batch.fixed:
+                value_references = batch.value_references[: len(batch.fixed)]
+                getattr(fmu, batch.setter)(value_references, batch.fixed)
+
+        if not self._varied_rest or point is None:
+            return dict(self._fixed_rest)
+        rest = dict(self._fixed_rest)
+        rest.update((name, float(point[c])) for name, c in self._varied_rest.items())
+        return rest
+
+    def apply_varied(self, fmu, index: int) -> None:
+        """Set only the design values of sample index, during the simulation.
+
+        For an FMU restored to a state saved after initialization, where the
+        fixed values are already in place. Only inputs and tunable
+        parameters can be set at that point.
+        """
+        from fmpy.simulation import apply_start_values
+
+        point = self.design.point(index)
+        for batch in self._batches.values():
+            if batch.columns:
+                value_references = batch.value_references[len(batch.fixed) :]
+                getattr(fmu, batch.setter)(value_references, batch.varied(point))
+
+        if self._varied_rest:
+            rest = {name: float(point[c]) for name, c in self._varied_rest.items()}
+            rest = apply_start_values(
+                fmu, self.model_description, rest, settable=settable_in_step_mode
+            )
+            if rest:
+                raise ValueError(
+                    "The following variables cannot be set during the simulation: "
+                    + ", ".join(rest)
+                )
+
+    def initialize(
+        self,
+        fmu,
+        index: Optional[int],
+        start_time: float,
+        stop_time: float,
+        tolerance: Optional[float] = None,
+        inputs: Optional[np.ndarray] = None,
+    ) -> None:
+        """Set the start values of sample index and initialize a co-simulation FMU.
+
+        With index None only the fixed values are set.
+
+        The same sequence of calls simulate_fmu makes before its first step,
+        which then runs with initialize=False. fmpy is only asked for the
+        values left over, otherwise it would scan all model variables twice
+        per sample just to find there is nothing to set.
+        """
+        from fmpy.simulation import (
+            Input,
+            apply_start_values,
+            has_start_value,
+            settable_in_initialization_mode,
+            settable_in_instantiated,
+        )
+
+        md = self.model_description
+        if tolerance is None and md.defaultExperiment is not None:
+            tolerance = md.defaultExperiment.tolerance
+        input = Input(fmu=fmu, modelDescription=md, signals=inputs)
+
+        if md.fmiVersion == "1.0":
+            rest = self.apply(fmu, index)
+            if rest:
+                rest = apply_start_values(fmu, md, rest, settable=has_start_value)
+            input.apply(start_time)
+            fmu.initialize(tStart=start_time, stopTime=stop_time)
+        else:
+            fmi2 = md.fmiVersion == "2.0"
+            if fmi2:
+                fmu.setupExperiment(
+                    tolerance=tolerance, startTime=start_time, stopTime=stop_time
+                )
+            rest = self.apply(fmu, index)
+            if rest:
+                rest = apply_start_values(fmu, md, rest, settable_in_instantiated)
+            if fmi2:
+                fmu.enterInitializationMode()
+            else:
+                fmu.enterInitializationMode(
+                    tolerance=tolerance, startTime=start_time, stopTime=stop_time
+                )
+            if rest:
+                settable = settable_in_initialization_mode
+                rest = apply_start_values(fmu, md, rest, settable)
+            input.apply(start_time)
+            fmu.exitInitializationMode()
+
+        if rest:
+            raise ValueError(
+                "The start values for the following variables could not be set: "
+                + ", ".join(rest)
+            )
+
+    @staticmethod
+    def _compiles(v: Optional[ScalarVariable], settable) -> bool:
+        return (
+            v is not None
+            and v.type in _PYTHON_TYPES
+            and not v.dimensions  # arrays
+            and settable(v)
+        )
+
+    def _batch(self, v: ScalarVariable, fmi_version: str) -> _Batch:
+        if v.type == "Enumeration":
+            setter = "setInteger" if fmi_version in ("1.0", "2.0") else "setInt64"
+        else:
+            setter = "set" + v.type
+        batch = self._batches.get(setter)
+        if batch is None:
+            batch = self._batches[setter] = _Batch(setter, _PYTHON_TYPES[v.type])
+        return batch
+
+
+def settable_in_step_mode(v: ScalarVariable) -> bool:
+    """Whether a variable can still be changed once the simulation runs."""
+    return v.causality == "input" or (
+        v.causality == "parameter" and v.variability == "tunable"
+    )
+
+
+def _convert(v: ScalarVariable, value: Any) -> Any:
+    # The same conversions fmpy applies to start values
+    if v.type == "Boolean" and isinstance(value, str):
+        if value.lower() not in ("true", "false"):
+            raise ValueError(value)
+        return value.lower() == "true"
+    return _PYTHON_TYPES[v.type](value)
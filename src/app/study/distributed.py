@@ -0,0 +1,445 @@
+"""Studies spread over several hosts: python -m app.study.distributed HOST:PORT
+
+A Coordinator serves the sample indices of a study and the FMU itself to
+remote workers, StudyRunner.run(coordinator=...) records what they send
+back like local results. On every host a worker is started with the
+address of the coordinator, it pulls batches of indices, simulates them on
+its own process pool and streams back one result per sample, metrics
+only. Connections are multiprocessing.connection ones: authenticated with
+a shared key, then pickled messages, so only use them on trusted networks.
+The app starts a worker with its worker command, see src/main.py.
+
+Messages, sent by the worker:
+
+    ("hello", host, processes)  ->  ("setup", Job)
+    ("request", n)              ->  ("batch", [index, ...]) | ("wait",) | ("stop",)
+    ("result", SampleResult)
+    ("heartbeat",)
+
+A batch stays leased to its worker until every result came back. When the
+connection drops or stays silent for LEASE_SECONDS, what the worker still
+held goes back to the front of the queue for the others.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.log_sink import get_logger
+from app.model_cache import cache_dir, fmu_digest
+from app.schemas.experiment import Experiment
+from app.study.doe import Design
+from app.study.metrics import MetricPlan
+from app.study.runner import SampleResult, StudyRunner
+from app.study.signals import InputSignals
+
+# Most indices handed out at once, a worker asks for what its pool can take
+BATCH_SIZE = 64
+# A worker silent for this long is lost, its samples go to the others
+LEASE_SECONDS = 60.0
+# Workers send at least this often, also while long samples run
+HEARTBEAT_SECONDS = 5.0
+# How long an idle worker waits before it asks again
+WAIT_SECONDS = 0.2
+
+# Shared key of coordinator and workers, unless given explicitly
+KEY_VARIABLE = "FMU_INSIGHT_KEY"
+
+Address = Tuple[str, int]
+
+
+def parse_address(text: str) -> Address:
+    """[HOST:]PORT, all interfaces without a host."""
+    host, _, port = text.rpartition(":")
+    return host, int(port)
+
+
+@dataclass
+class Job:
+    """Everything a worker needs to simulate the samples of a study."""
+
+    fmu_name: str
+    fmu: bytes
+    digest: str
+    design: Design
+    experiment: Optional[Experiment]
+    metrics: MetricPlan
+    early_stop: bool
+    inputs: Optional[np.ndarray]  # already on the simulation grid
+    warm_start: Optional[float]
+
+    @classmethod
+    def from_runner(cls, runner: StudyRunner) -> Job:
+        inputs = runner.inputs
+        return cls(
+            fmu_name=runner.fmu_path.name,
+            fmu=runner.fmu_path.read_bytes(),
+            digest=fmu_digest(runner.fmu_path),
+            design=runner.design,
+            experiment=runner.experiment,
+            metrics=runner.metrics,
+            early_stop=runner.early_stop,
+            inputs=np.array(inputs.load()) if inputs is not None else None,
+            warm_start=runner.warm_start,
+        )
+
+
+# ──────────────────────────────────────────────────────────── Coordinator ──
+
+
+class Coordinator:
+    """Hands out the samples of a study to remote workers.
+
+    Listens from creation on, address holds the actual port when port 0
+    was asked for. Serves one run at a time, see StudyRunner.run().
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        key: str,
+        batch_size: int = BATCH_SIZE,
+        lease: float = LEASE_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self.lease = lease
+        self._listener = Listener(address, family="AF_INET", authkey=key.encode())
+
+        self._lock = threading.Lock()
+        self._queue: Deque[Tuple[int, Future[SampleResult]]] = deque()
+        self._leases: Dict[int, Dict[int, Future[SampleResult]]] = {}
+        self._processes: Dict[int, int] = {}  # per connected worker
+        self._connections = 0
+        self._job: Optional[Job] = None
+        self._runner: Optional[StudyRunner] = None
+
+    @property
+    def address(self) -> Address:
+        return self._listener.address
+
+    @property
+    def workers(self) -> int:
+        with self._lock:
+            return len(self._processes)
+
+    def close(self) -> None:
+        self._listener.close()
+
+    @staticmethod
+    def check(runner: StudyRunner) -> None:
+        """Raise ValueError if the study cannot run on remote workers."""
+        if not len(runner.metrics):
+            raise ValueError("Remote workers only send metrics back, define some")
+        if runner.store is not None and runner.store.signals:
+            raise ValueError("Remote workers do not send trajectories back")
+
+    # Called by StudyRunner.run on its thread
+
+    @contextmanager
+    def serving(self, runner: StudyRunner) -> Iterator[Callable[[int], Future]]:
+        """Accept workers for the run of runner, yields a function queueing a sample."""
+        self.check(runner)
+        self._job = Job.from_runner(runner)
+        self._runner = runner
+        accepting = threading.Thread(target=self._accept, args=(runner,), daemon=True)
+        accepting.start()
+        try:
+            yield self.submit
+        finally:
+            # Workers asking for more from now on are told to stop
+            self._runner = None
+            self.cancel()
+            self._wake(accepting)
+
+    def submit(self, index: int) -> Future[SampleResult]:
+        future: Future[SampleResult] = Future()
+        with self._lock:
+            self._queue.append((index, future))
+        return future
+
+    def capacity(self) -> int:
+        """Samples worth queueing, the connected workers can take them right away."""
+        with self._lock:
+            processes = sum(self._processes.values())
+        return self.batch_size + 4 * processes
+
+    def cancel(self) -> None:
+        """Resolve queued samples as cancelled, leased ones still report back."""
+        with self._lock:
+            queued = list(self._queue)
+            self._queue.clear()
+        for index, future in queued:
+            if not future.cancel():
+                # Put back after its worker was lost, a cancel no longer applies
+                future.set_result(SampleResult(index, status="cancelled"))
+
+    # Connection threads
+
+    def _accept(self, runner: StudyRunner) -> None:
+        log = get_logger()
+        while self._runner is runner:
+            try:
+                conn = self._listener.accept()
+            except (AuthenticationError, EOFError) as e:
+                if self._runner is runner:
+                    log.warning("Rejected a worker connection: %s", e)
+                continue
+            except OSError:
+                return  # closed
+            if self._runner is not runner:
+                conn.close()
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _wake(self, accepting: threading.Thread) -> None:
+        # accept() blocks until a connection comes in, this one fails the handshake
+        host, port = self.address
+        if host in ("", "0.0.0.0"):
+            host = "127.0.0.1"
+        try:
+            with socket.create_connection((host, port), timeout=1.0):
+                pass
+        except OSError:
+            pass
+        accepting.join(timeout=5.0)
+
+    def _handle(self, conn: Connection) -> None:
+        log = get_logger()
+        with self._lock:
+            self._connections += 1
+            worker = self._connections
+        host = "unknown host"
+        try:
+            kind, host, processes = self._receive(conn)
+            if kind != "hello":
+                raise ValueError(f"unexpected {kind!r} message")
+            conn.send(("setup", self._job))
+            with self._lock:
+                self._processes[worker] = int(processes)
+                self._leases[worker] = {}
+            log.info("Worker %s joined with %d processes", host, processes)
+
+            while True:
+                message = self._receive(conn)
+                if message[0] == "request":
+                    conn.send(self._lease(worker, int(message[1])))
+                elif message[0] == "result":
+                    self._complete(worker, message[1])
+        except EOFError:
+            pass  # left, normally after it was told to stop
+        except Exception as e:
+            log.warning("Lost worker %s: %s", host, e)
+        finally:
+            conn.close()
+            lost = self._release(worker)
+            if lost:
+                log.warning("%d samples of worker %s go to other workers", lost, host)
+
+    def _receive(self, conn: Connection) -> Any:
+        silent_since = time.monotonic()
+        while not conn.poll(min(1.0, self.lease)):
+            if time.monotonic() - silent_since > self.lease:
+                raise TimeoutError(f"silent for {self.lease:g} s")
+        return conn.recv()
+
+    def _lease(self, worker: int, n: int) -> Tuple[Any, ...]:
+        batch: List[int] = []
+        with self._lock:
+            leases = self._leases[worker]
+            while self._queue and len(batch) < min(n, self.batch_size):
+                index, future = self._queue.popleft()
+                # Samples put back after a lost worker are running already
+                if not (future.running() or future.set_running_or_notify_cancel()):
+                    continue
+                leases[index] = future
+                batch.append(index)
+            runner = self._runner
+        if batch:
+            return ("batch", batch)
+        return ("stop",) if runner is None or runner.cancelled else ("wait",)
+
+    def _complete(self, worker: int, result: SampleResult) -> None:
+        with self._lock:
+            future = self._leases.get(worker, {}).pop(result.index, None)
+        if future is None or future.done():
+            return  # given to another worker meanwhile
+        timing = result.timing
+        if timing is not None:
+            # Clocks of other hosts do not line up, the result just arrived
+            shift = time.perf_counter() - timing.end
+            timing.start += shift
+            timing.end += shift
+        future.set_result(result)
+
+    def _release(self, worker: int) -> int:
+        with self._lock:
+            self._processes.pop(worker, None)
+            leases = self._leases.pop(worker, {})
+            runner = self._runner
+            stopped = runner is None or runner.cancelled
+            if not stopped:
+                # In front, they were due before anything still queued
+                self._queue.extendleft(reversed(list(leases.items())))
+        if stopped:
+            for index, future in leases.items():
+                if not future.done():
+                    future.set_result(SampleResult(index, status="cancelled"))
+        return len(leases)
+
+
+# ──────────────────────────────────────────────────────────────── Worker ──
+
+
+class _Channel:
+    """A connection shared by the sample loop and the heartbeat thread."""
+
+    def __init__(self, conn: Connection):
+        self._conn = conn
+        self._lock = threading.Lock()
+
+    def send(self, message: Tuple[Any, ...]) -> None:
+        with self._lock:
+            self._conn.send(message)
+
+    def request(self, message: Tuple[Any, ...]) -> Any:
+        with self._lock:
+            self._conn.send(message)
+            return self._conn.recv()
+
+    @contextmanager
+    def heartbeat(self, interval: float = HEARTBEAT_SECONDS) -> Iterator[None]:
+        stop = threading.Event()
+
+        def beat() -> None:
+            while not stop.wait(interval):
+                try:
+                    self.send(("heartbeat",))
+                except OSError:
+                    return
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+
+def work(
+    address: Address,
+    key: str,
+    n_workers: Optional[int] = None,
+    root: Optional[Path] = None,
+) -> int:
+    """Simulate samples for a coordinator until it stops, return how many.
+
+    The FMU is kept under root, by default in the user cache, so workers
+    started again for the same study do not receive it twice.
+    """
+    n_workers = max(1, n_workers or os.cpu_count() or 1)
+    conn = Client(address, family="AF_INET", authkey=key.encode())
+    channel = _Channel(conn)
+    completed = 0
+    try:
+        _, job = channel.request(("hello", socket.gethostname(), n_workers))
+        inputs = job.inputs
+        runner = StudyRunner(
+            _unpack(job, root),
+            job.design,
+            n_workers=n_workers,
+            experiment=job.experiment,
+            metrics=job.metrics,
+            early_stop=job.early_stop,
+            inputs=InputSignals.from_table(inputs) if inputs is not None else None,
+            warm_start=job.warm_start,
+        )
+
+        pending: set[Future[SampleResult]] = set()
+        stopped = False
+        with runner.pool() as submit, channel.heartbeat():
+            try:
+                while True:
+                    room = 2 * n_workers - len(pending)
+                    if not stopped and room > 0:
+                        reply = channel.request(("request", room))
+                        if reply[0] == "batch":
+                            pending.update(submit(index) for index in reply[1])
+                        stopped = reply[0] == "stop"
+
+                    if not pending:
+                        if stopped:
+                            break
+                        time.sleep(WAIT_SECONDS)
+                        continue
+
+                    done, pending = wait(pending, WAIT_SECONDS, FIRST_COMPLETED)
+                    for future in done:
+                        channel.send(("result", future.result()))
+                        completed += 1
+            except (EOFError, OSError):
+                # The coordinator is gone, nobody would receive the rest
+                runner.stop()
+                raise
+    finally:
+        conn.close()
+
+    return completed
+
+
+def _unpack(job: Job, root: Optional[Path]) -> Path:
+    root = Path(root) if root is not None else cache_dir() / "remote"
+    path = root / job.digest / job.fmu_name
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(job.fmu)
+        os.replace(tmp, path)
+    return path
+
+
+def main(
+    argv: Optional[List[str]] = None, prog: str = "python -m app.study.distributed"
+) -> int:
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Simulate the samples of a study run with batch --serve.",
+    )
+    parser.add_argument("address", help="HOST:PORT of the coordinator")
+    parser.add_argument("-j", "--workers", type=int, help="worker processes")
+    parser.add_argument("--key", help=f"shared key, default: ${KEY_VARIABLE}")
+    args = parser.parse_args(argv)
+
+    key = args.key or os.environ.get(KEY_VARIABLE)
+    if not key:
+        print(f"error: pass --key or set {KEY_VARIABLE}", file=sys.stderr)
+        return 1
+    try:
+        completed = work(parse_address(args.address), key, args.workers)
+    except (OSError, EOFError, ValueError, AuthenticationError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{completed} samples simulated", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
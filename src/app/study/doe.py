@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import functools
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+DISTRIBUTIONS = ("Uniform", "Normal")
+
+# Random numbers are drawn in fixed-size blocks seeded by (seed, block), so
+# sample i only depends on the seed and never on how many samples are drawn
+_BLOCK = 4096
+
+
+@dataclass(frozen=True)
+class ParameterRange:
+    name: str
+    lower: float
+    upper: float
+    distribution: str = "Uniform"
+
+    def __post_init__(self):
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{self.distribution}'")
+        if self.upper < self.lower:
+            raise ValueError(f"Empty range for '{self.name}'")
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        """Map unit-interval values onto the parameter distribution."""
+        if self.distribution == "Normal":
+            # The range spans ±3σ around its centre
+            mu = 0.5 * (self.lower + self.upper)
+            sigma = (self.upper - self.lower) / 6.0
+            return mu + sigma * _norm_ppf(u)
+
+        return self.lower + u * (self.upper - self.lower)
+
+    def levels(self, n: int) -> np.ndarray:
+        if n == 1:
+            return np.array([0.5 * (self.lower + self.upper)])
+        if self.distribution == "Normal":
+            # Equal-probability quantiles, the tails are infinite
+            return self.ppf((np.arange(n) + 0.5) / n)
+        return np.linspace(self.lower, self.upper, n)
+
+
+class Design(ABC):
+    method = ""
+
+    def __init__(
+        self,
+        ranges: Sequence[ParameterRange],
+        fixed: Optional[Mapping[str, Any]] = None,
+    ):
+        self.ranges = list(ranges)
+        self.fixed = dict(fixed or {})
+
+    @property
+    def names(self) -> List[str]:
+        return [r.name for r in self.ranges]
+
+    @property
+    def n_dims(self) -> int:
+        return len(self.ranges)
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def points(
+        self, indices: Optional[np.ndarray | Sequence[int]] = None
+    ) -> np.ndarray:
+        """Sample matrix of shape (len(indices), n_dims), all samples by default."""
+
+    def matrix(self) -> np.ndarray:
+        return self.points()
+
+    def point(self, index: int) -> np.ndarray:
+        return self.points([index])[0]
+
+    def start_values(self, index: int) -> Dict[str, Any]:
+        values = dict(self.fixed)
+        values.update(zip(self.names, self.point(index).tolist()))
+        return values
+
+    def chunks(self, size: int = 65_536) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (indices, points) blocks so huge designs never sit in memory."""
+        for start in range(0, len(self), size):
+            indices = np.arange(start, min(start + size, len(self)), dtype=np.int64)
+            yield indices, self.points(indices)
+
+    def _check(self, indices) -> np.ndarray:
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f"Sample index out of range for {len(self)} samples")
+        return indices
+
+
+class RandomDesign(Design):
+    """Seeded samples on the unit cube, mapped through the distributions."""
+
+    def __init__(self, ranges, n_samples: int, seed: int = 0, fixed=None):
+        super().__init__(ranges, fixed)
+        self.n_samples = int(n_samples)
+        self.seed = int(seed)
+        self._block_cache: Tuple[int, np.ndarray] | None = None
+
+    def __len__(self) -> int:
+        return self.n_samples
+
+    @abstractmethod
+    def _unit(self, indices: np.ndarray) -> np.ndarray: ...
+
+    def points(
+        self, indices: Optional[np.ndarray | Sequence[int]] = None
+    ) -> np.ndarray:
+        if indices is None:
+            indices = np.arange(len(self), dtype=np.int64)
+        indices = self._check(indices)
+
+        u = self._unit(indices)
+        # ParameterRange.ppf for all columns at once, a call per distribution
+        lower = np.array([r.lower for r in self.ranges])
+        upper = np.array([r.upper for r in self.ranges])
+        out = lower + u * (upper - lower)
+        normal = [j for j, r in enumerate(self.ranges) if r.distribution == "Normal"]
+        if normal:
+            mu = 0.5 * (lower[normal] + upper[normal])
+            sigma = (upper[normal] - lower[normal]) / 6.0
+            out[:, normal] = mu + sigma * _norm_ppf(u[:, normal])
+        return out
+
+
+class MonteCarloDesign(RandomDesign):
+    method = "Monte Carlo"
+
+    def _unit(self, indices: np.ndarray) -> np.ndarray:
+        return _block_uniform(self, self.seed, indices)
+
+
+class LatinHypercubeDesign(RandomDesign):
+    method = "Latin Hypercube"
+
+    def _unit(self, indices: np.ndarray) -> np.ndarray:
+        # Stratum of sample i in dimension j is a keyed permutation of i, so no
+        # (n_samples x n_dims) permutation table has to be kept around
+        jitter = _block_uniform(self, self.seed, indices)
+        keys = [(self.seed, j) for j in range(self.n_dims)]
+        strata = _permutations(indices, self.n_samples, keys)
+        return (strata + jitter) / self.n_samples
+
+
+class FullFactorialDesign(Design):
+    method = "Full Factorial"
+
+    def __init__(self, ranges, levels: int | Sequence[int] = 3, fixed=None):
+        super().__init__(ranges, fixed)
+        if isinstance(levels, int):
+            levels = [levels] * self.n_dims
+        if len(levels) != self.n_dims or any(n < 1 for n in levels):
+            raise ValueError("Need at least one level per parameter")
+
+        self.levels = [int(n) for n in levels]
+        self._values = [r.levels(n) for r, n in zip(self.ranges, self.levels)]
+
+        if math.prod(self.levels) > np.iinfo(np.int64).max:
+            raise ValueError("Full factorial design has too many samples")
+
+    def __len__(self) -> int:
+        return math.prod(self.levels)
+
+    def points(self, indices=None) -> np.ndarray:
+        if indices is None:
+            indices = np.arange(len(self), dtype=np.int64)
+        indices = self._check(indices)
+
+        # Index -> grid coordinates, the Cartesian product is never built
+        out = np.empty((len(indices), self.n_dims))
+        if self.n_dims:
+            coords = np.unravel_index(indices, self.levels)
+            for j, (values, c) in enumerate(zip(self._values, coords)):
+                out[:, j] = values[c]
+        return out
+
+
+class PointDesign(Design):
+    """Explicit parameter values, one row per sample, e.g. adaptive proposals."""
+
+    method = "Points"
+
+    def __init__(self, ranges, values: np.ndarray, fixed=None):
+        super().__init__(ranges, fixed)
+        self.values = np.asarray(values, dtype=np.float64).reshape(-1, self.n_dims)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def points(self, indices=None) -> np.ndarray:
+        if indices is None:
+            return self.values.copy()
+        return self.values[self._check(indices)]
+
+
+METHODS = {
+    cls.method: cls
+    for cls in (MonteCarloDesign, LatinHypercubeDesign, FullFactorialDesign)
+}
+
+
+def make_design(
+    method: str,
+    ranges: Sequence[ParameterRange],
+    n_samples: int = 100,
+    seed: int = 0,
+    levels: int | Sequence[int] = 3,
+    fixed: Optional[Mapping[str, Any]] = None,
+) -> Design:
+    if method == FullFactorialDesign.method:
+        return FullFactorialDesign(ranges, levels=levels, fixed=fixed)
+    if method in METHODS:
+        return METHODS[method](ranges, n_samples=n_samples, seed=seed, fixed=fixed)
+    raise ValueError(f"Unknown DOE method '{method}'")
+
+
+# ──────────────────────────────────────────────────────────────── Helpers ──
+
+
+def _block_uniform(design, seed: int, indices: np.ndarray) -> np.ndarray:
+    out = np.empty((len(indices), design.n_dims))
+    blocks = indices // _BLOCK
+
+    for b in np.unique(blocks):
+        # Workers ask for one index at a time, mostly from the same block
+        cached = design._block_cache
+        if cached is None or cached[0] != b:
+            rng = np.random.default_rng([seed, int(b)])
+            cached = (int(b), rng.random((_BLOCK, design.n_dims)))
+            design._block_cache = cached
+
+        mask = blocks == b
+        out[mask] = cached[1][indices[mask] % _BLOCK]
+
+    return out
+
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_MIX2 = np.uint64(0xBF58476D1CE4E5B9)
+
+
+def _permutations(
+    indices: np.ndarray, n: int, keys: Sequence[Tuple[int, ...]]
+) -> np.ndarray:
+    """One keyed bijection of range(n) per key, shape (len(indices), len(keys)).
+
+    All keys are evaluated in the same array operations, a single index
+    costs about as much for eight dimensions as for one.
+    """
+    if n <= 1:
+        return np.zeros((len(indices), len(keys)))
+
+    # Feistel network on the smallest even number of bits covering n, values
+    # that land outside range(n) are walked along their cycle until they don't
+    half = np.uint64(max(1, ((n - 1).bit_length() + 1) // 2))
+    mask = (np.uint64(1) << half) - np.uint64(1)
+    # (rounds, keys), broadcast along the indices
+    round_keys = np.array([_round_keys(tuple(key)) for key in keys], dtype=np.uint64).T
+
+    out = np.asarray(indices, dtype=np.uint64)[:, None]
+    out = _feistel(out, round_keys[:, None, :], half, mask)
+    rows, cols = np.nonzero(out >= n)
+    while len(rows):
+        value = _feistel(out[rows, cols], round_keys[:, cols], half, mask)
+        out[rows, cols] = value
+        walking = value >= n
+        rows, cols = rows[walking], cols[walking]
+
+    return out.astype(np.float64)
+
+
+def _feistel(
+    value: np.ndarray, round_keys: np.ndarray, half: np.uint64, mask: np.uint64
+) -> np.ndarray:
+    left, right = value >> half, value & mask
+    for k in round_keys:
+        # The key goes in before mixing, otherwise permutations of different
+        # keys differ by little more than an XOR and dimensions correlate
+        f = (right ^ k) * _MIX
+        f = (f ^ (f >> np.uint64(32))) * _MIX2
+        f = (f ^ (f >> np.uint64(29))) & mask
+        left, right = right, left ^ f
+    return (left << half) | right
+
+
+@functools.lru_cache(maxsize=256)
+def _round_keys(key: Tuple[int, ...]) -> Tuple[np.uint64, ...]:
+    # Seeding a generator costs more than a whole permutation of one index
+    keys = np.random.default_rng(list(key)).integers(0, 2**63, size=4, dtype=np.uint64)
+    return tuple(keys)
+
+
+def _norm_ppf(u: np.ndarray) -> np.ndarray:
+    """Inverse standard normal CDF (Acklam's approximation, |rel. err| < 1.2e-9)."""
+    a = (
+        -3.969683028665376e01,
+        2.209460984245205e02,
+        -2.759285104469687e02,
+        1.383577518672690e02,
+        -3.066479806614716e01,
+        2.506628277459239e00,
+    )
+    b = (
+        -5.447609879822406e01,
+        1.615858368580409e02,
+        -1.556989798598866e02,
+        6.680131188771972e01,
+        -1.328068155288572e01,
+    )
+    c = (
+        -7.784894002430293e-03,
+        -3.223964580411365e-01,
+        -2.400758277161838e00,
+        -2.549732539343734e00,
+        4.374664141464968e00,
+        2.938163982698783e00,
+    )
+    d = (
+        7.784695709041462e-03,
+        3.224671290700398e-01,
+        2.445134137142996e00,
+        3.754408661907416e00,
+    )
+
+    u = np.clip(np.asarray(u, dtype=np.float64), 1e-300, 1.0 - 1e-16)
+    out = np.empty_like(u)
+    lo, hi = u < 0.02425, u > 1.0 - 0.02425
+    mid = ~(lo | hi)
+
+    q = u[mid] - 0.5
+    r = q * q
+    out[mid] = (
+        (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5])
+        * q
+        / (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1.0)
+    )
+
+    for mask, sign, p in ((lo, 1.0, u[lo]), (hi, -1.0, 1.0 - u[hi])):
+        q = np.sqrt(-2.0 * np.log(p))
+        out[mask] = (
+            sign
+            * (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5])
+            / ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1.0)
+        )
+
+    return out
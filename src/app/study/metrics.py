@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass
+from typing import List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.schemas.metrics_spec import STATISTICS, MetricSpec
+from app.study.results import ResultStore
+
+
+@dataclass(frozen=True)
+class MetricPlan:
+    """Picklable, name-only description of the metrics to evaluate per sample."""
+
+    signals: Tuple[str, ...] = ()
+    statistics: Tuple[str, ...] = ()
+    lower: Tuple[Optional[float], ...] = ()
+    upper: Tuple[Optional[float], ...] = ()
+
+    @classmethod
+    def from_specs(cls, specs: Sequence[MetricSpec]) -> MetricPlan:
+        for m in specs:
+            if m.statistic not in STATISTICS:
+                raise ValueError(f"Unknown statistic '{m.statistic}'")
+
+        return cls(
+            signals=tuple(m.signal.name for m in specs),
+            statistics=tuple(m.statistic for m in specs),
+            lower=tuple(m.lower for m in specs),
+            upper=tuple(m.upper for m in specs),
+        )
+
+    def __len__(self) -> int:
+        return len(self.signals)
+
+    @property
+    def names(self) -> List[str]:
+        return [f"{stat}({sig})" for sig, stat in zip(self.signals, self.statistics)]
+
+    @property
+    def _stat_index(self) -> np.ndarray:
+        return np.array([STATISTICS.index(s) for s in self.statistics], dtype=np.intp)
+
+
+class OnlineMetrics:
+    """Running accumulators for all metrics of one sample.
+
+    Fed one output point at a time, so a trajectory never has to be kept. The
+    integrals use the trapezoidal rule in the same operation order as
+    evaluate(), which makes both paths agree bit for bit on the same points.
+    """
+
+    def __init__(self, plan: MetricPlan):
+        self.plan = plan
+        self._stat = plan._stat_index
+        self._cols = np.arange(len(plan))
+
+        self._max_upper, self._min_lower = _stop_bounds(plan)
+
+        self.reset()
+
+    def reset(self) -> None:
+        n = len(self.plan)
+        self.t0: Optional[float] = None
+        self.t: Optional[float] = None
+        self.y = np.full(n, np.nan)
+        self.max = np.full(n, -np.inf)
+        self.min = np.full(n, np.inf)
+        self.integral = np.zeros(n)
+        self.sq_integral = np.zeros(n)
+
+    def update(self, t: float, y: np.ndarray) -> None:
+        y = np.asarray(y, dtype=np.float64)
+
+        if self.t is None:
+            self.t0 = t
+        else:
+            dt = t - self.t
+            self.integral += 0.5 * (y + self.y) * dt
+            self.sq_integral += 0.5 * (y * y + self.y * self.y) * dt
+
+        np.maximum(self.max, y, out=self.max)
+        np.minimum(self.min, y, out=self.min)
+        self.t = t
+        self.y = y
+
+    def infeasible(self) -> bool:
+        """True once a constraint is violated whatever the rest of the run does."""
+        return bool(
+            np.any(self.max > self._max_upper) or np.any(self.min < self._min_lower)
+        )
+
+    def copy(self) -> OnlineMetrics:
+        """Independent accumulators in the same state."""
+        other = copy.copy(self)
+        for name in ("y", "max", "min", "integral", "sq_integral"):
+            setattr(other, name, getattr(self, name).copy())
+        return other
+
+    def values(self) -> np.ndarray:
+        if self.t is None:
+            return np.full(len(self.plan), np.nan)
+
+        span = self.t - self.t0
+        return _select(
+            self._stat,
+            self._cols,
+            self.max,
+            self.min,
+            self.integral,
+            self.sq_integral,
+            self.y,
+            np.asarray(span),
+        )
+
+
+def evaluate(
+    plan: MetricPlan,
+    time: np.ndarray,
+    data: Mapping[str, np.ndarray],
+    lengths: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Vectorized metrics over stored trajectories.
+
+    data maps signal names to (n_samples, n_points) arrays on the shared time
+    grid, lengths gives the number of valid points per sample (all by default).
+    Returns an (n_samples, n_metrics) array.
+    """
+    time = np.asarray(time, dtype=np.float64)
+    n_samples = len(next(iter(data.values()))) if data else 0
+    if lengths is None:
+        lengths = np.full(n_samples, len(time))
+    lengths = np.asarray(lengths, dtype=np.intp)
+
+    rows = np.arange(n_samples)
+    last = np.maximum(lengths - 1, 0)
+    span = time[last] - time[0]
+    dt = np.diff(time)
+    valid = np.arange(len(time)) < lengths[:, None]
+
+    out = np.full((n_samples, len(plan)), np.nan)
+    stat = plan._stat_index
+
+    for k, signal in enumerate(plan.signals):
+        y = np.where(valid, np.asarray(data[signal], dtype=np.float64), np.nan)
+
+        # cumsum adds sequentially, exactly like the online accumulators
+        integral = _running_trapz(0.5 * (y[:, 1:] + y[:, :-1]) * dt, last)
+        y2 = y * y
+        sq_integral = _running_trapz(0.5 * (y2[:, 1:] + y2[:, :-1]) * dt, last)
+
+        out[:, k] = _select(
+            stat[k],
+            rows,
+            np.max(y, axis=1, where=valid, initial=-np.inf),
+            np.min(y, axis=1, where=valid, initial=np.inf),
+            integral,
+            sq_integral,
+            y[rows, last],
+            span,
+        )
+
+    out[lengths == 0] = np.nan
+    return out
+
+
+def first_violation(plan: MetricPlan, data: Mapping[str, np.ndarray]) -> Optional[int]:
+    """First point at which early stop ends a trajectory, None if it never does.
+
+    data maps signal names to 1-D arrays. Same test as
+    OnlineMetrics.infeasible() after every point.
+    """
+    max_upper, min_lower = _stop_bounds(plan)
+    first: Optional[int] = None
+    for k, signal in enumerate(plan.signals):
+        y = np.asarray(data[signal], dtype=np.float64)
+        violated = (np.maximum.accumulate(y) > max_upper[k]) | (
+            np.minimum.accumulate(y) < min_lower[k]
+        )
+        if violated.any():
+            at = int(np.argmax(violated))
+            first = at if first is None else min(first, at)
+    return first
+
+
+def _stop_bounds(plan: MetricPlan) -> Tuple[np.ndarray, np.ndarray]:
+    # Bounds that a running max/min can cross but never come back from
+    stats = np.array(plan.statistics, dtype=object)
+    upper = np.array([np.inf if hi is None else hi for hi in plan.upper], dtype=float)
+    lower = np.array([-np.inf if lo is None else lo for lo in plan.lower], dtype=float)
+    return (
+        np.where(stats == "max", upper, np.inf),
+        np.where(stats == "min", lower, -np.inf),
+    )
+
+
+def _running_trapz(terms: np.ndarray, last: np.ndarray) -> np.ndarray:
+    if terms.shape[1] == 0:
+        return np.zeros(len(last))
+    total = np.cumsum(terms, axis=1)[np.arange(len(last)), np.maximum(last - 1, 0)]
+    return np.where(last > 0, total, 0.0)
+
+
+def _select(stat, cols, vmax, vmin, integral, sq_integral, final, span) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(span > 0, integral / span, final)
+        rms = np.where(span > 0, np.sqrt(sq_integral / span), np.abs(final))
+
+    # Same order as STATISTICS
+    table = np.stack(np.broadcast_arrays(vmax, vmin, mean, rms, final, integral))
+    return table[stat, cols]
+
+
+def evaluate_store(
+    plan: MetricPlan, store: ResultStore, rows: int = 1024
+) -> np.ndarray:
+    """Offline metrics of every completed sample, streamed in bounded blocks."""
+    out = np.full((store.n_samples, len(plan)), np.nan)
+    done = store.completed()
+
+    for start in range(0, len(done), rows):
+        indices = done[start : start + rows]
+        data = {name: store.column(name)[indices] for name in set(plan.signals)}
+        out[indices] = evaluate(plan, store.time, data, store.lengths[indices])
+
+    return out
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+META_FILE = "meta.json"
+
+# Per-sample status codes kept in status.npy
+STATUS_CODES = {"pending": 0, "ok": 1, "failed": 2, "cancelled": 3, "infeasible": 4}
+
+
+class ResultStore:
+    """Columnar on-disk study results.
+
+    Every signal is one memory-mapped (n_samples, n_points) float64 array, so a
+    (signal, sample) trajectory is a contiguous row on the shared time grid.
+    Rows are written in place by the worker that simulated the sample and read
+    back as views, nothing is ever loaded as a whole. The status column doubles
+    as the checkpoint of a run: samples still pending or cancelled are exactly
+    the ones a resumed run has to simulate.
+    """
+
+    def __init__(self, root: Path, mode: str = "r"):
+        self.root = Path(root)
+        self.mode = mode
+
+        meta = json.loads((self.root / META_FILE).read_text())
+        self.signals: List[str] = meta["signals"]
+        self.metrics: List[str] = meta.get("metrics", [])
+        self.n_samples: int = meta["n_samples"]
+        # Identifies the study settings the results belong to
+        self.fingerprint: str = meta.get("fingerprint", "")
+        self._files: Dict[str, str] = meta["files"]
+        self._columns: Dict[str, np.memmap] = {}
+
+        self.time = np.load(self.root / "time.npy", mmap_mode="r")
+        self.status = np.load(self.root / "status.npy", mmap_mode=mode)
+        self.lengths = np.load(self.root / "lengths.npy", mmap_mode=mode)
+        self.metric_values = np.load(self.root / "metrics.npy", mmap_mode=mode)
+        self.cut_times = np.load(self.root / "cut_times.npy", mmap_mode=mode)
+
+    @classmethod
+    def create(
+        cls,
+        root: Path,
+        signals: Sequence[str],
+        n_samples: int,
+        time: np.ndarray,
+        metrics: Sequence[str] = (),
+        fingerprint: str = "",
+    ) -> ResultStore:
+        """Allocate a store. Without signals only metric values are kept."""
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+
+        # Signal names are arbitrary Modelica identifiers, files are numbered
+        files = {name: f"signal_{k:05d}.npy" for k, name in enumerate(signals)}
+        shape = (int(n_samples), len(time))
+
+        np.save(root / "time.npy", np.asarray(time, dtype=np.float64))
+        for name, dtype in (("status", np.int8), ("lengths", np.int32)):
+            np.lib.format.open_memmap(
+                root / f"{name}.npy", mode="w+", dtype=dtype, shape=shape[:1]
+            ).flush()
+        for name, n in (("metrics", len(metrics)), ("cut_times", None)):
+            values = np.lib.format.open_memmap(
+                root / f"{name}.npy",
+                mode="w+",
+                dtype=np.float64,
+                shape=shape[:1] if n is None else (shape[0], n),
+            )
+            values[:] = np.nan
+            values.flush()
+        for file in files.values():
+            # Sparse until written, allocating does not touch the pages
+            np.lib.format.open_memmap(
+                root / file, mode="w+", dtype=np.float64, shape=shape
+            ).flush()
+
+        meta = {
+            "signals": list(signals),
+            "metrics": list(metrics),
+            "n_samples": int(n_samples),
+            "files": files,
+            "fingerprint": fingerprint,
+        }
+        (root / META_FILE).write_text(json.dumps(meta, indent=2))
+
+        return cls(root, mode="r+")
+
+    @classmethod
+    def resume(cls, root: Path, fingerprint: str) -> Optional[ResultStore]:
+        """Reopen the store an earlier run of the same study left, or None."""
+        root = Path(root)
+        try:
+            meta = json.loads((root / META_FILE).read_text())
+        except (OSError, ValueError):
+            return None
+        if not fingerprint or meta.get("fingerprint") != fingerprint:
+            return None
+        return cls(root, mode="r+")
+
+    # ──────────────────────────────────────────────────────────────── Write ──
+
+    def write(self, index: int, trajectory: np.ndarray) -> None:
+        """Store one simulation result (structured array with a 'time' column)."""
+        t = np.asarray(trajectory["time"], dtype=np.float64)
+        grid = self.time
+
+        if len(t) == len(grid) and np.allclose(t, grid):
+            n = len(grid)
+            for name in self.signals:
+                self.column(name)[index] = trajectory[name]
+        else:
+            # Event points or an early stop, resample onto the shared grid
+            n = int(np.searchsorted(grid, t[-1], side="right")) if len(t) else 0
+            for name in self.signals:
+                row = self.column(name)[index]
+                row[:n] = np.interp(grid[:n], t, trajectory[name])
+                row[n:] = np.nan
+
+        self.lengths[index] = n
+
+    def write_metrics(self, index: int, values: Sequence[float]) -> None:
+        self.metric_values[index] = values
+
+    def set_status(
+        self, index: int, status: str, cut_time: Optional[float] = None
+    ) -> None:
+        self.status[index] = STATUS_CODES[status]
+        if cut_time is not None:
+            self.cut_times[index] = cut_time
+
+    def flush(self) -> None:
+        if self.mode == "r":
+            return
+        self.status.flush()
+        self.lengths.flush()
+        self.metric_values.flush()
+        self.cut_times.flush()
+        for column in self._columns.values():
+            column.flush()
+
+    # ───────────────────────────────────────────────────────────────── Read ──
+
+    def column(self, name: str) -> np.memmap:
+        """All samples of one signal, shape (n_samples, n_points), zero-copy."""
+        column = self._columns.get(name)
+        if column is None:
+            column = np.load(self.root / self._files[name], mmap_mode=self.mode)
+            self._columns[name] = column
+        return column
+
+    def trajectory(self, name: str, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        n = int(self.lengths[index])
+        return self.time[:n], self.column(name)[index, :n]
+
+    def completed(self) -> np.ndarray:
+        return np.flatnonzero(self.status == STATUS_CODES["ok"])
+
+    def missing(self) -> np.ndarray:
+        """Samples a run still has to simulate, in order."""
+        status = self.status
+        return np.flatnonzero(
+            (status == STATUS_CODES["pending"]) | (status == STATUS_CODES["cancelled"])
+        )
+
+    def count(self, status: str) -> int:
+        return int(np.count_nonzero(self.status == STATUS_CODES[status]))
+
+    def chunks(
+        self, name: str, rows: int = 1024, window: slice = slice(None)
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (indices, block) of completed samples, a bounded block at a time.
+
+        window selects the time points, pages outside of it are never read.
+        """
+        column = self.column(name)
+        done = self.completed()
+        for start in range(0, len(done), rows):
+            indices = done[start : start + rows]
+            # Contiguous runs stay views, scattered rows are copied per block only
+            if indices[-1] - indices[0] + 1 == len(indices):
+                yield indices, column[indices[0] : indices[-1] + 1, window]
+            else:
+                yield indices, column[indices, window]
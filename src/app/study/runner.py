@@ -0,0 +1,710 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import shutil
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from multiprocessing.util import Finalize
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+)
+
+import numpy as np
+
+from app.log_sink import get_logger
+from app.model_cache import load_model_description, parse_fmu
+from app.schemas.experiment import Experiment
+from app.study.applicator import SampleApplicator
+from app.study.doe import Design
+from app.study.metrics import MetricPlan, OnlineMetrics, evaluate, first_violation
+from app.study.results import ResultStore
+from app.study.signals import InputSignals
+from app.study.sim_cache import SimulationCache
+from app.study.telemetry import RunTelemetry, SampleTiming
+from app.study.warm_start import Snapshot, snap_to_grid, unsupported
+
+if TYPE_CHECKING:
+    from app.study.distributed import Coordinator
+
+# Results written through the memory maps reach the disk at least this often,
+# which bounds what a crash of the machine can lose
+CHECKPOINT_SECONDS = 10.0
+
+# How often the main loop looks for new capacity while samples run remotely
+POLL_SECONDS = 0.2
+
+
+@dataclass
+class SampleResult:
+    index: int
+    status: str = "ok"  # "ok" | "failed" | "cancelled" | "infeasible"
+    error: Optional[str] = None
+    trajectory: Optional[Any] = None
+    metrics: Optional[List[float]] = None
+    # Simulation time at which an infeasible sample was stopped
+    cut_time: Optional[float] = None
+    timing: Optional[SampleTiming] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+@dataclass
+class _WorkerSetup:
+    fmu_path: Path
+    design: Design
+    experiment: Optional[Experiment]
+    outputs: Optional[List[str]]
+    store_root: Optional[Path]
+    metrics: MetricPlan
+    early_stop: bool = False
+    cache: Optional[SimulationCache] = None
+    inputs: Optional[InputSignals] = None
+    snapshot: Optional[Snapshot] = None
+
+
+# ──────────────────────────────────────────────────────────────── Worker side ──
+
+# One instance per worker process, created by the pool initializer
+_worker: Optional[_SampleWorker] = None
+
+
+class _SampleWorker:
+    def __init__(self, setup: _WorkerSetup, cancel):
+        self._cancel = cancel
+        self.design = setup.design
+        self.store = (
+            ResultStore(setup.store_root, mode="r+") if setup.store_root else None
+        )
+
+        self.metrics = OnlineMetrics(setup.metrics) if len(setup.metrics) else None
+        self._metric_cols: Optional[List[int]] = None
+        self._fed = 0
+        self._early_stop = setup.early_stop and self.metrics is not None
+        self._cut_time: Optional[float] = None
+        self.cache = setup.cache
+        # Mapped read-only, all workers share the pages of one file
+        self.inputs = setup.inputs.load() if setup.inputs is not None else None
+        self._flushed = time.monotonic()
+        # Samples continue from the state after the shared prefix
+        self.snapshot = setup.snapshot
+        self._state = None  # the snapshot, deserialized into this instance
+
+        # Record what is stored plus what the metrics need, and nothing else
+        if self.store is not None:
+            self.outputs = _unique(self.store.signals + list(setup.metrics.signals))
+        elif self.metrics is not None:
+            self.outputs = _unique(setup.metrics.signals)
+        else:
+            self.outputs = setup.outputs
+        # Metrics only: drop recorded rows as soon as the accumulators saw them,
+        # unless the whole trajectory goes to the simulation cache
+        self._trim = (
+            self.metrics is not None
+            and self.cache is None
+            and (self.store is None or not self.store.signals)
+        )
+
+        from fmpy import extract
+
+        # Extract and instantiate once, every sample only resets the instance
+        self.unzipdir = extract(str(setup.fmu_path))
+        self.model_description = load_model_description(setup.fmu_path)
+        self.fmi_type = (
+            "CoSimulation"
+            if self.model_description.coSimulation is not None
+            else "ModelExchange"
+        )
+        self.experiment = setup.experiment or Experiment.from_model_description(
+            self.model_description
+        )
+        # Value references and setters resolved once, not per sample
+        self.applicator = SampleApplicator(self.design, self.model_description)
+        t = time.perf_counter()
+        self.fmu = self._instantiate()
+        # Charged to the first sample, it is part of what a worker costs
+        self._instantiate_time = time.perf_counter() - t
+        self._dirty = False
+
+        self._timing: Optional[SampleTiming] = None
+        self._first_step = True
+
+        # Metrics accumulated over the prefix, copied for every sample
+        self._prefix_metrics: Optional[OnlineMetrics] = None
+        if self.snapshot is not None and self.metrics is not None:
+            prefix = self.snapshot.trajectory
+            self._feed(prefix.tolist(), prefix.dtype.names)
+            self._prefix_metrics = self.metrics.copy()
+
+    def _instantiate(self):
+        from fmpy import instantiate_fmu
+
+        return instantiate_fmu(self.unzipdir, self.model_description, self.fmi_type)
+
+    def _reset(self, timing: SampleTiming) -> None:
+        if not self._dirty:
+            return
+
+        t = time.perf_counter()
+        try:
+            self.fmu.reset()
+        except Exception:
+            # A failed sample can leave the instance in an unrecoverable state,
+            # the failed reset and the new instance both count as recovery
+            self.fmu.freeInstance()
+            self.fmu = self._instantiate()
+            timing.add("recover", time.perf_counter() - t)
+        else:
+            timing.add("reset", time.perf_counter() - t)
+
+        self._dirty = False
+
+    def _restore(self, timing: SampleTiming) -> None:
+        assert self.snapshot is not None
+        t = time.perf_counter()
+        try:
+            if self._state is None:
+                self._state = self.fmu.deserializeFMUState(self.snapshot.state)
+            self.fmu.setFMUState(self._state)
+        except Exception:
+            # Same as a failed reset, the saved state goes into a new instance
+            self.fmu.freeInstance()
+            self.fmu = self._instantiate()
+            timing.add("recover", time.perf_counter() - t)
+            with timing.phase("reset"):
+                self._state = self.fmu.deserializeFMUState(self.snapshot.state)
+                self.fmu.setFMUState(self._state)
+        else:
+            timing.add("reset", time.perf_counter() - t)
+
+    def _feed(self, rows: Sequence[Sequence[float]], names: Sequence[str]) -> None:
+        assert self.metrics is not None
+        if self._metric_cols is None:
+            self._metric_cols = [
+                list(names).index(s) for s in self.metrics.plan.signals
+            ]
+
+        cols = self._metric_cols
+        for row in rows:
+            self.metrics.update(row[0], [row[c] for c in cols])
+
+    def _step_finished(self, t: float, recorder) -> bool:
+        timing = self._timing
+        if self._first_step and timing is not None:
+            # Everything before the first step: start values, initialization
+            timing.add("setup", time.perf_counter() - self._sim_started)
+            self._first_step = False
+
+        if self.metrics is not None:
+            rows = recorder.rows
+            fed = time.perf_counter()
+            self._feed(rows[self._fed :], [c[0] for c in recorder.cols])
+            if timing is not None:
+                timing.add("metrics", time.perf_counter() - fed)
+            if self._trim:
+                rows.clear()
+            self._fed = len(rows)
+
+            if self._early_stop and self.metrics.infeasible():
+                # The outcome is decided, stop spending solver time on it
+                self._cut_time = t
+                return False
+
+        return not self._cancel.is_set()
+
+    def run(self, index: int) -> SampleResult:
+        if self._cancel.is_set():
+            return SampleResult(index, status="cancelled")
+
+        timing = self._timing = SampleTiming.begin()
+        timing.add("instantiate", self._instantiate_time)
+        self._instantiate_time = 0.0
+        try:
+            result = self._simulate(index, timing)
+        finally:
+            self._timing = None
+        result.timing = timing.finish()
+        return result
+
+    def _simulate(self, index: int, timing: SampleTiming) -> SampleResult:
+        warm = self.snapshot is not None
+        try:
+            if warm:
+                self._restore(timing)
+            else:
+                self._reset(timing)
+        except Exception:
+            return SampleResult(index, status="failed", error=traceback.format_exc())
+        self._dirty = True
+        self._fed = 0
+        self._cut_time = None
+        if self._prefix_metrics is not None:
+            self.metrics = self._prefix_metrics.copy()
+        elif self.metrics is not None:
+            self.metrics.reset()
+
+        from fmpy import simulate_fmu
+
+        self._first_step = True
+        self._sim_started = time.perf_counter()
+        experiment = self.experiment
+        start_time = self.snapshot.time if warm else experiment.start_time
+        try:
+            # Start values go to the instance in batches, fmpy only gets what is
+            # left. Co-simulation FMUs are initialized here altogether, or not
+            # at all when they continue from the snapshot.
+            initialize = self.fmi_type != "CoSimulation"
+            if warm:
+                remaining = {}
+                self.applicator.apply_varied(self.fmu, index)
+            elif initialize:
+                remaining = self.applicator.apply(self.fmu, index)
+            else:
+                remaining = {}
+                self.applicator.initialize(
+                    self.fmu,
+                    index,
+                    experiment.start_time,
+                    experiment.stop_time,
+                    experiment.tolerance,
+                    self.inputs,
+                )
+            trajectory = simulate_fmu(
+                self.unzipdir,
+                model_description=self.model_description,
+                fmu_instance=self.fmu,
+                start_values=remaining,
+                initialize=initialize,
+                # The instance stays in step mode, the next sample restores it
+                terminate=not warm,
+                start_time=start_time,
+                stop_time=experiment.stop_time,
+                output_interval=experiment.output_interval,
+                relative_tolerance=experiment.tolerance,
+                input=self.inputs,
+                # Keep the output on the shared grid of the result store
+                record_events=False,
+                output=self.outputs,
+                step_finished=self._step_finished,
+            )
+        except Exception:
+            return SampleResult(index, status="failed", error=traceback.format_exc())
+        finally:
+            # What the step loop took besides the metric updates
+            other = sum(timing.phases.get(p, 0.0) for p in ("setup", "metrics"))
+            timing.add("simulate", time.perf_counter() - self._sim_started - other)
+
+        if self._cancel.is_set():
+            return SampleResult(index, status="cancelled")
+
+        result = SampleResult(index)
+        if self._cut_time is not None:
+            result.status = "infeasible"
+            result.cut_time = self._cut_time
+        elif self.cache is not None:
+            # Only complete runs are worth reusing
+            with timing.phase("cache"):
+                key = self.cache.key(self.design.start_values(index))
+                self.cache.put(key, trajectory)
+
+        if self.metrics is not None:
+            # Points recorded after the last step callback
+            with timing.phase("metrics"):
+                self._feed(trajectory[self._fed :].tolist(), trajectory.dtype.names)
+                result.metrics = self.metrics.values().tolist()
+
+        if warm and not self._trim:
+            trajectory = np.concatenate([self.snapshot.trajectory, trajectory])
+
+        if self.store is not None:
+            # Written in place, only the status travels back to the main process
+            if self.store.signals:
+                with timing.phase("write"):
+                    self.store.write(index, trajectory)
+                    if time.monotonic() - self._flushed >= CHECKPOINT_SECONDS:
+                        self.store.flush()
+                        self._flushed = time.monotonic()
+        elif self.metrics is None:
+            result.trajectory = trajectory
+
+        return result
+
+    def prefix(self, t0: float) -> Snapshot:
+        """Simulate up to t0 with the fixed values only and save the state."""
+        from fmpy import simulate_fmu
+
+        experiment = self.experiment
+        self._dirty = True
+        self.applicator.initialize(
+            self.fmu,
+            None,
+            experiment.start_time,
+            experiment.stop_time,
+            experiment.tolerance,
+            self.inputs,
+        )
+        trajectory = simulate_fmu(
+            self.unzipdir,
+            model_description=self.model_description,
+            fmu_instance=self.fmu,
+            initialize=False,
+            terminate=False,
+            start_time=experiment.start_time,
+            stop_time=t0,
+            output_interval=experiment.output_interval,
+            relative_tolerance=experiment.tolerance,
+            input=self.inputs,
+            record_events=False,
+            output=self.outputs,
+            step_finished=lambda *_: not self._cancel.is_set(),
+        )
+        end = trajectory["time"][-1]
+        if not np.isclose(end, t0):
+            raise RuntimeError(f"The prefix stopped at t = {end:g}")
+
+        state = self.fmu.getFMUState()
+        try:
+            data = self.fmu.serializeFMUState(state)
+        finally:
+            self.fmu.freeFMUState(state)
+        # The samples record t0 themselves, with their own values set
+        return Snapshot(t0, data, trajectory[:-1])
+
+    def close(self) -> None:
+        try:
+            if self._dirty:
+                self.fmu.terminate()
+        except Exception:
+            pass
+        finally:
+            self.fmu.freeInstance()
+            shutil.rmtree(self.unzipdir, ignore_errors=True)
+            if self.store is not None:
+                self.store.flush()
+
+
+def _init_worker(setup: _WorkerSetup, cancel) -> None:
+    global _worker
+    _worker = _SampleWorker(setup, cancel)
+    # atexit does not run in pool processes, multiprocessing finalizers do
+    Finalize(_worker, _worker.close, exitpriority=10)
+
+
+def _run_sample(index: int) -> SampleResult:
+    assert _worker is not None, "Worker process was not initialized"
+    return _worker.run(index)
+
+
+def _run_prefix(t0: float) -> Snapshot:
+    assert _worker is not None, "Worker process was not initialized"
+    return _worker.prefix(t0)
+
+
+# ──────────────────────────────────────────────────────────────── Main side ──
+
+
+class StudyRunner:
+    """Runs DOE samples of one FMU on a pool of worker processes."""
+
+    def __init__(
+        self,
+        fmu_path: Path,
+        design: Design,
+        n_workers: Optional[int] = None,
+        outputs: Optional[List[str]] = None,
+        experiment: Optional[Experiment] = None,
+        store: Optional[ResultStore] = None,
+        metrics: Optional[MetricPlan] = None,
+        early_stop: bool = False,
+        cache: Optional[SimulationCache] = None,
+        inputs: Optional[InputSignals] = None,
+        warm_start: Optional[float] = None,
+    ):
+        if cache is not None and cache.inputs != (inputs.digest if inputs else ""):
+            raise ValueError("The simulation cache is keyed for other input signals")
+
+        self.fmu_path = Path(fmu_path)
+        self.design = design
+        self.n_workers = max(1, n_workers or os.cpu_count() or 1)
+        # Cached samples are only valid for the experiment they were keyed with
+        self.experiment = cache.experiment if cache is not None else experiment
+        self.store = store
+        self.metrics = metrics or MetricPlan()
+        # Opt-in: abort samples as soon as a metric constraint is violated
+        self.early_stop = early_stop
+        # A store records exactly its own signals
+        self.outputs = store.signals if store is not None else outputs
+        # Samples found here are never simulated, see cache_hits after run()
+        self.cache = cache
+        self.cache_hits = 0
+        # Input signals already resampled onto the experiment grid
+        self.inputs = inputs
+        # Timings of the current or last run, see app.study.telemetry
+        self.telemetry: Optional[RunTelemetry] = None
+        # Opt-in: simulate up to this time once and start every sample from
+        # the saved FMU state, see warm_started after run()
+        self.warm_start = warm_start
+        self.warm_started = False
+
+        # "spawn" behaves the same on every platform and is the only option on
+        # Windows, so workers never inherit Qt state from the GUI process
+        self._context = mp.get_context("spawn")
+        self._cancel = self._context.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def stop(self) -> None:
+        # Thread-safe: called from the GUI thread while run() blocks elsewhere
+        self._cancel.set()
+
+    def run(
+        self,
+        indices: Optional[Iterable[int]] = None,
+        on_result: Optional[Callable[[SampleResult], None]] = None,
+        coordinator: Optional[Coordinator] = None,
+    ) -> int:
+        """Simulate the given design samples, return how many completed.
+
+        By default these are all samples, or with a store all samples it does
+        not hold a result for yet, so running again resumes a stopped run.
+
+        With warm_start the prefix up to that time is simulated once, if the
+        FMU can save its state and only tunable parameters or inputs vary.
+        Otherwise, or if the prefix fails, samples run from the start. Warm
+        started samples bypass the simulation cache, their results differ
+        from cold runs with the same start values.
+
+        Only sample indices cross the process boundary, workers evaluate the
+        design themselves. Indices are consumed lazily and at most a few per
+        worker are in flight at any time, so huge designs are fine. With a
+        coordinator they go to remote workers instead of the local pool, see
+        app.study.distributed.
+        """
+        self._cancel.clear()
+        self.cache_hits = 0
+        pending: Set[Future[SampleResult]] = set()
+        completed = 0
+        flushed = time.monotonic()
+        if indices is None:
+            if self.store is not None:
+                indices = self.store.missing()
+            else:
+                indices = range(len(self.design))
+        total = len(indices) if hasattr(indices, "__len__") else None
+        telemetry = self.telemetry = RunTelemetry(total, self.n_workers)
+        indices = iter(indices)
+
+        if coordinator is None:
+            setup = self._setup()
+            pool = self._pool(setup)
+            cached = setup.cache is not None
+
+            def capacity() -> int:
+                return 2 * self.n_workers
+
+        else:
+            # Remote hosts warm start themselves, cache lookups stay here
+            self.warm_started = False
+            pool = coordinator.serving(self)
+            cached = self.cache is not None
+            capacity = coordinator.capacity
+        recorded = self._recorded_signals() if cached else []
+
+        def record(result: SampleResult) -> None:
+            nonlocal completed, flushed
+            if result.status != "cancelled":
+                completed += 1
+            telemetry.record(result.index, result.status, result.timing)
+            if self.store is not None:
+                if result.metrics is not None:
+                    self.store.write_metrics(result.index, result.metrics)
+                # Set last, a sample counts as done once its data is in place
+                self.store.set_status(result.index, result.status, result.cut_time)
+                if time.monotonic() - flushed >= CHECKPOINT_SECONDS:
+                    self.store.flush()
+                    flushed = time.monotonic()
+            if on_result is not None:
+                on_result(result)
+
+        with pool as submit:
+            exhausted = False
+
+            while True:
+                while (
+                    not exhausted and not self.cancelled and len(pending) < capacity()
+                ):
+                    try:
+                        index = int(next(indices))
+                    except StopIteration:
+                        exhausted = True
+                        break
+
+                    timing = SampleTiming.begin()
+                    hit = None
+                    if cached:
+                        with timing.phase("cache"):
+                            hit = self._lookup(index, recorded)
+                    if hit is not None:
+                        self.cache_hits += 1
+                        result = self._from_cache(index, hit, timing)
+                        result.timing = timing.finish()
+                        record(result)
+                    else:
+                        pending.add(submit(index))
+
+                if not pending:
+                    break
+
+                # Remote capacity changes as workers come and go
+                timeout = None if coordinator is None else POLL_SECONDS
+                done, pending = wait(pending, timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if not future.cancelled():
+                        record(future.result())
+
+                if self.cancelled:
+                    for future in pending:
+                        future.cancel()
+                    if coordinator is not None:
+                        # Also those put back after a lost worker, already running
+                        coordinator.cancel()
+
+        if self.store is not None:
+            self.store.flush()
+        if self.cache is not None:
+            self.cache.prune()
+        telemetry.close()
+
+        return completed
+
+    @contextmanager
+    def pool(self) -> Iterator[Callable[[int], Future[SampleResult]]]:
+        """Worker processes for this study, yields a function submitting a sample.
+
+        For callers that schedule samples themselves, such as remote workers.
+        Results are not recorded anywhere, that is up to the caller.
+        """
+        self._cancel.clear()
+        with self._pool(self._setup()) as submit:
+            yield submit
+
+    def _setup(self) -> _WorkerSetup:
+        setup = _WorkerSetup(
+            fmu_path=self.fmu_path,
+            design=self.design,
+            experiment=self.experiment,
+            outputs=self.outputs,
+            store_root=self.store.root if self.store is not None else None,
+            metrics=self.metrics,
+            early_stop=self.early_stop,
+            cache=self.cache,
+            inputs=self.inputs,
+        )
+        snapshot = self._snapshot(setup) if self.warm_start is not None else None
+        self.warm_started = snapshot is not None
+        if snapshot is not None:
+            setup = replace(setup, cache=None, snapshot=snapshot)
+        return setup
+
+    @contextmanager
+    def _pool(self, setup: _WorkerSetup) -> Iterator[Callable[[int], Future]]:
+        with ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(setup, self._cancel),
+        ) as pool:
+            yield lambda index: pool.submit(_run_sample, index)
+
+    # ────────────────────────────────────────────────────────── Warm start ──
+
+    def _snapshot(self, setup: _WorkerSetup) -> Optional[Snapshot]:
+        # The prefix runs in a process of its own, like every simulation
+        md = load_model_description(self.fmu_path)
+        experiment = self.experiment or Experiment.from_model_description(md)
+        assert self.warm_start is not None
+        t0 = snap_to_grid(experiment, self.warm_start)
+        reason = unsupported(md, self.design, experiment, t0)
+        if reason is None:
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=self._context,
+                    initializer=_init_worker,
+                    initargs=(setup, self._cancel),
+                ) as pool:
+                    return pool.submit(_run_prefix, t0).result()
+            except Exception as e:
+                if self.cancelled:
+                    return None
+                reason = f"the prefix failed: {e}"
+
+        get_logger().warning("No warm start, %s. Samples run from the start.", reason)
+        return None
+
+    # ─────────────────────────────────────────────────────────────── Cache ──
+
+    def _recorded_signals(self) -> List[str]:
+        # What a worker would record for a sample, a hit has to hold all of it
+        if self.store is not None:
+            return _unique(self.store.signals + list(self.metrics.signals))
+        if len(self.metrics):
+            return _unique(self.metrics.signals)
+        if self.outputs is not None:
+            return list(self.outputs)
+        return parse_fmu(self.fmu_path).catalog.names_of("output")
+
+    def _lookup(self, index: int, signals: Sequence[str]) -> Optional[np.ndarray]:
+        if self.cache is None:
+            return None
+        key = self.cache.key(self.design.start_values(index))
+        return self.cache.get(key, signals)
+
+    def _from_cache(
+        self, index: int, trajectory: np.ndarray, timing: SampleTiming
+    ) -> SampleResult:
+        result = SampleResult(index)
+
+        if self.early_stop and len(self.metrics):
+            # Cached runs are complete, cut them where a rerun would have stopped
+            cut = first_violation(self.metrics, trajectory)
+            if cut is not None:
+                trajectory = trajectory[: cut + 1]
+                result.status = "infeasible"
+                result.cut_time = float(trajectory["time"][-1])
+
+        if len(self.metrics):
+            # Same arithmetic as the online accumulators, so hits match reruns
+            with timing.phase("metrics"):
+                data = {s: trajectory[s][None] for s in set(self.metrics.signals)}
+                values = evaluate(self.metrics, trajectory["time"], data)
+                result.metrics = values[0].tolist()
+
+        if self.store is not None:
+            if self.store.signals:
+                with timing.phase("write"):
+                    self.store.write(index, trajectory)
+        elif not len(self.metrics):
+            result.trajectory = np.array(trajectory)  # out of the memory map
+
+        return result
+
+
+def _unique(names: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(names))
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.model_cache import cache_dir
+from app.schemas.fmu import FmuInput
+
+META_FILE = "meta.json"
+CSV_SUFFIXES = {".csv", ".txt", ".tsv"}
+# Rows parsed per block when a CSV is converted, bounds the conversion's memory
+CSV_BLOCK_ROWS = 1 << 16
+
+# Bump when the converted layout changes, old conversions are then redone
+SIGNALS_VERSION = 1
+
+# Structured dtype of an input in the table handed to fmpy, by variable type
+INPUT_DTYPES = {
+    "Real": np.float64,
+    "Integer": np.int32,
+    "Enumeration": np.int32,
+    "Boolean": np.bool_,
+}
+
+
+class Recording:
+    """A recorded time series, every column a read-only memory-mapped array.
+
+    Binary recordings are structured .npy arrays and are mapped as they are.
+    CSV files are converted once into one .npy file per column under the
+    cache directory, later opens map the converted columns without parsing.
+    The time column is the one named "time", or the first one.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._columns: Dict[str, np.ndarray] = {}
+
+        if self.path.suffix.lower() in CSV_SUFFIXES:
+            root = _converted(self.path)
+            meta = json.loads((root / META_FILE).read_text())
+            n = meta["n_rows"]
+            for name, file in meta["files"].items():
+                self._columns[name] = np.load(root / file, mmap_mode="r")[:n]
+        else:
+            data = np.load(self.path, mmap_mode="r")
+            if data.dtype.names is None or data.ndim != 1:
+                raise ValueError(f"{self.path.name} is not a structured 1-D array")
+            # Field views of the mapped file, nothing is read yet
+            for name in data.dtype.names:
+                self._columns[name] = data[name]
+
+        names = list(self._columns)
+        if not names:
+            raise ValueError(f"{self.path.name} has no columns")
+        self.time_name = "time" if "time" in self._columns else names[0]
+        self.time = self._columns[self.time_name]
+        self.names: List[str] = [n for n in names if n != self.time_name]
+
+        if len(self.time) > 1 and np.any(np.diff(self.time) < 0):
+            raise ValueError(f"Time in {self.path.name} is not increasing")
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.names
+
+    def column(self, name: str) -> np.ndarray:
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise ValueError(f"{self.path.name} has no column '{name}'") from None
+
+    def resample(
+        self, name: str, grid: np.ndarray, discrete: bool = False
+    ) -> np.ndarray:
+        """The column at the grid times, the first and last values are held.
+
+        Continuous signals are interpolated linearly, discrete ones keep the
+        last recorded value. Either way a single vectorized pass over the
+        mapped column, which np.interp reads in place when it is contiguous.
+        """
+        t, y = self.time, self.column(name)
+        if len(t) == 0:
+            raise ValueError(f"{self.path.name} has no rows")
+        if discrete:
+            i = np.searchsorted(t, grid, side="right") - 1
+            return y[np.clip(i, 0, len(t) - 1)]
+        return np.interp(grid, t, y)
+
+
+@dataclass(frozen=True)
+class InputSignals:
+    """All study inputs resampled onto the simulation grid.
+
+    A single structured .npy file in the format simulate_fmu expects as
+    input, named after the digest of its content. Workers map it read-only,
+    so every process shares the same pages instead of holding its own copy.
+    """
+
+    path: Path
+    digest: str
+
+    @classmethod
+    def resample(
+        cls, inputs: Iterable[FmuInput], grid: np.ndarray, root: Optional[Path] = None
+    ) -> InputSignals:
+        inputs = list(inputs)
+        recordings: Dict[str, Recording] = {}
+
+        dtype = [("time", np.float64)]
+        for var in inputs:
+            if var.source is None:
+                raise ValueError(f"Input '{var.name}' has no recording assigned")
+            if var.type not in INPUT_DTYPES:
+                raise ValueError(f"Input '{var.name}' has unsupported type {var.type}")
+            dtype.append((var.name, INPUT_DTYPES[var.type]))
+
+        table = np.empty(len(grid), dtype=dtype)
+        table["time"] = grid
+        for var in inputs:
+            assert var.source is not None
+            recording = recordings.get(var.source)
+            if recording is None:
+                recording = recordings[var.source] = Recording(Path(var.source))
+            table[var.name] = recording.resample(
+                var.column or var.name, grid, discrete=var.type != "Real"
+            )
+
+        return cls.from_table(table, root)
+
+    @classmethod
+    def from_table(cls, table: np.ndarray, root: Optional[Path] = None) -> InputSignals:
+        """Signals already on the grid, e.g. received from another host."""
+        h = hashlib.sha256(str(table.dtype).encode())
+        h.update(table.tobytes())
+        digest = h.hexdigest()
+        root = Path(root) if root is not None else cache_dir() / "inputs"
+        path = root / f"{digest}.npy"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, table)
+            os.replace(tmp, path)
+
+        return cls(path, digest)
+
+    def load(self) -> np.ndarray:
+        return np.load(self.path, mmap_mode="r")
+
+
+# ──────────────────────────────────────────────────────────── CSV convert ──
+
+
+def _converted(path: Path) -> Path:
+    # Path, size and mtime identify an unchanged file without reading it
+    st = path.stat()
+    raw = f"{SIGNALS_VERSION}|{path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+    root = cache_dir() / "signals" / hashlib.sha256(raw.encode()).hexdigest()
+    if not (root / META_FILE).exists():
+        _convert_csv(path, root)
+    return root
+
+
+def _convert_csv(path: Path, root: Path) -> None:
+    with path.open("rb") as f:
+        n_lines = sum(b.count(b"\n") for b in iter(lambda: f.read(1 << 24), b""))
+
+    # Converted next to its final place and renamed, readers never see a partial one
+    root.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=root.parent, suffix=".tmp"))
+    try:
+        with path.open(encoding="utf-8-sig", newline="") as f:
+            header = f.readline().strip()
+            delimiter = next((d for d in ",;\t" if d in header), None)
+            names = [n.strip().strip('"') for n in header.split(delimiter)]
+            files = {name: f"column_{k:05d}.npy" for k, name in enumerate(names)}
+            n = _write_columns(f, path, delimiter, tmp, list(files.values()), n_lines)
+
+        meta = {"source": str(path), "n_rows": n, "files": files}
+        (tmp / META_FILE).write_text(json.dumps(meta, indent=2))
+
+        try:
+            os.replace(tmp, root)
+        except OSError:
+            if not (root / META_FILE).exists():
+                raise
+            # Converted concurrently by another process
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _write_columns(
+    f: IO[str],
+    path: Path,
+    delimiter: Optional[str],
+    tmp: Path,
+    files: List[str],
+    n_lines: int,
+) -> int:
+    """Parse the rows of f into one .npy file per column, returns the rows parsed.
+
+    The memmaps only live in here: Windows refuses to rename a directory
+    while a file in it is still mapped.
+    """
+    # Room for every line, the rows actually parsed are kept in the meta
+    columns = [
+        np.lib.format.open_memmap(
+            tmp / file, mode="w+", dtype=np.float64, shape=(n_lines + 1,)
+        )
+        for file in files
+    ]
+    n = 0
+    while True:
+        lines = list(itertools.islice(f, CSV_BLOCK_ROWS))
+        if not lines:
+            break
+        block = np.loadtxt(lines, delimiter=delimiter, ndmin=2)
+        if not len(block):
+            continue  # blank lines only
+        if block.shape[1] != len(files):
+            raise ValueError(
+                f"{path.name} has {block.shape[1]} values per row "
+                f"but {len(files)} column names"
+            )
+        for column, values in zip(columns, block.T):
+            column[n : n + len(block)] = values
+        n += len(block)
+
+    for column in columns:
+        column.flush()
+    return n
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.model_cache import cache_dir, fmu_digest
+from app.schemas.experiment import Experiment
+
+# Bump when the key or the entry layout changes, old entries then never match
+KEY_VERSION = 1
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+
+@dataclass(frozen=True)
+class SimulationCache:
+    """Content-addressed store of complete sample trajectories.
+
+    An entry is keyed by the FMU content, the start values of the sample, the
+    input signals and the experiment settings, so any study on the same model
+    can reuse it. Entries are the structured arrays returned by simulate_fmu,
+    saved as .npy. Reading an entry refreshes its mtime, prune() evicts the
+    least recently used ones once the cache outgrows max_bytes.
+    """
+
+    root: Path
+    fmu_digest: str
+    experiment: Experiment
+    inputs: str = ""  # digest of the input signals, empty without inputs
+    max_bytes: int = DEFAULT_MAX_BYTES
+
+    @classmethod
+    def for_study(
+        cls,
+        fmu_path: Path,
+        experiment: Experiment,
+        inputs: str = "",
+        root: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> SimulationCache:
+        return cls(
+            root=Path(root) if root is not None else cache_dir() / "results",
+            fmu_digest=fmu_digest(fmu_path),
+            experiment=experiment,
+            inputs=inputs,
+            max_bytes=max_bytes,
+        )
+
+    def key(self, start_values: Mapping[str, Any]) -> str:
+        ex = self.experiment
+        h = hashlib.sha256()
+        h.update(f"{KEY_VERSION}|{self.fmu_digest}|{self.inputs}|".encode())
+        h.update(
+            "|".join(
+                _canonical(v)
+                for v in (ex.start_time, ex.stop_time, ex.output_interval, ex.tolerance)
+            ).encode()
+        )
+        for name in sorted(start_values):
+            h.update(f"|{name}={_canonical(start_values[name])}".encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.npy"
+
+    def get(self, key: str, signals: Sequence[str]) -> Optional[np.ndarray]:
+        """The cached trajectory if it holds all signals, None on a miss."""
+        path = self._path(key)
+        try:
+            trajectory = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        names = trajectory.dtype.names or ()
+        if "time" not in names or not set(signals) <= set(names):
+            return None
+
+        try:
+            os.utime(path)  # recently used
+        except OSError:
+            pass
+        return trajectory
+
+    def put(self, key: str, trajectory: np.ndarray) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, trajectory)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # A full disk only costs the speedup
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.root.glob("*/*.npy"))
+
+    def prune(self) -> int:
+        """Evict least recently used entries down to max_bytes, return how many."""
+        entries = []
+        for path in self.root.glob("*/*.npy"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        return evicted
+
+
+def _canonical(value: Any) -> str:
+    # Exact and type-tagged: 1, 1.0 and True are different start values
+    if isinstance(value, bool):
+        return f"b:{value}"
+    if isinstance(value, (float, np.floating)):
+        return f"f:{float(value).hex()}"
+    if isinstance(value, (int, np.integer)):
+        return f"i:{int(value)}"
+    if value is None:
+        return "n:"
+    return f"s:{value}"
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from app.study.doe import Design, ParameterRange
+from app.study.results import ResultStore
+
+# Kernel methods cost O(n³) to fit, beyond this a random subset is used
+MAX_TRAINING = 1500
+# Candidate points scored per proposal round
+N_CANDIDATES = 4096
+
+
+@dataclass
+class Samples:
+    """Completed samples a surrogate is fitted on, one row per sample."""
+
+    names: Tuple[str, ...]  # parameters, the columns of x
+    metrics: Tuple[str, ...]  # the columns of y
+    x: np.ndarray
+    y: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @classmethod
+    def empty(cls, names: Sequence[str], metrics: Sequence[str]) -> Samples:
+        return cls(
+            tuple(names),
+            tuple(metrics),
+            np.empty((0, len(names))),
+            np.empty((0, len(metrics))),
+        )
+
+    @classmethod
+    def from_store(cls, design: Design, store: ResultStore) -> Samples:
+        # Samples stopped early have metrics of a partial run, only "ok" counts
+        indices = store.completed()
+        return cls(
+            tuple(design.names),
+            tuple(store.metrics),
+            design.points(indices),
+            np.array(store.metric_values[indices], dtype=np.float64),
+        )
+
+    def matches(self, other: Samples) -> bool:
+        return self.names == other.names and self.metrics == other.metrics
+
+    def add(self, x: np.ndarray, y: np.ndarray) -> Samples:
+        return Samples(
+            self.names,
+            self.metrics,
+            np.concatenate([self.x, np.atleast_2d(x)]),
+            np.concatenate([self.y, np.atleast_2d(y)]),
+        )
+
+
+class Surrogate(ABC):
+    """Regression of all metric values on the varied parameters.
+
+    Parameters are scaled onto the unit cube of their ranges and metrics are
+    standardized, so one model handles quantities of any magnitude.
+    predict() returns the mean and the standard deviation of the prediction.
+    r2 is the leave-one-out coefficient of determination per metric, computed
+    in closed form, 1 for a perfect fit.
+    """
+
+    kind = ""
+    min_samples = 2
+
+    def __init__(self, ranges: Sequence[ParameterRange]):
+        self.ranges = list(ranges)
+        self.lower = np.array([r.lower for r in ranges], dtype=np.float64)
+        width = np.array([r.upper - r.lower for r in ranges], dtype=np.float64)
+        self.width = np.where(width > 0, width, 1.0)
+        self.n_samples = 0
+        self.r2 = np.empty(0)
+
+    @property
+    def n_dims(self) -> int:
+        return len(self.ranges)
+
+    def fit(self, x: np.ndarray, y: np.ndarray, seed: int = 0) -> Surrogate:
+        x = np.asarray(x, dtype=np.float64).reshape(-1, self.n_dims)
+        y = np.asarray(y, dtype=np.float64).reshape(len(x), -1)
+        keep = np.isfinite(x).all(axis=1) & np.isfinite(y).all(axis=1)
+        x, y = x[keep], y[keep]
+        if len(x) < self.min_samples:
+            raise ValueError(
+                f"A {self.kind} surrogate needs at least {self.min_samples} "
+                f"completed samples, got {len(x)}"
+            )
+
+        self.y_mean = y.mean(axis=0)
+        y_std = y.std(axis=0)
+        self.y_std = np.where(y_std > 0, y_std, 1.0)
+        self.n_samples = len(x)
+
+        z = (y - self.y_mean) / self.y_std
+        loo = self._fit(self.scale(x), z, np.random.default_rng(seed))
+        # Spread of a standardized column is 1 by construction
+        self.r2 = 1.0 - np.mean(loo**2, axis=0)
+        return self
+
+    def predict(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        x = np.asarray(x, dtype=np.float64).reshape(-1, self.n_dims)
+        mean, std = self._predict(self.scale(x))
+        return mean * self.y_std + self.y_mean, std * self.y_std
+
+    def scale(self, x: np.ndarray) -> np.ndarray:
+        return (x - self.lower) / self.width
+
+    def unscale(self, u: np.ndarray) -> np.ndarray:
+        return self.lower + u * self.width
+
+    @abstractmethod
+    def _fit(
+        self, u: np.ndarray, z: np.ndarray, rng: np.random.Generator
+    ) -> np.ndarray:
+        """Fit standardized z on unit-cube u, return leave-one-out residuals."""
+
+    @abstractmethod
+    def _predict(self, u: np.ndarray) -> Tuple[np.ndarray, np.ndarray]: ...
+
+
+class PolynomialSurrogate(Surrogate):
+    """Least-squares polynomial, quadratic once there are enough samples."""
+
+    kind = "Polynomial"
+
+    def __init__(self, ranges: Sequence[ParameterRange], degree: int = 2):
+        super().__init__(ranges)
+        self.max_degree = degree
+
+    def _features(self, u: np.ndarray) -> np.ndarray:
+        c = 2.0 * u - 1.0  # centred, better conditioned
+        cols = [np.ones(len(u))]
+        if self.degree >= 1:
+            cols += [c[:, i] for i in range(self.n_dims)]
+        if self.degree >= 2:
+            d = self.n_dims
+            cols += [c[:, i] * c[:, j] for i in range(d) for j in range(i, d)]
+        return np.stack(cols, axis=1)
+
+    def _fit(self, u, z, rng):
+        d, n = self.n_dims, len(u)
+        # Highest degree the samples determine, with some left for the residual
+        self.degree = 0
+        for degree, terms in ((1, 1 + d), (2, 1 + d + d * (d + 1) // 2)):
+            if degree <= self.max_degree and n > terms:
+                self.degree = degree
+
+        f = self._features(u)
+        gram = f.T @ f
+        gram += 1e-10 * np.trace(gram) / len(gram) * np.eye(len(gram))
+        self._gram_inv = np.linalg.inv(gram)
+        self.coef = self._gram_inv @ f.T @ z
+
+        residual = z - f @ self.coef
+        hat = np.einsum("ij,jk,ik->i", f, self._gram_inv, f)
+        dof = max(n - f.shape[1], 1)
+        self.sigma = np.sqrt((residual**2).sum(axis=0) / dof)
+        return residual / np.maximum(1.0 - hat, 1e-12)[:, None]
+
+    def _predict(self, u):
+        f = self._features(u)
+        q = np.einsum("ij,jk,ik->i", f, self._gram_inv, f)
+        # What the polynomial cannot represent shows up as residual everywhere
+        return f @ self.coef, self.sigma[None, :] * np.sqrt(1.0 + q)[:, None]
+
+
+class RbfSurrogate(Surrogate):
+    """Cubic radial basis interpolant with a linear tail.
+
+    Passes through every sample. The uncertainty is the leave-one-out error,
+    zero at the samples and growing with the distance to the nearest one.
+    """
+
+    kind = "RBF"
+
+    @property
+    def min_samples(self) -> int:
+        return self.n_dims + 2
+
+    def _fit(self, u, z, rng):
+        u, z = _cap(u, z, rng)
+        n, d = len(u), self.n_dims
+        self.centers = u
+
+        tail = np.hstack([np.ones((n, 1)), u])
+        a = np.zeros((n + d + 1, n + d + 1))
+        a[:n, :n] = _distances(u, u) ** 3
+        a[:n, n:] = tail
+        a[n:, :n] = tail.T
+        a_inv = np.linalg.pinv(a)
+        self.coef = a_inv @ np.vstack([z, np.zeros((d + 1, z.shape[1]))])
+
+        # Rippa's formula: leave-one-out errors from a single factorization
+        loo = self.coef[:n] / np.diag(a_inv)[:n, None]
+        self.loo_rms = np.sqrt(np.mean(loo**2, axis=0))
+        nearest = _distances(u, u) + np.diag(np.full(n, np.inf))
+        self.spacing = float(np.median(nearest.min(axis=1)))
+        return loo
+
+    def _predict(self, u):
+        n = len(self.centers)
+        dist = _distances(u, self.centers)
+        tail = np.hstack([np.ones((len(u), 1)), u])
+        mean = dist**3 @ self.coef[:n] + tail @ self.coef[n:]
+        reach = np.clip(dist.min(axis=1) / max(self.spacing, 1e-12), 0.0, 1.0)
+        return mean, reach[:, None] * self.loo_rms[None, :]
+
+
+class GaussianProcessSurrogate(Surrogate):
+    """Gaussian process with a squared-exponential kernel.
+
+    The length scale and the noise are shared by all metrics and picked by
+    marginal likelihood on a grid, the signal variance per metric in closed
+    form. Slowest to fit, but with the most meaningful uncertainty.
+    """
+
+    kind = "Gaussian process"
+    min_samples = 3
+    length_scales = np.geomspace(0.05, 3.0, 16)
+    nuggets = (1e-8, 1e-5, 1e-3, 1e-2, 1e-1)
+
+    def _fit(self, u, z, rng):
+        u, z = _cap(u, z, rng)
+        n, m = len(u), z.shape[1]
+        sq = _distances(u, u) ** 2
+
+        best: Optional[Tuple[float, float, float]] = None
+        for ell in self.length_scales:
+            k = np.exp(-0.5 * sq / ell**2)
+            for nugget in self.nuggets:
+                try:
+                    chol = np.linalg.cholesky(k + nugget * np.eye(n))
+                except np.linalg.LinAlgError:
+                    continue
+                w = np.linalg.solve(chol, z)
+                amplitude = np.maximum((w**2).sum(axis=0) / n, 1e-300)
+                # Profile log likelihood, amplitudes at their optimum
+                log_det = 2.0 * np.log(np.diag(chol)).sum()
+                lml = -0.5 * (n * np.log(amplitude).sum() + m * log_det)
+                if best is None or lml > best[0]:
+                    best = (lml, ell, nugget)
+
+        if best is None:
+            raise ValueError("Could not fit a Gaussian process to these samples")
+        _, self.length_scale, self.nugget = best
+
+        k = np.exp(-0.5 * sq / self.length_scale**2) + self.nugget * np.eye(n)
+        self.centers = u
+        self.k_inv = np.linalg.inv(k)
+        self.alpha = self.k_inv @ z
+        self.amplitude = np.maximum((z * self.alpha).sum(axis=0) / n, 1e-300)
+        # Closed-form leave-one-out residuals
+        return self.alpha / np.diag(self.k_inv)[:, None]
+
+    def _predict(self, u):
+        k = np.exp(-0.5 * _distances(u, self.centers) ** 2 / self.length_scale**2)
+        mean = k @ self.alpha
+        explained = np.einsum("ij,jk,ik->i", k, self.k_inv, k)
+        var = np.clip(1.0 + self.nugget - explained, 0.0, None)
+        return mean, np.sqrt(var[:, None] * self.amplitude[None, :])
+
+
+SURROGATES: Dict[str, Type[Surrogate]] = {
+    cls.kind: cls
+    for cls in (PolynomialSurrogate, RbfSurrogate, GaussianProcessSurrogate)
+}
+
+
+def fit_surrogate(
+    kind: str, ranges: Sequence[ParameterRange], samples: Samples, seed: int = 0
+) -> Surrogate:
+    if kind not in SURROGATES:
+        raise ValueError(f"Unknown surrogate '{kind}'")
+    if [r.name for r in ranges] != list(samples.names):
+        raise ValueError("The samples are for other parameters")
+    return SURROGATES[kind](ranges).fit(samples.x, samples.y, seed=seed)
+
+
+# ──────────────────────────────────────────────────────── Adaptive sampling ──
+
+
+def propose(
+    model: Surrogate,
+    n: int,
+    lower: Sequence[Optional[float]] = (),
+    upper: Sequence[Optional[float]] = (),
+    n_candidates: int = N_CANDIDATES,
+    seed: int = 0,
+) -> np.ndarray:
+    """Where to simulate next: n points, (n, n_dims) parameter values.
+
+    Candidates are scored by the predicted uncertainty of each metric. When
+    metrics have bounds only those count, weighted by how close the
+    prediction is to a bound in standard deviations, so new samples go where
+    feasibility is still undecided. Points are picked greedily and each pick damps the
+    scores around it, which spreads a batch over the space.
+    """
+    rng = np.random.default_rng(seed)
+    u = rng.random((n_candidates, model.n_dims))
+    x = model.unscale(u)
+    mean, std = model.predict(x)
+
+    # Scores are compared in log space, confident predictions far from a
+    # bound would all underflow to zero otherwise
+    with np.errstate(divide="ignore"):
+        log_score = np.log(std / model.y_std)
+    bounded = []
+    for j in range(mean.shape[1]):
+        bounds = [b[j] for b in (lower, upper) if j < len(b) and b[j] is not None]
+        if bounds:
+            bounded.append(j)
+            margin = np.min([np.abs(mean[:, j] - b) for b in bounds], axis=0)
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                ratio = np.nan_to_num(margin / std[:, j], nan=0.0)
+                log_score[:, j] -= 0.5 * ratio**2
+    if bounded:
+        # With constraints, only where they are decided matters
+        log_score = log_score[:, bounded]
+    score = log_score.max(axis=1) if log_score.shape[1] else np.zeros(len(u))
+
+    # Damping radius: the spacing of the samples once these are added
+    radius = 0.5 * (model.n_samples + n) ** (-1.0 / max(model.n_dims, 1))
+    picked: List[int] = []
+    for _ in range(min(n, len(u))):
+        i = int(np.argmax(score))
+        picked.append(i)
+        d2 = ((u - u[i]) ** 2).sum(axis=1)
+        with np.errstate(divide="ignore"):
+            score = score + np.log1p(-np.exp(-0.5 * d2 / radius**2))
+        score[i] = -np.inf
+    return x[picked]
+
+
+def feasibility(
+    mean: np.ndarray,
+    std: np.ndarray,
+    lower: Optional[float],
+    upper: Optional[float],
+) -> np.ndarray:
+    """Probability that a metric is within its bounds, from a prediction."""
+    mean, std = np.asarray(mean, dtype=np.float64), np.asarray(std, dtype=np.float64)
+    p = np.ones_like(mean)
+    if lower is not None:
+        p -= _norm_cdf(lower, mean, std)
+    if upper is not None:
+        p -= 1.0 - _norm_cdf(upper, mean, std)
+    return np.clip(p, 0.0, 1.0)
+
+
+# ──────────────────────────────────────────────────────────────── Helpers ──
+
+
+def _cap(
+    u: np.ndarray, z: np.ndarray, rng: np.random.Generator
+) -> Tuple[np.ndarray, np.ndarray]:
+    if len(u) <= MAX_TRAINING:
+        return u, z
+    keep = np.sort(rng.choice(len(u), MAX_TRAINING, replace=False))
+    return u[keep], z[keep]
+
+
+def _distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    d2 = (a**2).sum(axis=1)[:, None] + (b**2).sum(axis=1)[None, :] - 2.0 * a @ b.T
+    return np.sqrt(np.clip(d2, 0.0, None))
+
+
+def _norm_cdf(x: float, mean: np.ndarray, std: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (x - mean) / (std * math.sqrt(2.0))
+    # A certain prediction is a step function of the bound
+    t = np.where(std > 0, t, np.where(x >= mean, np.inf, -np.inf))
+    erf = np.vectorize(math.erf, otypes=[np.float64])
+    return 0.5 * (1.0 + erf(t))
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+# Phases of a sample, in the order they happen. recover replaces reset when
+# that failed and the worker needed a new instance
+PHASES = (
+    "instantiate",
+    "recover",
+    "reset",
+    "setup",
+    "simulate",
+    "metrics",
+    "write",
+    "cache",
+)
+
+# Per-sample records kept for the trace, the most recent ones win
+MAX_TRACE_SAMPLES = 100_000
+# Finished samples the throughput is averaged over
+RATE_WINDOW = 64
+
+
+@dataclass
+class SampleTiming:
+    """Where the time of one sample went.
+
+    Times are time.perf_counter() seconds, a system-wide clock on the
+    supported platforms, so timings of different worker processes line up.
+    setup covers applying the start values and initializing the FMU, up to
+    the first step, simulate the step loop without the metric updates in it.
+    """
+
+    worker: int  # process id, the main process for cache hits
+    start: float
+    end: float = 0.0
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def begin(cls) -> SampleTiming:
+        return cls(os.getpid(), time.perf_counter())
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t)
+
+    def add(self, name: str, seconds: float) -> None:
+        if seconds > 0:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def finish(self) -> SampleTiming:
+        self.end = time.perf_counter()
+        return self
+
+    @property
+    def duration(self) -> float:
+        # Instantiation happens before the sample starts
+        return self.end - self.start + self.phases.get("instantiate", 0.0)
+
+
+class RunTelemetry:
+    """Timings of one study run: throughput, ETA, worker utilization.
+
+    Fed from the thread that runs the study. rate(), eta() and utilization()
+    only read counters, they are safe to poll from the GUI thread.
+    """
+
+    def __init__(self, total: Optional[int], n_workers: int):
+        self.total = total
+        self.n_workers = n_workers
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.done = 0
+        self.counts: Dict[str, int] = {}
+        self.phase_totals: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.busy: Dict[int, float] = {}
+        self.samples: Deque[Tuple[int, str, SampleTiming]] = deque(
+            maxlen=MAX_TRACE_SAMPLES
+        )
+        self._slowest: List[Tuple[float, int]] = []
+        self._recent: Deque[float] = deque(maxlen=RATE_WINDOW)
+
+    def record(self, index: int, status: str, timing: Optional[SampleTiming]) -> None:
+        self.counts[status] = self.counts.get(status, 0) + 1
+        if status == "cancelled":
+            return
+        self.done += 1
+        self._recent.append(time.perf_counter())
+        if timing is None:
+            return
+
+        self.samples.append((index, status, timing))
+        for name, seconds in timing.phases.items():
+            self.phase_totals[name] = self.phase_totals.get(name, 0.0) + seconds
+        self.busy[timing.worker] = self.busy.get(timing.worker, 0.0) + timing.duration
+
+        entry = (timing.duration, index)
+        if len(self._slowest) < 10:
+            heapq.heappush(self._slowest, entry)
+        else:
+            heapq.heappushpop(self._slowest, entry)
+
+    def close(self) -> None:
+        self.finished = time.perf_counter()
+
+    # ───────────────────────────────────────────────────────────── Metrics ──
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def rate(self) -> float:
+        """Samples per second over the most recent samples."""
+        recent = self._recent
+        n = len(recent)
+        if n == 0:
+            return 0.0
+        if n < RATE_WINDOW:
+            # Startup included until the window is full
+            span, count = recent[-1] - self.started, n
+        else:
+            span, count = recent[-1] - recent[0], n - 1
+        return count / span if span > 0 else 0.0
+
+    def eta(self) -> Optional[float]:
+        """Seconds until all samples are done, None while unknown."""
+        rate = self.rate()
+        if self.total is None or rate <= 0:
+            return None
+        return max(self.total - self.done, 0) / rate
+
+    def utilization(self) -> float:
+        """Share of the workers' time spent on samples."""
+        capacity = self.elapsed * self.n_workers
+        return min(sum(self.busy.values()) / capacity, 1.0) if capacity > 0 else 0.0
+
+    def slowest(self) -> List[Tuple[int, float]]:
+        return [(i, seconds) for seconds, i in sorted(self._slowest, reverse=True)]
+
+    # ───────────────────────────────────────────────────────────── Reports ──
+
+    def summary(self) -> Dict[str, Any]:
+        durations = sorted(t.duration for _, _, t in self.samples)
+        return {
+            "samples": self.done,
+            "total": self.total,
+            "counts": self.counts,
+            "workers": self.n_workers,
+            "elapsed_s": self.elapsed,
+            "samples_per_s": self.done / self.elapsed if self.elapsed > 0 else 0.0,
+            "utilization": self.utilization(),
+            "phase_totals_s": self.phase_totals,
+            "sample_s": {
+                "mean": sum(durations) / len(durations) if durations else None,
+                "median": durations[len(durations) // 2] if durations else None,
+                "p95": durations[int(len(durations) * 0.95)] if durations else None,
+                "max": durations[-1] if durations else None,
+            },
+            "slowest": [{"index": i, "seconds": s} for i, s in self.slowest()],
+            "worker_busy_s": {str(pid): s for pid, s in self.busy.items()},
+        }
+
+    def report(self) -> str:
+        s = self.summary()
+        busy = sum(self.phase_totals.values())
+        lines = [
+            f"{s['samples']} samples in {s['elapsed_s']:.1f} s, "
+            f"{s['samples_per_s']:.2f} samples/s on {self.n_workers} workers, "
+            f"{100 * s['utilization']:.0f}% busy"
+        ]
+        if busy > 0:
+            lines.append(
+                "Time per phase: "
+                + ", ".join(
+                    f"{name} {100 * seconds / busy:.0f}%"
+                    for name, seconds in self.phase_totals.items()
+                    if seconds > 0
+                )
+            )
+        if self._slowest:
+            lines.append(
+                "Slowest samples: "
+                + ", ".join(f"#{i} {sec:.3f} s" for i, sec in self.slowest()[:5])
+            )
+        return "\n".join(lines)
+
+    def save(self, path: Path) -> None:
+        """Summary plus every recorded sample as JSON."""
+        data = self.summary()
+        data["sample_timings"] = [
+            {"index": index, "status": status, **asdict(t)}
+            for index, status, t in self.samples
+        ]
+        Path(path).write_text(json.dumps(data, indent=1))
+
+    def save_trace(self, path: Path) -> None:
+        """Chrome trace (chrome://tracing, Perfetto), one track per worker."""
+        events: List[Dict[str, Any]] = []
+        for pid in sorted(self.busy):
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "tid": pid,
+                    "args": {"name": f"worker {pid}"},
+                }
+            )
+
+        def us(t: float) -> float:
+            return (t - self.started) * 1e6
+
+        for index, status, t in self.samples:
+            args = {"index": index, "status": status}
+            tid = t.worker
+            instantiate = t.phases.get("instantiate", 0.0)
+            if instantiate:
+                start = us(t.start - instantiate)
+                events.append(_slice("instantiate", start, instantiate, tid, args))
+            duration = t.end - t.start
+            events.append(_slice(f"sample {index}", us(t.start), duration, tid, args))
+            # Phases nested in order, where they started exactly is not recorded
+            offset = t.start
+            for name in PHASES[1:]:
+                seconds = t.phases.get(name, 0.0)
+                if seconds:
+                    events.append(_slice(name, us(offset), seconds, tid, args))
+                    offset += seconds
+
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        Path(path).write_text(json.dumps(trace))
+
+
+def _slice(
+    name: str, ts: float, seconds: float, tid: int, args: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "ph": "X",
+        "pid": 1,
+        "tid": tid,
+        "ts": ts,
+        "dur": seconds * 1e6,
+        "args": args,
+    }
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "–"
+    seconds = int(round(seconds))
+    h, rest = divmod(seconds, 3600)
+    m, s = divmod(rest, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from app.schemas.experiment import Experiment
+from app.study.applicator import settable_in_step_mode
+from app.study.doe import Design
+
+if TYPE_CHECKING:
+    from fmpy.model_description import ModelDescription
+
+
+@dataclass
+class Snapshot:
+    """FMU state at time, after the prefix all samples of a study share."""
+
+    time: float
+    state: bytes  # serialized FMU state
+    trajectory: np.ndarray  # points recorded before time
+
+
+def snap_to_grid(experiment: Experiment, t0: float) -> float:
+    """Nearest output point, so prefix and samples share the result grid."""
+    steps = round((t0 - experiment.start_time) / experiment.output_interval)
+    return experiment.start_time + steps * experiment.output_interval
+
+
+def unsupported(
+    model_description: ModelDescription,
+    design: Design,
+    experiment: Experiment,
+    t0: float,
+) -> Optional[str]:
+    """Why the samples of design cannot start from a snapshot at t0.
+
+    None when they can: the FMU is co-simulation, saves and serializes its
+    state, and every varied variable can still be set once the simulation
+    runs. Samples only differ from t0 on, before that all of them run with
+    the fixed values.
+    """
+    cs = model_description.coSimulation
+    if cs is None:
+        return "the FMU has no co-simulation interface"
+    if model_description.fmiVersion == "1.0":
+        return "FMI 1.0 FMUs cannot save their state"
+    if not (cs.canGetAndSetFMUstate and cs.canSerializeFMUstate):
+        return "the FMU cannot save and serialize its state"
+    if not experiment.start_time < t0 < experiment.stop_time:
+        return f"t0 = {t0:g} is not inside the experiment"
+
+    variables = {v.name: v for v in model_description.modelVariables}
+    fixed = [
+        name
+        for name in design.names
+        if name not in variables
+        or variables[name].dimensions
+        or not settable_in_step_mode(variables[name])
+    ]
+    if fixed:
+        return "only inputs and tunable parameters can vary, not " + ", ".join(fixed)
+    return None
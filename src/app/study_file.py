@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import tomlkit
+
+from app.model_cache import ParsedFmu
+from app.schemas.experiment import Experiment
+from app.schemas.fmu import FmuInput, FmuParameter
+from app.schemas.metrics_spec import MetricSpec
+from app.state import AppState
+from app.study.results import ResultStore
+
+STUDY_FORMAT = 1
+
+
+def results_dir(path: Path) -> Path:
+    """Default results sidecar of a study file."""
+    return Path(path).with_suffix(".results")
+
+
+def save_study(state: AppState, path: Path) -> None:
+    """Write the study definition as a TOML manifest.
+
+    Results live next to it in a binary sidecar directory, see ResultStore.
+    Results of a run made before the study was saved are copied there, later
+    runs of the study write and resume in place.
+    """
+    if state.fmu_path is None:
+        raise ValueError("Load an FMU first")
+    path = Path(path)
+    results = results_dir(path)
+
+    doc = tomlkit.document()
+    doc.add("format", STUDY_FORMAT)
+
+    fmu = tomlkit.table()
+    fmu.add("path", _relative(Path(state.fmu_path), path.parent))
+    doc.add("fmu", fmu)
+
+    ex = state.experiment
+    experiment = tomlkit.table()
+    experiment.add("start_time", ex.start_time)
+    experiment.add("stop_time", ex.stop_time)
+    experiment.add("output_interval", ex.output_interval)
+    if ex.tolerance is not None:
+        experiment.add("tolerance", ex.tolerance)
+    doc.add("experiment", experiment)
+
+    doc.add("doe", _table(state.doe_settings))
+
+    parameters = tomlkit.aot()
+    for p in state.parameters.values():
+        parameters.append(
+            _table(
+                {
+                    "name": p.name,
+                    "value": p.value,
+                    "lower": p.lower,
+                    "upper": p.upper,
+                    "distribution": p.distribution,
+                }
+            )
+        )
+    doc.add("parameters", parameters)
+
+    inputs = tomlkit.aot()
+    for i in state.inputs.values():
+        source = _relative(Path(i.source), path.parent) if i.source else None
+        inputs.append(_table({"name": i.name, "source": source, "column": i.column}))
+    doc.add("inputs", inputs)
+
+    metrics = tomlkit.aot()
+    for m in state.metrics:
+        metrics.append(
+            _table(
+                {
+                    "signal": m.signal.name,
+                    "statistic": m.statistic,
+                    "lower": m.lower,
+                    "upper": m.upper,
+                    "objective": m.objective,
+                }
+            )
+        )
+    doc.add("metrics", metrics)
+
+    sidecar = tomlkit.table()
+    sidecar.add("path", _relative(results, path.parent))
+    doc.add("results", sidecar)
+
+    store = state.results
+    if store is not None and store.root.resolve() != results.resolve():
+        store.flush()
+        shutil.copytree(store.root, results, dirs_exist_ok=True)
+        state.results = ResultStore(results, mode=store.mode)
+
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(tomlkit.dumps(doc), encoding="utf-8")
+    os.replace(tmp, path)
+
+    state.study_path = path
+    state.results_root = results
+
+
+def study_fmu(path: Path) -> Path:
+    """The FMU a saved study was made for."""
+    path = Path(path)
+    return _fmu_path(path, _read(path))
+
+
+def load_study(path: Path, fmu: Optional[ParsedFmu] = None) -> AppState:
+    """Rebuild the AppState of a saved study and reopen its results.
+
+    The FMU comes from the model cache unless it was parsed already, e.g. on
+    a loader thread.
+    """
+    path = Path(path)
+    data = _read(path)
+    fmu_path = _fmu_path(path, data)
+
+    state = AppState()
+    if fmu is None:
+        state.load_fmu(fmu_path)
+    else:
+        state.set_fmu(fmu_path, fmu)
+    if "experiment" in data:
+        state.experiment = Experiment(**data["experiment"])
+    state.doe_settings.update(data.get("doe", {}))
+
+    for entry in data.get("parameters", []):
+        var = _variable(state, entry["name"], "parameter")
+        assert isinstance(var, FmuParameter)
+        var.value = entry.get("value")
+        var.lower = entry.get("lower")
+        var.upper = entry.get("upper")
+        var.distribution = entry.get("distribution", "Uniform")
+        state.parameters[var.name] = var
+
+    for entry in data.get("inputs", []):
+        var = _variable(state, entry["name"], "input")
+        assert isinstance(var, FmuInput)
+        if "source" in entry:
+            source = Path(entry["source"])
+            var.source = str((path.parent / source).resolve())
+        var.column = entry.get("column")
+        state.inputs[var.name] = var
+
+    for entry in data.get("metrics", []):
+        state.metrics.append(
+            MetricSpec(
+                signal=_variable(state, entry["signal"], "output"),
+                statistic=entry.get("statistic", "max"),
+                lower=entry.get("lower"),
+                upper=entry.get("upper"),
+                objective=entry.get("objective"),
+            )
+        )
+
+    state.study_path = path
+    results = data.get("results", {}).get("path")
+    state.results_root = path.parent / results if results else results_dir(path)
+    if state.results_root.is_dir():
+        # Shown again, the next run of the study resumes them
+        state.results = ResultStore(state.results_root)
+
+    return state
+
+
+def _read(path: Path) -> Dict[str, Any]:
+    data: Dict[str, Any] = tomlkit.parse(path.read_text(encoding="utf-8")).unwrap()
+    if data.get("format", 0) > STUDY_FORMAT:
+        raise ValueError(f"{path.name} was saved by a newer version")
+    return data
+
+
+def _fmu_path(path: Path, data: Dict[str, Any]) -> Path:
+    fmu_path = Path(data["fmu"]["path"])
+    if not fmu_path.is_absolute():
+        fmu_path = (path.parent / fmu_path).resolve()
+    return fmu_path
+
+
+def _variable(state: AppState, name: str, causality: str) -> Any:
+    var = state.fmu_variables.get(name)
+    if var is None or state.catalog.causality_of(var.row) != causality:
+        raise ValueError(f"The FMU has no {causality} named '{name}'")
+    return var
+
+
+def _table(values: Dict[str, Any]) -> tomlkit.items.Table:
+    # TOML has no null, unset values are left out
+    table = tomlkit.table()
+    for key, value in values.items():
+        if value is not None:
+            table.add(key, value)
+    return table
+
+
+def _relative(target: Path, start: Path) -> str:
+    # Relative when possible so a study folder can be moved as a whole
+    try:
+        return Path(os.path.relpath(target.resolve(), start.resolve())).as_posix()
+    except ValueError:
+        return str(target.resolve())  # different drive on Windows
@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence
+
+import numpy as np
+from PySide6 import QtCore
+
+from app.log_sink import get_logger
+from app.model_cache import format_info, parse_fmu
+from app.name_index import NameIndex
+from app.plot_lod import PlotView, render
+from app.schemas.catalog import VariableCatalog
+from app.study.analytics import quantile_bands, sensitivity
+from app.study.doe import Design, ParameterRange
+from app.study.results import ResultStore
+from app.study.runner import SampleResult, StudyRunner
+from app.study.surrogate import Samples, fit_surrogate
+
+
+class StudyWorker(QtCore.QObject):
+    """Drives a StudyRunner from a QThread and reports back through signals."""
+
+    sample_finished = QtCore.Signal(object)  # SampleResult
+    progress = QtCore.Signal(int, int)  # done, total
+    finished = QtCore.Signal(int)  # completed samples
+    failed = QtCore.Signal(str)
+
+    def __init__(
+        self,
+        runner: StudyRunner,
+        indices: Optional[Iterable[int]] = None,
+        total: Optional[int] = None,
+    ):
+        super().__init__()
+        self.runner = runner
+        self._indices = indices
+        self._total = len(runner.design) if total is None else total
+        self._done = 0
+
+    @QtCore.Slot()
+    def run(self) -> None:
+        try:
+            completed = self.runner.run(self._indices, on_result=self._on_result)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+
+        self.finished.emit(completed)
+
+    def _on_result(self, result: SampleResult) -> None:
+        self._done += 1
+        # Logged from this thread, the log view picks it up in batches
+        log = get_logger()
+        if result.status == "failed":
+            log.warning("Sample %d failed:\n%s", result.index, result.error)
+        elif log.isEnabledFor(logging.DEBUG):
+            seconds = result.timing.duration if result.timing is not None else 0.0
+            log.debug("Sample %d %s in %.3f s", result.index, result.status, seconds)
+        self.sample_finished.emit(result)
+        self.progress.emit(self._done, self._total)
+
+
+class _Superseded(Exception):
+    pass
+
+
+class FmuLoader(QtCore.QObject):
+    """Parses FMUs on a private thread, newest request wins.
+
+    The parsed FMU is reported as soon as its catalog is ready, the model
+    info text follows. A superseded or cancelled request stops at the start
+    of its next stage and reports nothing more.
+    """
+
+    progress = QtCore.Signal(int, str, int)  # request id, message, percent
+    catalog_ready = QtCore.Signal(int, object, object)  # request id, path, ParsedFmu
+    info_ready = QtCore.Signal(int, str)  # request id, model info
+    failed = QtCore.Signal(int, str)  # request id, error message
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._latest = 0
+
+    def load(self, fmu_path: Path) -> int:
+        self._latest += 1
+        request = self._latest
+        self._pool.start(lambda: self._run(request, Path(fmu_path)))
+        return request
+
+    def cancel(self) -> None:
+        self._latest += 1
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    def _run(self, request: int, fmu_path: Path) -> None:
+        def report(message: str, percent: int) -> None:
+            if request != self._latest:
+                raise _Superseded
+            self.progress.emit(request, message, percent)
+
+        try:
+            parsed = parse_fmu(fmu_path, progress=report)
+            report("Formatting the model info", 90)
+        except _Superseded:
+            return
+        except Exception as e:
+            self._emit(request, self.failed, f"{type(e).__name__}: {e}")
+            return
+
+        # The GUI fills its views from the catalog while the info is formatted
+        self._emit(request, self.catalog_ready, fmu_path, parsed)
+        info = format_info(parsed, ["input", "output", "parameter"])
+        self._emit(request, self.info_ready, info)
+
+    def _emit(self, request: int, signal, *args) -> None:
+        if request != self._latest:
+            return
+        try:
+            signal.emit(request, *args)
+        except RuntimeError:
+            pass  # the window was closed while loading
+
+
+class NameSearch(QtCore.QObject):
+    """Variable name queries on a private thread, newest query wins.
+
+    Only the given catalog rows are searchable. Their index is built in the
+    background as soon as they are set, queries that were superseded while
+    waiting are dropped without running.
+    """
+
+    finished = QtCore.Signal(int, object)  # query id, sorted catalog rows
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)  # also serializes building the index
+        self._rows: Optional[np.ndarray] = None
+        self._index: Optional[NameIndex] = None
+        self._indexed: Optional[np.ndarray] = None
+        self._latest = 0
+
+    def set_catalog(self, catalog: Optional[VariableCatalog], rows: np.ndarray) -> None:
+        self._catalog = catalog
+        self._rows = rows
+        self._latest += 1
+        if catalog is not None:
+            self._pool.start(lambda: self._index_for(catalog, rows))
+
+    def search(self, text: str) -> int:
+        self._latest += 1
+        query, catalog, rows = self._latest, self._catalog, self._rows
+        if catalog is not None and rows is not None:
+            self._pool.start(lambda: self._run(query, catalog, rows, text))
+        return query
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    def _run(
+        self, query: int, catalog: VariableCatalog, rows: np.ndarray, text: str
+    ) -> None:
+        if query != self._latest:
+            return
+        hits = rows[self._index_for(catalog, rows).search(text)]
+        if query == self._latest:
+            self.finished.emit(query, hits)
+
+    def _index_for(self, catalog: VariableCatalog, rows: np.ndarray) -> NameIndex:
+        if self._index is None or self._indexed is not rows:
+            names = catalog.names
+            self._index = NameIndex([names[row] for row in rows.tolist()])
+            self._indexed = rows
+        return self._index
+
+
+class PlotRenderer(QtCore.QObject):
+    """Renders decimated trajectory images on a private thread, newest request wins.
+
+    A request that was superseded is dropped before it starts, or between
+    two blocks of runs while it is rendering.
+    """
+
+    finished = QtCore.Signal(int, object)  # request id, PlotImage
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._latest = 0
+
+    def render(
+        self,
+        store: ResultStore,
+        signal: str,
+        view: PlotView,
+        size: QtCore.QSize,
+        autoscale: bool = False,
+    ) -> int:
+        self._latest += 1
+        request, size = self._latest, QtCore.QSize(size)
+        self._pool.start(
+            lambda: self._run(request, store, signal, view, size, autoscale)
+        )
+        return request
+
+    def cancel(self) -> None:
+        self._latest += 1
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    def _run(
+        self,
+        request: int,
+        store: ResultStore,
+        signal: str,
+        view: PlotView,
+        size: QtCore.QSize,
+        autoscale: bool,
+    ) -> None:
+        def superseded() -> bool:
+            return request != self._latest
+
+        if superseded():
+            return
+        image = render(store, signal, view, size, autoscale, cancelled=superseded)
+        if image is not None and not superseded():
+            try:
+                self.finished.emit(request, image)
+            except RuntimeError:
+                pass  # the plot was closed while rendering
+
+
+class Analytics(QtCore.QObject):
+    """Cross-run statistics of a result store on a private thread.
+
+    Bands and sensitivities are requested separately, for each kind the
+    newest request wins and superseded ones stop between two blocks.
+    """
+
+    bands_ready = QtCore.Signal(int, object)  # request id, Bands
+    sensitivity_ready = QtCore.Signal(int, object)  # request id, Sensitivity
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._latest = {"bands": 0, "sensitivity": 0}
+
+    def bands(self, store: ResultStore, signal: str) -> int:
+        request = self._next("bands")
+        self._pool.start(
+            lambda: self._run(
+                "bands",
+                request,
+                self.bands_ready,
+                lambda cancelled: quantile_bands(store, signal, cancelled=cancelled),
+            )
+        )
+        return request
+
+    def sensitivity(self, design: Design, store: ResultStore) -> int:
+        request = self._next("sensitivity")
+        self._pool.start(
+            lambda: self._run(
+                "sensitivity",
+                request,
+                self.sensitivity_ready,
+                lambda cancelled: sensitivity(design, store, cancelled=cancelled),
+            )
+        )
+        return request
+
+    def cancel(self) -> None:
+        for kind in self._latest:
+            self._next(kind)
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    def _next(self, kind: str) -> int:
+        self._latest[kind] += 1
+        return self._latest[kind]
+
+    def _run(self, kind: str, request: int, signal, compute) -> None:
+        def superseded() -> bool:
+            return request != self._latest[kind]
+
+        if superseded():
+            return
+        result = compute(superseded)
+        if result is not None and not superseded():
+            try:
+                signal.emit(request, result)
+            except RuntimeError:
+                pass  # the view was closed while computing
+
+
+class SurrogateFitter(QtCore.QObject):
+    """Training samples and surrogate fits on a private thread, newest request wins.
+
+    A fit cannot be interrupted, a superseded one still runs to the end but
+    reports nothing.
+    """
+
+    samples_ready = QtCore.Signal(int, object)  # request id, Samples
+    fitted = QtCore.Signal(int, object)  # request id, Surrogate
+    failed = QtCore.Signal(int, str)  # request id, error message
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._latest = 0
+
+    def samples(self, design: Design, store: ResultStore) -> int:
+        """Read the completed samples of store, design is the one they came from."""
+        return self._start(
+            self.samples_ready, lambda: Samples.from_store(design, store)
+        )
+
+    def fit(self, kind: str, ranges: Sequence[ParameterRange], samples: Samples) -> int:
+        return self._start(self.fitted, lambda: fit_surrogate(kind, ranges, samples))
+
+    def cancel(self) -> None:
+        self._latest += 1
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    def _start(self, signal, compute: Callable[[], object]) -> int:
+        self._latest += 1
+        request = self._latest
+        self._pool.start(lambda: self._run(request, signal, compute))
+        return request
+
+    def _run(self, request: int, signal, compute: Callable[[], object]) -> None:
+        if request != self._latest:
+            return
+        try:
+            result = compute()
+        except (ValueError, np.linalg.LinAlgError) as e:
+            signal, result = self.failed, str(e)
+        if request != self._latest:
+            return
+        try:
+            signal.emit(request, result)
+        except RuntimeError:
+            pass  # the view was closed while fitting
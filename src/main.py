@@ -1,11 +1,32 @@
+import multiprocessing
 import sys
+from pathlib import Path
 
-from PySide6 import QtWidgets
 
-from app.main_window import AppState, MainWindow
+def main() -> None:
+    # Study workers are spawned processes, required for the frozen executable
+    multiprocessing.freeze_support()
 
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    # Usage messages name the executable or script actually started
+    prog = f"{Path(sys.argv[0]).name} {command}"
+
+    if command == "batch":
+        # Headless run of a saved study, Qt is never imported
+        from app.cli import main as batch
+
+        sys.exit(batch(sys.argv[2:], prog=prog))
+
+    if command == "worker":
+        # Headless worker simulating samples for a batch run with --serve
+        from app.study.distributed import main as worker
+
+        sys.exit(worker(sys.argv[2:], prog=prog))
+
+    from PySide6 import QtWidgets
+
+    from app.main_window import AppState, MainWindow
 
-def main() -> None:
     app = QtWidgets.QApplication(sys.argv)
     app.setApplicationName("FMU Insight")
 
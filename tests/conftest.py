@@ -0,0 +1,59 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+RESOURCES = Path(__file__).parent.resolve() / "resources"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch) -> Path:
+    # Never read or write the user's model cache from tests
+    path = tmp_path / "cache"
+    monkeypatch.setenv("FMU_INSIGHT_CACHE", str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def simulation_fmu(tmp_path_factory) -> Path:
+    """BouncingBall.fmu with a binary for the current platform.
+
+    The bundled FMU only ships a win64 binary, elsewhere it is rebuilt from its
+    C sources in a temporary copy.
+    """
+    from fmpy import platform, supported_platforms
+    from fmpy.util import compile_platform_binary
+
+    src = RESOURCES / "BouncingBall.fmu"
+    if platform in supported_platforms(str(src)):
+        return src
+
+    dst = tmp_path_factory.mktemp("fmu") / src.name
+    shutil.copy(src, dst)
+    try:
+        compile_platform_binary(str(dst))
+    except Exception as e:
+        pytest.skip(f"Cannot build a {platform} binary for {src.name}: {e}")
+
+    return dst
+
+
+@pytest.fixture(scope="session")
+def state_fmu(tmp_path_factory) -> Path:
+    """Decay.fmu, a co-simulation FMU that can save and restore its state.
+
+    Built from the sources in resources/Decay for the current platform.
+    """
+    from fmpy import platform
+    from fmpy.util import compile_platform_binary
+
+    src = RESOURCES / "Decay"
+    dst = tmp_path_factory.mktemp("fmu") / "Decay.fmu"
+    shutil.make_archive(str(dst.with_suffix("")), "zip", src)
+    dst.with_suffix(".zip").rename(dst)
+    try:
+        compile_platform_binary(str(dst))
+    except Exception as e:
+        pytest.skip(f"Cannot build a {platform} binary for {dst.name}: {e}")
+
+    return dst
@@ -0,0 +1,250 @@
+/* x' = -k x + u, solved exactly over every communication step.
+ *
+ * A minimal co-simulation FMU whose state can be saved, restored and
+ * serialized, for the warm start tests. */
+
+#include <math.h>
+#include <stdlib.h>
+#include <string.h>
+
+#include "fmi2Functions.h"
+
+typedef struct {
+    fmi2Real time;
+    fmi2Real x;
+    fmi2Real k;
+    fmi2Real x0;
+    fmi2Real u;
+} State;
+
+typedef struct {
+    State s;
+} Model;
+
+static fmi2Real *variable(Model *m, fmi2ValueReference vr) {
+    switch (vr) {
+    case 0: return &m->s.x;
+    case 1: return &m->s.k;
+    case 2: return &m->s.x0;
+    case 3: return &m->s.u;
+    default: return NULL;
+    }
+}
+
+const char *fmi2GetTypesPlatform(void) { return fmi2TypesPlatform; }
+const char *fmi2GetVersion(void) { return fmi2Version; }
+
+fmi2Status fmi2SetDebugLogging(fmi2Component c, fmi2Boolean loggingOn,
+                               size_t nCategories,
+                               const fmi2String categories[]) {
+    return fmi2OK;
+}
+
+fmi2Component fmi2Instantiate(fmi2String instanceName, fmi2Type fmuType,
+                              fmi2String fmuGUID,
+                              fmi2String fmuResourceLocation,
+                              const fmi2CallbackFunctions *functions,
+                              fmi2Boolean visible, fmi2Boolean loggingOn) {
+    Model *m = calloc(1, sizeof(Model));
+    if (m == NULL || fmuType != fmi2CoSimulation) {
+        free(m);
+        return NULL;
+    }
+    m->s.k = 1.0;
+    m->s.x0 = 1.0;
+    m->s.x = 1.0;
+    return m;
+}
+
+void fmi2FreeInstance(fmi2Component c) { free(c); }
+
+fmi2Status fmi2SetupExperiment(fmi2Component c, fmi2Boolean toleranceDefined,
+                               fmi2Real tolerance, fmi2Real startTime,
+                               fmi2Boolean stopTimeDefined,
+                               fmi2Real stopTime) {
+    ((Model *)c)->s.time = startTime;
+    return fmi2OK;
+}
+
+fmi2Status fmi2EnterInitializationMode(fmi2Component c) { return fmi2OK; }
+
+fmi2Status fmi2ExitInitializationMode(fmi2Component c) {
+    Model *m = c;
+    m->s.x = m->s.x0;
+    return fmi2OK;
+}
+
+fmi2Status fmi2Terminate(fmi2Component c) { return fmi2OK; }
+
+fmi2Status fmi2Reset(fmi2Component c) {
+    Model *m = c;
+    memset(&m->s, 0, sizeof(State));
+    m->s.k = 1.0;
+    m->s.x0 = 1.0;
+    m->s.x = 1.0;
+    return fmi2OK;
+}
+
+fmi2Status fmi2GetReal(fmi2Component c, const fmi2ValueReference vr[],
+                       size_t nvr, fmi2Real value[]) {
+    for (size_t i = 0; i < nvr; i++) {
+        fmi2Real *v = variable(c, vr[i]);
+        if (v == NULL) return fmi2Error;
+        value[i] = *v;
+    }
+    return fmi2OK;
+}
+
+fmi2Status fmi2SetReal(fmi2Component c, const fmi2ValueReference vr[],
+                       size_t nvr, const fmi2Real value[]) {
+    for (size_t i = 0; i < nvr; i++) {
+        if (vr[i] == 0) return fmi2Error;
+        fmi2Real *v = variable(c, vr[i]);
+        if (v == NULL) return fmi2Error;
+        *v = value[i];
+    }
+    return fmi2OK;
+}
+
+fmi2Status fmi2GetInteger(fmi2Component c, const fmi2ValueReference vr[],
+                          size_t nvr, fmi2Integer value[]) {
+    return nvr ? fmi2Error : fmi2OK;
+}
+
+fmi2Status fmi2GetBoolean(fmi2Component c, const fmi2ValueReference vr[],
+                          size_t nvr, fmi2Boolean value[]) {
+    return nvr ? fmi2Error : fmi2OK;
+}
+
+fmi2Status fmi2GetString(fmi2Component c, const fmi2ValueReference vr[],
+                         size_t nvr, fmi2String value[]) {
+    return nvr ? fmi2Error : fmi2OK;
+}
+
+fmi2Status fmi2SetInteger(fmi2Component c, const fmi2ValueReference vr[],
+                          size_t nvr, const fmi2Integer value[]) {
+    return nvr ? fmi2Error : fmi2OK;
+}
+
+fmi2Status fmi2SetBoolean(fmi2Component c, const fmi2ValueReference vr[],
+                          size_t nvr, const fmi2Boolean value[]) {
+    return nvr ? fmi2Error : fmi2OK;
+}
+
+fmi2Status fmi2SetString(fmi2Component c, const fmi2ValueReference vr[],
+                         size_t nvr, const fmi2String value[]) {
+    return nvr ? fmi2Error : fmi2OK;
+}
+
+/* FMU state */
+
+fmi2Status fmi2GetFMUstate(fmi2Component c, fmi2FMUstate *FMUstate) {
+    State *s = *FMUstate ? *FMUstate : malloc(sizeof(State));
+    if (s == NULL) return fmi2Error;
+    *s = ((Model *)c)->s;
+    *FMUstate = s;
+    return fmi2OK;
+}
+
+fmi2Status fmi2SetFMUstate(fmi2Component c, fmi2FMUstate FMUstate) {
+    ((Model *)c)->s = *(State *)FMUstate;
+    return fmi2OK;
+}
+
+fmi2Status fmi2FreeFMUstate(fmi2Component c, fmi2FMUstate *FMUstate) {
+    free(*FMUstate);
+    *FMUstate = NULL;
+    return fmi2OK;
+}
+
+fmi2Status fmi2SerializedFMUstateSize(fmi2Component c, fmi2FMUstate FMUstate,
+                                      size_t *size) {
+    *size = sizeof(State);
+    return fmi2OK;
+}
+
+fmi2Status fmi2SerializeFMUstate(fmi2Component c, fmi2FMUstate FMUstate,
+                                 fmi2Byte serializedState[], size_t size) {
+    if (size != sizeof(State)) return fmi2Error;
+    memcpy(serializedState, FMUstate, size);
+    return fmi2OK;
+}
+
+fmi2Status fmi2DeSerializeFMUstate(fmi2Component c,
+                                   const fmi2Byte serializedState[],
+                                   size_t size, fmi2FMUstate *FMUstate) {
+    if (size != sizeof(State)) return fmi2Error;
+    State *s = malloc(sizeof(State));
+    if (s == NULL) return fmi2Error;
+    memcpy(s, serializedState, size);
+    *FMUstate = s;
+    return fmi2OK;
+}
+
+fmi2Status fmi2GetDirectionalDerivative(
+    fmi2Component c, const fmi2ValueReference vUnknown_ref[], size_t nUnknown,
+    const fmi2ValueReference vKnown_ref[], size_t nKnown,
+    const fmi2Real dvKnown[], fmi2Real dvUnknown[]) {
+    return fmi2Error;
+}
+
+/* Co-simulation */
+
+fmi2Status fmi2SetRealInputDerivatives(fmi2Component c,
+                                       const fmi2ValueReference vr[],
+                                       size_t nvr, const fmi2Integer order[],
+                                       const fmi2Real value[]) {
+    return fmi2Error;
+}
+
+fmi2Status fmi2GetRealOutputDerivatives(fmi2Component c,
+                                        const fmi2ValueReference vr[],
+                                        size_t nvr, const fmi2Integer order[],
+                                        fmi2Real value[]) {
+    return fmi2Error;
+}
+
+fmi2Status fmi2DoStep(fmi2Component c, fmi2Real currentCommunicationPoint,
+                      fmi2Real communicationStepSize,
+                      fmi2Boolean noSetFMUStatePriorToCurrentPoint) {
+    Model *m = c;
+    State *s = &m->s;
+    if (s->k > 0) {
+        fmi2Real steady = s->u / s->k;
+        s->x = steady + (s->x - steady) * exp(-s->k * communicationStepSize);
+    } else {
+        s->x += s->u * communicationStepSize;
+    }
+    s->time = currentCommunicationPoint + communicationStepSize;
+    return fmi2OK;
+}
+
+fmi2Status fmi2CancelStep(fmi2Component c) { return fmi2Error; }
+
+fmi2Status fmi2GetStatus(fmi2Component c, const fmi2StatusKind s,
+                         fmi2Status *value) {
+    return fmi2Discard;
+}
+
+fmi2Status fmi2GetRealStatus(fmi2Component c, const fmi2StatusKind s,
+                             fmi2Real *value) {
+    if (s != fmi2LastSuccessfulTime) return fmi2Discard;
+    *value = ((Model *)c)->s.time;
+    return fmi2OK;
+}
+
+fmi2Status fmi2GetIntegerStatus(fmi2Component c, const fmi2StatusKind s,
+                                fmi2Integer *value) {
+    return fmi2Discard;
+}
+
+fmi2Status fmi2GetBooleanStatus(fmi2Component c, const fmi2StatusKind s,
+                                fmi2Boolean *value) {
+    *value = fmi2False;
+    return fmi2OK;
+}
+
+fmi2Status fmi2GetStringStatus(fmi2Component c, const fmi2StatusKind s,
+                               fmi2String *value) {
+    return fmi2Discard;
+}
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from app.study import analytics
+from app.study.analytics import quantile_bands, sensitivity
+from app.study.doe import MonteCarloDesign, ParameterRange
+from app.study.results import ResultStore
+
+
+def _signal_store(tmp_path, n_samples=60, n_points=50):
+    rng = np.random.default_rng(1)
+    time = np.linspace(0.0, 1.0, n_points)
+    store = ResultStore.create(tmp_path / "store", ["x"], n_samples, time)
+    data = rng.normal(size=(n_samples, n_points)) + time
+    store.column("x")[:] = data
+    # Some runs cut short, some never finished
+    store.column("x")[3, 20:] = np.nan
+    store.column("x")[7, 35:] = np.nan
+    for k in range(n_samples):
+        store.set_status(k, "ok" if k % 5 else "failed")
+    store.flush()
+    expected = np.array(store.column("x")[store.completed()])
+    return store, expected
+
+
+def test_quantile_bands_match_numpy(tmp_path, monkeypatch):
+    store, expected = _signal_store(tmp_path)
+    # A few time points per tile and a few samples per block
+    monkeypatch.setattr(analytics, "BLOCK_VALUES", 150)
+
+    bands = quantile_bands(store, "x")
+    np.testing.assert_allclose(
+        bands.values, np.nanquantile(expected, analytics.QUANTILES, axis=0)
+    )
+    np.testing.assert_allclose(bands.mean, np.nanmean(expected, axis=0))
+    np.testing.assert_allclose(bands.std, np.nanstd(expected, axis=0))
+    assert bands.count[0] == len(expected) and bands.count[-1] == len(expected) - 2
+    np.testing.assert_allclose(bands.band(0.5), np.nanmedian(expected, axis=0))
+
+    part = quantile_bands(store, "x", (0.5,), window=slice(10, 30))
+    np.testing.assert_allclose(part.time, store.time[10:30])
+    np.testing.assert_allclose(part.values[0], bands.band(0.5)[10:30])
+
+    assert quantile_bands(store, "x", cancelled=lambda: True) is None
+
+
+def test_sensitivity_of_additive_model(tmp_path, monkeypatch):
+    # y = a + 2b on uniform inputs: S_a = 1/5, S_b = 4/5, c has no effect
+    ranges = [ParameterRange(name, 0.0, 1.0) for name in "abc"]
+    design = MonteCarloDesign(ranges, n_samples=4000, seed=3)
+    store = ResultStore.create(
+        tmp_path / "store", [], len(design), np.zeros(1), metrics=["y", "z"]
+    )
+    x = design.points()
+    store.metric_values[:, 0] = x[:, 0] + 2 * x[:, 1]
+    store.metric_values[:, 1] = -x[:, 2]
+    store.metric_values[10, 1] = np.nan
+    store.status[:] = 1
+    store.status[:100] = 0
+    monkeypatch.setattr(analytics, "BLOCK_VALUES", 5000)
+
+    result = sensitivity(design, store)
+    keep = np.isfinite(np.asarray(store.metric_values)).all(axis=1)
+    keep[:100] = False
+    assert result.n_samples == keep.sum()
+    reference = np.corrcoef(np.hstack([x, store.metric_values])[keep].T)
+    np.testing.assert_allclose(result.correlation, reference, atol=1e-10)
+    assert result.parameter_metric.shape == (3, 2)
+    assert result.parameter_metric[2, 1] == pytest.approx(-1.0)
+
+    s1 = result.first_order
+    assert s1[0, 0] == pytest.approx(0.2, abs=0.05)
+    assert s1[1, 0] == pytest.approx(0.8, abs=0.05)
+    assert s1[2, 0] < 0.02
+    assert s1[2, 1] > 0.95
@@ -43,3 +43,18 @@ Variables (input, output, parameter)
   h0                 parameter                      1.0  m        Initial height"""
 
     assert expect == info
+
+
+def test_reload_uses_model_cache(fmu_path, cache_dir, monkeypatch):
+    first = AppState()
+    info = first.load_fmu(fmu_path, return_info=True)
+    assert list(cache_dir.rglob("*.pickle"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("modelDescription.xml parsed again")
+
+    monkeypatch.setattr("fmpy.read_model_description", fail)
+
+    second = AppState()
+    assert second.load_fmu(fmu_path, return_info=True) == info
+    assert list(second.fmu_variables) == list(first.fmu_variables)
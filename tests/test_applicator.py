@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+from fmpy.model_description import read_model_description
+from fmpy.simulation import apply_start_values, settable_in_instantiated
+
+from app.study.applicator import SampleApplicator
+from app.study.doe import MonteCarloDesign, ParameterRange
+
+
+class _RecordingFmu:
+    """Stands in for an FMU instance, remembers every set call."""
+
+    def __init__(self):
+        self.calls = []
+        self.values = {}
+
+    def __getattr__(self, name):
+        if not name.startswith("set") or name == "setupExperiment":
+            return lambda *args, **kwargs: self.calls.append(name)
+
+        def setter(vrs, values):
+            self.calls.append(name)
+            self.values.update(((name, vr), v) for vr, v in zip(vrs, values))
+
+        return setter
+
+
+MODEL = """<?xml version="1.0" encoding="UTF-8"?>
+<fmiModelDescription fmiVersion="2.0" modelName="Batches" guid="{0}">
+  <CoSimulation modelIdentifier="Batches"/>
+  <TypeDefinitions>
+    <SimpleType name="Modes"><Enumeration>
+      <Item name="a" value="1"/><Item name="b" value="2"/><Item name="c" value="3"/>
+    </Enumeration></SimpleType>
+  </TypeDefinitions>
+  <ModelVariables>
+    <ScalarVariable name="mass" valueReference="1" causality="parameter"
+        variability="fixed" initial="exact"><Real start="1"/></ScalarVariable>
+    <ScalarVariable name="stiffness" valueReference="2" causality="parameter"
+        variability="fixed" initial="exact"><Real start="1"/></ScalarVariable>
+    <ScalarVariable name="gain" valueReference="3" causality="parameter"
+        variability="fixed" initial="exact"><Real start="1"/></ScalarVariable>
+    <ScalarVariable name="order" valueReference="1" causality="parameter"
+        variability="fixed" initial="exact"><Integer start="1"/></ScalarVariable>
+    <ScalarVariable name="mode" valueReference="2" causality="parameter"
+        variability="fixed" initial="exact">
+      <Enumeration declaredType="Modes" start="1"/>
+    </ScalarVariable>
+    <ScalarVariable name="enabled" valueReference="1" causality="parameter"
+        variability="fixed" initial="exact"><Boolean start="false"/></ScalarVariable>
+    <ScalarVariable name="label" valueReference="1" causality="parameter"
+        variability="fixed" initial="exact"><String start="x"/></ScalarVariable>
+    <ScalarVariable name="tuned" valueReference="4" causality="local"
+        variability="continuous" initial="calculated"><Real/></ScalarVariable>
+  </ModelVariables>
+  <ModelStructure/>
+</fmiModelDescription>
+"""
+
+
+@pytest.fixture
+def model_description(tmp_path):
+    path = tmp_path / "modelDescription.xml"
+    path.write_text(MODEL)
+    return read_model_description(str(path), validate=False)
+
+
+def test_matches_fmpy(model_description):
+    ranges = [ParameterRange(n, 1.0, 5.0) for n in ("mass", "order", "stiffness")]
+    fixed = {"gain": "2.5", "mode": 3, "enabled": "true", "label": "abc", "tuned": 1.0}
+    design = MonteCarloDesign(ranges, n_samples=5, seed=2, fixed=fixed)
+    applicator = SampleApplicator(design, model_description)
+    # Real, Integer (with the enumeration), Boolean and String
+    assert applicator.n_calls == 4
+
+    for index in range(len(design)):
+        fmu, reference = _RecordingFmu(), _RecordingFmu()
+        rest = applicator.apply(fmu, index)
+        expected_rest = apply_start_values(
+            reference,
+            model_description,
+            design.start_values(index),
+            settable=settable_in_instantiated,
+        )
+        assert fmu.values == reference.values
+        assert rest == expected_rest == {"tuned": 1.0}
+        assert sorted(fmu.calls) == sorted(set(fmu.calls))
+
+    assert fmu.values[("setInteger", 1)] == int(design.point(4)[1])
+    assert fmu.values[("setBoolean", 1)] is True
+
+
+def test_unknown_names_are_left_to_fmpy(model_description):
+    ranges = [ParameterRange("mass", 1.0, 2.0), ParameterRange("nope", 0.0, 1.0)]
+    design = MonteCarloDesign(ranges, n_samples=3, fixed={"enabled": "maybe"})
+    applicator = SampleApplicator(design, model_description)
+
+    fmu = _RecordingFmu()
+    rest = applicator.apply(fmu, 1)
+    assert fmu.calls == ["setReal"]
+    assert fmu.values[("setReal", 1)] == design.point(1)[0]
+    assert rest == {"enabled": "maybe", "nope": design.point(1)[1]}
+    # fmpy raises its own error for these when the sample runs
+    with pytest.raises(Exception, match="could not be converted"):
+        apply_start_values(_RecordingFmu(), model_description, rest)
+
+
+def test_initialize(model_description):
+    design = MonteCarloDesign([ParameterRange("mass", 1.0, 2.0)], n_samples=2)
+    fmu = _RecordingFmu()
+    SampleApplicator(design, model_description).initialize(fmu, 0, 0.0, 1.0)
+    assert fmu.calls == [
+        "setupExperiment",
+        "setReal",
+        "enterInitializationMode",
+        "exitInitializationMode",
+    ]
+
+    design = MonteCarloDesign([ParameterRange("nope", 1.0, 2.0)], n_samples=2)
+    with pytest.raises(ValueError, match="nope"):
+        SampleApplicator(design, model_description).initialize(fmu, 0, 0.0, 1.0)
+
+
+def test_runner_uses_batched_start_values(simulation_fmu):
+    from app.schemas.experiment import Experiment
+    from app.study.runner import StudyRunner
+
+    design = MonteCarloDesign(
+        [ParameterRange("h0", 1.0, 2.0)], n_samples=3, seed=1, fixed={"e": 0.5}
+    )
+    experiment = Experiment(start_time=0.0, stop_time=0.5, output_interval=0.01)
+    runner = StudyRunner(
+        simulation_fmu, design, n_workers=1, outputs=["h"], experiment=experiment
+    )
+    results = []
+    runner.run(on_result=results.append)
+
+    for result in results:
+        assert result.ok
+        assert result.trajectory["h"][0] == pytest.approx(design.point(result.index)[0])
+    assert np.ptp([r.trajectory["h"][0] for r in results]) > 0
@@ -0,0 +1,61 @@
+import pickle
+from pathlib import Path
+
+from fmpy import read_model_description
+
+from app.schemas.catalog import VariableCatalog
+from app.schemas.fmu import FmuInput, FmuOutput, FmuParameter
+from app.state import AppState
+
+RESOURCES = Path(__file__).parent.resolve() / "resources"
+
+
+def test_catalog_matches_model_description():
+    md = read_model_description(str(RESOURCES / "QuarterCar.fmu"))
+    catalog = VariableCatalog.from_variables(md.modelVariables)
+
+    assert len(catalog) == len(md.modelVariables)
+    for row, v in enumerate(md.modelVariables):
+        assert catalog.row(v.name) == row
+        assert catalog.causality_of(row) == v.causality
+        assert catalog.type_of(row) == v.type
+        assert catalog.unit_of(row) == v.unit
+        assert catalog.start[row] == v.start
+        assert int(catalog.value_reference[row]) == v.valueReference
+
+    outputs = [v.name for v in md.modelVariables if v.causality == "output"]
+    assert catalog.names_of("output") == outputs
+    both = [v.name for v in md.modelVariables if v.causality in ("input", "output")]
+    assert catalog.names_of("input", "output") == both
+
+    first = md.modelVariables[catalog.find(31)]
+    assert first.valueReference == 31 and first.name == "sprungMassZ"
+    assert catalog.find(31, "Integer") is None
+
+
+def test_catalog_pickles_columns_only():
+    md = read_model_description(str(RESOURCES / "QuarterCar.fmu"))
+    catalog = VariableCatalog.from_variables(md.modelVariables)
+    catalog.row("m_s")  # builds the name index
+
+    clone = pickle.loads(pickle.dumps(catalog))
+    assert "_by_name" not in vars(clone)
+    assert clone.names == catalog.names
+    assert clone.row("m_s") == catalog.row("m_s")
+
+
+def test_variables_are_views():
+    state = AppState()
+    state.load_fmu(RESOURCES / "QuarterCar.fmu")
+
+    m_s = state.fmu_variables["m_s"]
+    assert isinstance(m_s, FmuParameter)
+    assert (m_s.unit, m_s.default_value, m_s.type) == ("kg", 290.0, "Real")
+    assert isinstance(state.fmu_variables["roadInput"], FmuInput)
+    assert isinstance(state.fmu_variables["sprungMassZ"], FmuOutput)
+    assert "road.s" not in state.fmu_variables  # locals are not exposed
+
+    # Settings stick to the view handed out earlier
+    m_s.lower = 250.0
+    assert state.fmu_variables["m_s"].lower == 250.0
+    assert not hasattr(m_s, "__dict__")
@@ -0,0 +1,54 @@
+import csv
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.cli import main
+from app.schemas.metrics_spec import MetricSpec
+from app.state import AppState
+from app.study_file import save_study
+
+SRC = Path(__file__).parent.parent / "src"
+
+
+def test_import_does_not_pull_gui_or_fmpy():
+    code = (
+        "import sys, app.cli; "
+        "print(sorted({m.split('.')[0] for m in sys.modules} & {'PySide6', 'fmpy'}))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+    )
+    assert out.stdout.strip() == "[]"
+
+
+def test_batch_run(simulation_fmu, tmp_path):
+    state = AppState()
+    state.load_fmu(simulation_fmu)
+    h0 = state.fmu_variables["h0"]
+    h0.lower, h0.upper = 1.0, 2.0
+    state.parameters["h0"] = h0
+    state.doe_settings.update(
+        method="Full Factorial", levels=3, store_trajectories=False
+    )
+    state.experiment.stop_time = 1.0
+    state.metrics.append(MetricSpec(state.fmu_variables["h"], "max"))
+    study = tmp_path / "bounce.toml"
+    save_study(state, study)
+
+    assert main([str(study), "-q", "-j", "1"]) == 0
+
+    with (tmp_path / "bounce.results" / "metrics.csv").open() as f:
+        rows = list(csv.DictReader(f))
+    assert [r["status"] for r in rows] == ["ok"] * 3
+    assert [float(r["max(h)"]) for r in rows] == [1.0, 1.5, 2.0]
+
+
+def test_missing_study(tmp_path, capsys):
+    assert main([str(tmp_path / "nope.toml"), "-q"]) == 1
+    assert "error" in capsys.readouterr().err
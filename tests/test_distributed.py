@@ -0,0 +1,119 @@
+import subprocess
+import sys
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.study.distributed import Coordinator, work
+from app.study.doe import FullFactorialDesign, ParameterRange
+from app.study.metrics import MetricPlan
+from app.study.results import ResultStore
+from app.study.runner import StudyRunner
+
+KEY = "test key"
+
+
+@pytest.fixture
+def study(simulation_fmu, tmp_path):
+    design = FullFactorialDesign([ParameterRange("h0", 1.0, 2.0)], levels=6)
+    plan = MetricPlan(
+        signals=("h", "v"),
+        statistics=("max", "min"),
+        lower=(None, None),
+        upper=(None, None),
+    )
+
+    def runner(name):
+        store = ResultStore.create(
+            tmp_path / name, [], len(design), np.array([0.0]), metrics=plan.names
+        )
+        return StudyRunner(
+            simulation_fmu, design, n_workers=1, store=store, metrics=plan
+        )
+
+    return runner
+
+
+def _workers(coordinator, n, tmp_path):
+    counts = []
+
+    def run():
+        root = tmp_path / "remote"
+        counts.append(work(coordinator.address, KEY, n_workers=1, root=root))
+
+    threads = [threading.Thread(target=run) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, counts
+
+
+def test_remote_workers_match_local(study, tmp_path):
+    local = study("local")
+    local.run()
+
+    remote = study("remote")
+    coordinator = Coordinator(("127.0.0.1", 0), KEY, batch_size=2)
+    threads, counts = _workers(coordinator, 2, tmp_path)
+    try:
+        assert remote.run(coordinator=coordinator) == 6
+    finally:
+        coordinator.close()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert sum(counts) == 6
+    assert remote.store.count("ok") == 6
+    np.testing.assert_array_equal(remote.store.metric_values, local.store.metric_values)
+
+
+def test_lost_batches_are_dispatched_again(study, tmp_path):
+    runner = study("store")
+    coordinator = Coordinator(("127.0.0.1", 0), KEY, batch_size=2, lease=1.0)
+    completed = []
+    thread = threading.Thread(
+        target=lambda: completed.append(runner.run(coordinator=coordinator))
+    )
+    thread.start()
+
+    with pytest.raises(AuthenticationError):
+        Client(coordinator.address, family="AF_INET", authkey=b"other key")
+
+    # One worker drops its connection, another stays silent past its lease
+    leased = []
+    silent = []
+    for keep in (False, True):
+        conn = Client(coordinator.address, family="AF_INET", authkey=KEY.encode())
+        conn.send(("hello", "lost", 1))
+        assert conn.recv()[0] == "setup"
+        conn.send(("request", 2))
+        kind, batch = conn.recv()
+        assert kind == "batch"
+        leased += batch
+        if keep:
+            silent.append(conn)
+        else:
+            conn.close()
+
+    assert work(coordinator.address, KEY, n_workers=1, root=tmp_path / "remote") == 6
+    thread.join(timeout=30)
+    coordinator.close()
+    silent[0].close()
+
+    assert completed == [6] and len(leased) == 4
+    assert runner.store.count("ok") == 6
+
+
+def test_app_starts_a_worker():
+    main = Path(__file__).parent.parent / "src" / "main.py"
+    out = subprocess.run(
+        [sys.executable, str(main), "worker", "--help"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.startswith("usage: main.py worker")
+    assert "HOST:PORT" in out.stdout
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from app.study.doe import (
+    Design,
+    FullFactorialDesign,
+    LatinHypercubeDesign,
+    MonteCarloDesign,
+    ParameterRange,
+    make_design,
+)
+
+RANGES = [
+    ParameterRange("e", 0.5, 0.9),
+    ParameterRange("h0", 1.0, 3.0, distribution="Normal"),
+]
+
+
+@pytest.mark.parametrize("cls", [MonteCarloDesign, LatinHypercubeDesign])
+def test_random_designs_are_seeded_and_addressable(cls):
+    design = cls(RANGES, n_samples=5000, seed=42)
+    matrix = design.matrix()
+
+    assert matrix.shape == (5000, 2)
+    np.testing.assert_array_equal(matrix, cls(RANGES, n_samples=5000, seed=42).matrix())
+    assert not np.array_equal(matrix, cls(RANGES, n_samples=5000, seed=43).matrix())
+
+    indices = np.array([4999, 0, 4096, 17])
+    np.testing.assert_array_equal(design.points(indices), matrix[indices])
+    np.testing.assert_array_equal(design.point(4097), matrix[4097])
+
+
+def test_monte_carlo_prefix_is_stable():
+    small = MonteCarloDesign(RANGES, n_samples=10, seed=1).matrix()
+    large = MonteCarloDesign(RANGES, n_samples=10_000, seed=1).matrix()
+    np.testing.assert_array_equal(small, large[:10])
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 100, 1000, 4097])
+def test_latin_hypercube_stratification(n):
+    design = LatinHypercubeDesign([ParameterRange("x", 0.0, 1.0)] * 3, n, seed=7)
+    strata = np.floor(design.matrix() * n).astype(int)
+    for j in range(3):
+        assert sorted(strata[:, j]) == list(range(n))
+
+
+def test_latin_hypercube_dimensions_independent():
+    n = 4000
+    design = LatinHypercubeDesign([ParameterRange("x", 0.0, 1.0)] * 4, n, seed=1)
+    corr = np.corrcoef(design.matrix().T)
+    assert np.abs(corr[np.triu_indices(4, 1)]).max() < 4 / np.sqrt(n)
+
+
+def test_normal_distribution():
+    design = MonteCarloDesign([RANGES[1]], n_samples=100_000, seed=0)
+    h0 = design.matrix()[:, 0]
+    assert h0.mean() == pytest.approx(2.0, abs=0.01)
+    assert h0.std() == pytest.approx(1.0 / 3.0, rel=0.02)
+
+
+def test_full_factorial_index_mapping():
+    design = FullFactorialDesign(RANGES[:1] + [ParameterRange("h0", 1.0, 3.0)], [3, 2])
+    assert len(design) == 6
+    np.testing.assert_allclose(
+        design.matrix(),
+        [[0.5, 1.0], [0.5, 3.0], [0.7, 1.0], [0.7, 3.0], [0.9, 1.0], [0.9, 3.0]],
+    )
+
+
+def test_huge_full_factorial_without_materializing():
+    ranges = [ParameterRange(f"p{i}", 0.0, 1.0) for i in range(12)]
+    design = FullFactorialDesign(ranges, levels=5)
+    assert len(design) == 5**12
+
+    last = design.point(len(design) - 1)
+    np.testing.assert_array_equal(last, np.ones(12))
+    with pytest.raises(IndexError):
+        design.point(len(design))
+
+
+def test_start_values_include_fixed():
+    design = make_design("Full Factorial", RANGES[:1], levels=2, fixed={"h0": 2.0})
+    assert design.start_values(1) == {"h0": 2.0, "e": 0.9}
+
+
+def test_chunks_cover_design():
+    design = LatinHypercubeDesign(RANGES, n_samples=1000, seed=3)
+    blocks = [points for _, points in design.chunks(size=300)]
+    np.testing.assert_array_equal(np.vstack(blocks), design.matrix())
+
+
+def test_incomplete_design_fails_on_creation():
+    class Unsized(Design):
+        def points(self, indices=None):
+            return np.empty((0, self.n_dims))
+
+    with pytest.raises(TypeError):
+        Unsized(RANGES)
@@ -0,0 +1,93 @@
+import logging
+import os
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest  # noqa: E402
+import shiboken6  # noqa: E402
+from PySide6 import QtWidgets  # noqa: E402
+
+from app.components.log_view import LogView  # noqa: E402
+from app.log_sink import LogBuffer, log_file, setup_logging  # noqa: E402
+
+
+@pytest.fixture
+def logger(tmp_path):
+    buffer = LogBuffer(capacity=100)
+    logger = setup_logging(buffer, tmp_path / "test.log")
+    yield logger, buffer
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_batches_from_threads(logger):
+    log, buffer = logger
+
+    def work(k):
+        for i in range(10):
+            log.info("thread %d line %d", k, i)
+
+    threads = [threading.Thread(target=work, args=(k,)) for k in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    lines, dropped = buffer.drain()
+    assert len(lines) == 50 and dropped == 0
+    assert buffer.drain() == ([], 0)
+
+
+def test_bounded(logger, tmp_path):
+    log, buffer = logger
+    for i in range(250):
+        log.debug("line %d", i)
+
+    lines, dropped = buffer.drain()
+    assert len(lines) == 100 and dropped == 150
+    assert lines[-1][1].endswith("line 249")
+    assert len(buffer.recent()) == 100
+
+    # The file has all of them
+    assert log_file(log) == tmp_path / "test.log"
+    assert len((tmp_path / "test.log").read_text().splitlines()) == 250
+
+
+def test_level_filter(logger):
+    log, buffer = logger
+    log.debug("detail")
+    log.warning("careful")
+    log.error("broken")
+
+    assert [s.split(" ", 1)[1] for s in buffer.recent(logging.WARNING)] == [
+        "careful",
+        "broken",
+    ]
+
+
+def test_view(logger):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    log, buffer = logger
+    view = LogView(buffer)
+    view.show()
+
+    log.debug("detail")
+    log.info("info")
+    view.flush()
+    assert view.text.toPlainText().endswith("info")
+    assert "detail" not in view.text.toPlainText()
+
+    view.level_combo.setCurrentText("Debug")
+    assert view.text.blockCount() == 2
+
+    view.hide()
+    log.info("while hidden")
+    view.flush()
+    view.show()
+    app.processEvents()
+    assert view.text.toPlainText().endswith("while hidden")
+
+    view.close()
+    shiboken6.delete(view)
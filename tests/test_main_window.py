@@ -0,0 +1,132 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtWidgets  # noqa: E402
+from PySide6.QtTest import QTest  # noqa: E402
+
+from app import study_file  # noqa: E402
+from app.main_window import MainWindow  # noqa: E402
+from app.schemas.metrics_spec import MetricSpec  # noqa: E402
+from app.state import AppState  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def window(qapp, simulation_fmu):
+    window = MainWindow(AppState())
+    window.open_fmu(simulation_fmu)
+    assert _wait(lambda: not window._loading)
+
+    h0 = window.state.fmu_variables["h0"]
+    h0.lower, h0.upper = 1.0, 2.0
+    window.state.parameters["h0"] = h0
+    window.doe_tab.n_spin.setValue(4)
+    window.doe_tab.workers_spin.setValue(1)
+
+    yield window
+    window.close()
+
+
+def _wait(condition, timeout_ms=60000):
+    for _ in range(timeout_ms // 10):
+        if condition():
+            return True
+        QTest.qWait(10)
+    return condition()
+
+
+def _run(window):
+    window.run_study()
+    assert _wait(lambda: window._study_thread is None)
+    assert window.state.results is not None
+    return window.state.results.root
+
+
+def test_unsaved_results_are_deleted(window):
+    first = _run(window)
+    assert first.exists()
+
+    # A new run replaces the results of the previous one
+    second = _run(window)
+    assert second != first and not first.exists()
+
+    window.close()
+    assert not second.exists()
+
+
+def test_open_saved_study(window, tmp_path):
+    state = window.state
+    state.metrics.append(MetricSpec(state.fmu_variables["h"], "max"))
+    window.doe_tab.early_stop_check.setChecked(True)
+    path = tmp_path / "bounce.toml"
+    study_file.save_study(state, path)
+
+    # Interrupted after two samples
+    runner = state.build_runner(state.results_root, resume=True)
+    assert runner.run([0, 2]) == 2
+    state.results = None
+
+    opened = MainWindow(AppState())
+    try:
+        opened.open_study_file(path)
+        assert _wait(lambda: not opened._loading)
+
+        assert opened.state.study_path == path
+        assert opened.state.parameters["h0"].upper == 2.0
+        assert opened.doe_tab.n_spin.value() == 4
+        assert opened.doe_tab.early_stop_check.isChecked()
+        assert opened.metrics_tab.metric_table.rowCount() == 1
+        tabs = opened._tabs
+        assert tabs.isTabEnabled(tabs.indexOf(opened.results_tab))
+        assert opened.state.results.missing().tolist() == [1, 3]
+
+        # Run Study simulates the samples still missing
+        assert _run(opened) == state.results_root
+        assert opened.state.results.count("ok") == 4
+    finally:
+        opened.close()
+    assert state.results_root.exists()
+
+
+def test_open_study_shows_metric_bounds(window, tmp_path):
+    state = window.state
+    state.metrics.append(
+        MetricSpec(state.fmu_variables["h"], "max", 0.5, 1.5, "maximize")
+    )
+    path = tmp_path / "bounded.toml"
+    study_file.save_study(state, path)
+
+    opened = MainWindow(AppState())
+    try:
+        opened.open_study_file(path)
+        assert _wait(lambda: not opened._loading)
+
+        table = opened.metrics_tab.metric_table
+        assert table.item(0, 2).text() == "0.5"
+        assert table.item(0, 3).text() == "1.5"
+        assert table.cellWidget(0, 4).currentText() == "maximize"
+        assert opened.state.metrics[0].objective == "maximize"
+        assert opened.state.metrics[0].upper == 1.5
+    finally:
+        opened.close()
+
+
+def test_surrogate_fits_in_background(window):
+    window.state.metrics.append(MetricSpec(window.state.fmu_variables["h"], "max"))
+    _run(window)
+
+    view, tabs = window.surrogate_tab, window._tabs
+    assert _wait(lambda: tabs.isTabEnabled(tabs.indexOf(view)))
+    view.fit()
+    # Reported through a signal, the GUI thread never runs the fit itself
+    assert view.model is None and not view.btn_fit.isEnabled()
+    assert _wait(lambda: view.model is not None)
+    assert view.btn_fit.isEnabled()
+    assert view.prediction_table.rowCount() == 1
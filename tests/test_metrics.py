@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from app.schemas.experiment import Experiment
+from app.schemas.metrics_spec import STATISTICS, MetricSpec
+from app.state import AppState
+from app.study.doe import FullFactorialDesign, ParameterRange
+from app.study.metrics import MetricPlan, OnlineMetrics, evaluate, evaluate_store
+from app.study.results import ResultStore
+from app.study.runner import StudyRunner
+
+
+def _plan(*signals):
+    return MetricPlan(
+        signals=tuple(s for s in signals for _ in STATISTICS),
+        statistics=STATISTICS * len(signals),
+        lower=(None,) * len(STATISTICS) * len(signals),
+        upper=(None,) * len(STATISTICS) * len(signals),
+    )
+
+
+def test_online_matches_offline():
+    rng = np.random.default_rng(0)
+    time = np.cumsum(rng.random(200))
+    data = {"a": rng.normal(size=(3, 200)), "b": rng.normal(size=(3, 200))}
+    lengths = np.array([200, 57, 1])
+    plan = _plan("a", "b")
+
+    offline = evaluate(plan, time, data, lengths)
+
+    for i, n in enumerate(lengths):
+        online = OnlineMetrics(plan)
+        for k in range(n):
+            online.update(time[k], [data[s][i, k] for s in plan.signals])
+        np.testing.assert_array_equal(online.values(), offline[i])
+
+
+def test_statistics():
+    time = np.array([0.0, 1.0, 2.0])
+    y = np.array([[1.0, 3.0, -1.0]])
+    values = dict(zip(STATISTICS, evaluate(_plan("y"), time, {"y": y})[0]))
+
+    assert values["max"] == 3.0
+    assert values["min"] == -1.0
+    assert values["final"] == -1.0
+    assert values["integral"] == pytest.approx(3.0)
+    assert values["mean"] == pytest.approx(1.5)
+    assert values["rms"] == pytest.approx(np.sqrt((0.5 * (1 + 9) + 0.5 * (9 + 1)) / 2))
+
+
+def test_metric_spec_feasibility():
+    spec = MetricSpec(signal=None, lower=0.0, upper=1.0)
+    assert spec.is_feasible(0.5)
+    assert not spec.is_feasible(1.5)
+    assert not spec.is_feasible(float("nan"))
+
+
+def test_metrics_only_run_matches_stored_trajectories(simulation_fmu, tmp_path):
+    design = FullFactorialDesign([ParameterRange("h0", 1.0, 2.0)], levels=3)
+    experiment = Experiment(start_time=0.0, stop_time=1.0, output_interval=0.01)
+    state = AppState()
+    state.load_fmu(simulation_fmu)
+    specs = [
+        MetricSpec(state.fmu_variables[name], stat)
+        for name in ("h", "v")
+        for stat in STATISTICS
+    ]
+    plan = MetricPlan.from_specs(specs)
+
+    full = ResultStore.create(
+        tmp_path / "full", ["h", "v"], 3, experiment.grid(), plan.names
+    )
+    lean = ResultStore.create(tmp_path / "lean", [], 3, experiment.grid(), plan.names)
+    for store in (full, lean):
+        StudyRunner(
+            simulation_fmu,
+            design,
+            n_workers=1,
+            experiment=experiment,
+            store=store,
+            metrics=plan,
+        ).run()
+
+    assert not np.isnan(lean.metric_values).any()
+    np.testing.assert_array_equal(lean.metric_values, full.metric_values)
+    np.testing.assert_array_equal(evaluate_store(plan, full), full.metric_values)
+
+
+def test_infeasible_is_decided_by_running_extremes():
+    plan = MetricPlan(
+        signals=("y", "y", "y"),
+        statistics=("max", "min", "mean"),
+        lower=(None, -1.0, None),
+        upper=(2.0, None, 0.0),
+    )
+    online = OnlineMetrics(plan)
+
+    online.update(0.0, [1.0] * 3)
+    # The mean bound is violated right now but could still be met later
+    assert not online.infeasible()
+    online.update(1.0, [-1.5] * 3)
+    assert online.infeasible()
+
+
+def test_early_stop(simulation_fmu, tmp_path):
+    design = FullFactorialDesign([ParameterRange("h0", 1.0, 3.0)], levels=3)
+    experiment = Experiment(start_time=0.0, stop_time=1.0, output_interval=0.01)
+    state = AppState()
+    state.load_fmu(simulation_fmu)
+    spec = MetricSpec(state.fmu_variables["v"], "min", lower=-5.0)
+    plan = MetricPlan.from_specs([spec])
+    store = ResultStore.create(tmp_path / "s", ["h"], 3, experiment.grid(), plan.names)
+
+    runner = StudyRunner(
+        simulation_fmu,
+        design,
+        n_workers=1,
+        experiment=experiment,
+        store=store,
+        metrics=plan,
+        early_stop=True,
+    )
+    runner.run()
+
+    # Falling from h0 = 1 m the ball never reaches 5 m/s before t = 1 s
+    assert store.count("ok") == 1
+    assert store.count("infeasible") == 2
+    assert np.isnan(store.cut_times[0])
+    # v = -g t crosses -5 m/s at t ≈ 0.51 s
+    assert store.cut_times[1] == pytest.approx(0.51, abs=0.011)
+    assert store.lengths[1] < len(store.time)
+    assert store.metric_values[1, 0] < -5.0
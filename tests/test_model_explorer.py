@@ -0,0 +1,214 @@
+import os
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np  # noqa: E402
+from PySide6 import QtWidgets  # noqa: E402
+from PySide6.QtCore import QModelIndex, Qt  # noqa: E402
+from PySide6.QtTest import QAbstractItemModelTester, QTest  # noqa: E402
+
+from app.components.model_explorer import ModelExplorer  # noqa: E402
+from app.components.variable_tree import FETCH_BATCH, VariableTreeModel  # noqa: E402
+from app.schemas.catalog import VariableCatalog  # noqa: E402
+from app.schemas.fmu import FmuParameter  # noqa: E402
+from app.state import AppState  # noqa: E402
+
+RESOURCES = Path(__file__).parent.resolve() / "resources"
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def explorer(qapp):
+    state = AppState()
+    state.load_fmu(RESOURCES / "QuarterCar.fmu")
+    explorer = ModelExplorer(state)
+    explorer.rebuild_tree()
+    return explorer
+
+
+def _wait(condition, timeout_ms=5000):
+    for _ in range(timeout_ms // 10):
+        if condition():
+            return True
+        QTest.qWait(10)
+    return condition()
+
+
+def _children(model, parent=QModelIndex()):
+    return {
+        model.index(r, 0, parent).data(): model.index(r, 0, parent)
+        for r in range(model.rowCount(parent))
+    }
+
+
+def test_tree_model_is_consistent(explorer):
+    # Walks the whole tree and checks every index/parent/rowCount invariant
+    QAbstractItemModelTester(
+        explorer.tree_model, QAbstractItemModelTester.FailureReportingMode.Fatal
+    )
+    explorer._filter_tree("s_")
+    assert _wait(lambda: not explorer.result_label.isHidden())
+
+
+def test_tree_groups_by_dotted_name(explorer):
+    model = explorer.tree_model
+    roots = _children(model)
+    assert list(roots) == ["Parameters", "Inputs", "Outputs"]
+    params = roots["Parameters"]
+    # Groups stay unsplit until the view asks for their children
+    assert not model._root.groups[0].built
+    groups = _children(model, params)
+    assert "m_s" in groups and "road" in groups
+    assert model._root.groups[0].built
+    assert not model._root.groups[0].groups[0].built
+
+    road = _children(model, groups["road"])
+    assert "f_crit" in road
+    assert road["f_crit"].data(Qt.ItemDataRole.UserRole) == "road.f_crit"
+    assert model.parent(road["f_crit"]) == groups["road"]
+    assert model.parent(groups["road"]) == params
+
+
+def test_selection_emits_view(explorer):
+    seen = []
+    explorer.variable_selected.connect(seen.append)
+
+    model = explorer.tree_model
+    params = _children(model)["Parameters"]
+    explorer.tree_view.setCurrentIndex(_children(model, params)["m_s"])
+
+    assert isinstance(seen[-1], FmuParameter) and seen[-1].name == "m_s"
+    assert "Unit = kg" in explorer.description.text()
+
+
+def test_filter_shows_only_matches(explorer):
+    model = explorer.tree_model
+    explorer.search_box.setText("MASSZ")
+    # Debounced, then answered from the search thread
+    assert _wait(lambda: not explorer.result_label.isHidden())
+    assert explorer.result_label.text() == "3 matches"
+
+    roots = _children(model)
+    assert list(roots) == ["Outputs"]
+    assert sorted(_children(model, roots["Outputs"])) == [
+        "der(der(unsprungMassZ))",
+        "sprungMassZ",
+        "unsprungMassZ",
+    ]
+
+    explorer.search_box.setText("")
+    assert _wait(explorer.result_label.isHidden)
+    assert list(_children(model)) == ["Parameters", "Inputs", "Outputs"]
+
+
+def test_superseded_queries_are_dropped(explorer):
+    explorer._filter_tree("m_s")
+    explorer._filter_tree("road.")
+    explorer._search.wait()
+    QTest.qWait(50)
+
+    # Only the newest query reaches the view
+    expect = sum("road." in name for name in explorer._state.fmu_variables)
+    assert explorer.result_label.text() == f"{expect} matches"
+
+
+def test_large_groups_are_fetched_in_batches(qapp):
+    n = 2 * FETCH_BATCH + 10
+    catalog = VariableCatalog(
+        names=[f"y{i}" for i in range(n)],
+        causality=np.zeros(n, dtype=np.uint8),
+        causalities=["output"],
+        type=np.zeros(n, dtype=np.uint8),
+        types=["Real"],
+        unit=np.zeros(n, dtype=np.uint8),
+        units=[None],
+        value_reference=np.arange(n, dtype=np.uint32),
+        start=[None] * n,
+        description=[None] * n,
+    )
+    model = VariableTreeModel()
+    model.set_catalog(catalog)
+    outputs = _children(model)["Outputs"]
+
+    assert model.rowCount(outputs) == FETCH_BATCH
+    while model.canFetchMore(outputs):
+        model.fetchMore(outputs)
+    assert model.rowCount(outputs) == n
+    assert model.index(n - 1, 0, outputs).data() == f"y{n - 1}"
+
+
+def test_fmu_loader_reports_catalog_then_info(qapp):
+    from app.workers import FmuLoader
+
+    loader = FmuLoader()
+    events = []
+    loader.progress.connect(lambda r, message, percent: events.append(percent))
+    loader.catalog_ready.connect(lambda r, path, fmu: events.append(fmu))
+    loader.info_ready.connect(lambda r, info: events.append(info))
+
+    request = loader.load(RESOURCES / "QuarterCar.fmu")
+    assert _wait(lambda: events and isinstance(events[-1], str))
+    percents = [e for e in events if isinstance(e, int)]
+    assert percents == sorted(percents) and percents[-1] == 90
+    fmu = events[-2]
+    assert request == 1 and fmu.model_name == "FMITest.QuarterCar"
+    assert "Model Info" in events[-1]
+
+
+def test_fmu_loader_cancel_and_failure(qapp, monkeypatch, tmp_path):
+    import threading
+
+    from app import workers
+
+    started, release = threading.Event(), threading.Event()
+    parse = workers.parse_fmu
+
+    def slow_parse(path, progress):
+        started.set()
+        release.wait(5)
+        return parse(path, progress=progress)
+
+    monkeypatch.setattr(workers, "parse_fmu", slow_parse)
+    loader = workers.FmuLoader()
+    events = []
+    for signal in (loader.progress, loader.catalog_ready, loader.info_ready):
+        signal.connect(lambda *args: events.append(args))
+    failures = []
+    loader.failed.connect(lambda r, message: failures.append(message))
+
+    loader.load(RESOURCES / "QuarterCar.fmu")
+    assert started.wait(5)
+    loader.cancel()
+    release.set()
+    assert loader.wait(5000)
+    QTest.qWait(20)
+    assert events == []
+
+    monkeypatch.setattr(workers, "parse_fmu", parse)
+    loader.load(tmp_path / "missing.fmu")
+    assert _wait(lambda: failures)
+    assert "FileNotFoundError" in failures[0]
+
+
+def test_main_window_loads_in_background(qapp):
+    from app.main_window import MainWindow
+
+    window = MainWindow(AppState())
+    window.open_fmu(RESOURCES / "QuarterCar.fmu")
+    # Nothing parsed on the GUI thread, the views fill in once it is done
+    assert window.state.fmu is None and window._loading
+    assert _wait(lambda: not window._loading)
+
+    assert window.state.fmu.model_name == "FMITest.QuarterCar"
+    assert window.model_explorer.tree_model.rowCount() > 0
+    assert window.metrics_tab.signal_list.count() > 0
+    assert any("Model Info" in line for line in window.log_buffer.recent())
+    assert window.cancel_load_button.isHidden()
+    window.close()
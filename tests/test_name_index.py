@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from app.name_index import NameIndex
+
+NAMES = [f"body{i % 97}.frame{i % 13}.x{i}" for i in range(5000)] + [
+    "der(Body1.v)",
+    "Ünits.Ärger",
+    "aaaa",
+    "aa",
+    "a",
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return NameIndex(NAMES)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "",
+        "a",
+        "X",
+        "9.",
+        "ody",
+        "x499",
+        "BODY1",
+        "frame12.x2",
+        ".x1",
+        "der(b",
+        "är",
+        "aaa",
+        "aaaa",
+        "aaaaa",
+        "y1.f",
+        "zzz",
+        "x4999",
+        "frame7.x4999",
+    ],
+)
+def test_search_matches_brute_force(index, query):
+    expect = [i for i, name in enumerate(NAMES) if query.lower() in name.lower()]
+    rows = index.search(query)
+    assert rows.dtype == np.intp
+    assert rows.tolist() == expect
+
+
+def test_empty_catalog():
+    assert NameIndex([]).search("x").tolist() == []
@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore, QtGui, QtWidgets  # noqa: E402
+from PySide6.QtTest import QTest  # noqa: E402
+
+from app.components.trajectory_plot import TrajectoryPlot  # noqa: E402
+from app.plot_lod import PlotView, decimate, rasterize, render, visible  # noqa: E402
+from app.study.results import ResultStore  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def store(tmp_path):
+    time = np.linspace(0.0, 10.0, 100_001)
+    store = ResultStore.create(tmp_path / "store", ["y"], 4, time)
+    column = store.column("y")
+    for k in range(4):
+        column[k] = np.sin(time) * (k + 1)
+        store.set_status(k, "ok")
+    column[3, 500] = 100.0  # a one-point spike
+    store.lengths[:] = len(time)
+    store.set_status(2, "failed")
+    return store
+
+
+def test_decimate_keeps_extremes(store):
+    t = np.asarray(store.time)
+    block = np.asarray(store.column("y"))
+    lo, hi = decimate(t, block, 200, 0.0, 10.0)
+
+    assert lo.shape == hi.shape == (4, 200)
+    np.testing.assert_allclose(hi.max(axis=1), block.max(axis=1))
+    np.testing.assert_allclose(lo.min(axis=1), block.min(axis=1))
+    assert hi[3, 1] == 100.0  # the one-point spike survives
+
+    # Zoomed in, columns between the points follow the line
+    w = visible(t, 1.0, 1.001)
+    assert t[w][0] <= 1.0 and t[w][-1] >= 1.001 and len(t[w]) <= 13
+    lo, hi = decimate(t[w], block[:, w], 200, 1.0, 1.001)
+    line = np.sin(1.0 + (np.arange(200) + 0.5) * 5e-6)
+    assert np.all(lo[0] <= line + 1e-8) and np.all(hi[0] >= line - 1e-8)
+    np.testing.assert_allclose(hi[0] - lo[0], 0.0, atol=2e-6)
+
+
+def test_decimate_skips_unused_tail():
+    t = np.arange(1000.0)
+    block = np.vstack([np.ones(1000), np.r_[np.zeros(600), np.full(400, np.nan)]])
+    lo, hi = decimate(t, block, 10, 0.0, 1000.0)
+    assert np.isfinite(lo[0]).all()
+    assert np.isfinite(lo[1, :6]).all() and np.isnan(lo[1, 6:]).all()
+
+
+def test_rasterize_connects_columns():
+    view = PlotView(0.0, 3.0, 0.0, 10.0)
+    lo = np.array([[1.0, 8.0, np.nan], [1.0, 1.0, 1.0]])
+    counts = rasterize(lo, lo.copy(), view, 10)
+    assert counts.shape == (10, 3)
+    # The jump from 1 to 8 is drawn as a vertical span in the second column
+    assert counts[:, 1].tolist() == [0, 0, 1, 1, 1, 1, 1, 1, 1, 2]
+    assert counts[9, 0] == 2 and counts[:, 2].tolist() == [0] * 9 + [1]
+
+
+def test_render(qapp, store):
+    size = QtCore.QSize(300, 100)
+    image = render(store, "y", PlotView(0.0, 10.0, 0.0, 1.0), size, autoscale=True)
+    assert (image.n_runs, image.n_points) == (3, 100_001)
+    assert image.view.y1 > 100.0 > -4.0 > image.view.y0
+    assert image.image.size() == size
+    assert image.image.pixelColor(150, 0).alpha() == 0
+
+    assert render(store, "y", image.view, size, cancelled=lambda: True) is None
+
+
+def test_plot_zoom(qapp, store):
+    plot = TrajectoryPlot()
+    plot.resize(600, 300)
+    images = []
+    plot.rendered.connect(images.append)
+
+    plot.set_signal(store, "y")
+    assert _wait(lambda: images)
+    assert images[-1].view == plot.view and plot.view.t1 == 10.0
+
+    # Zooming moves the view at once and renders the new range in the background
+    center = QtCore.QPointF(plot.rect().center())
+    QtWidgets.QApplication.sendEvent(
+        plot,
+        QtGui.QWheelEvent(
+            center,
+            plot.mapToGlobal(center),
+            QtCore.QPoint(),
+            QtCore.QPoint(0, 120 * 8),
+            QtCore.Qt.MouseButton.NoButton,
+            QtCore.Qt.KeyboardModifier.NoModifier,
+            QtCore.Qt.ScrollPhase.NoScrollPhase,
+            False,
+        ),
+    )
+    view = plot.view
+    assert view.t1 - view.t0 < 3.0
+    assert _wait(lambda: images[-1].view == view)
+    plot.grab()  # paints the image and axes without errors
+
+
+def _wait(condition, timeout_ms=5000):
+    for _ in range(timeout_ms // 10):
+        if condition():
+            return True
+        QTest.qWait(10)
+    return condition()
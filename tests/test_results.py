@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from app.schemas.experiment import Experiment
+from app.study.doe import FullFactorialDesign, ParameterRange
+from app.study.results import ResultStore
+from app.study.runner import StudyRunner
+
+
+def _trajectory(time, **signals):
+    dtype = [("time", np.float64)] + [(name, np.float64) for name in signals]
+    out = np.empty(len(time), dtype=dtype)
+    out["time"] = time
+    for name, values in signals.items():
+        out[name] = values
+    return out
+
+
+def test_write_and_read(tmp_path):
+    time = np.linspace(0.0, 1.0, 11)
+    store = ResultStore.create(tmp_path / "store", ["x", "der(y)"], 4, time)
+
+    store.write(2, _trajectory(time, x=time * 2, **{"der(y)": -time}))
+    store.set_status(2, "ok")
+    # Shorter and off-grid, e.g. a sample cut early
+    store.write(
+        0, _trajectory([0.0, 0.25, 0.5], x=[0.0, 1.0, 2.0], **{"der(y)": [0, 0, 0]})
+    )
+    store.set_status(0, "ok")
+    store.flush()
+
+    reader = ResultStore(tmp_path / "store")
+    assert reader.signals == ["x", "der(y)"]
+    np.testing.assert_array_equal(reader.completed(), [0, 2])
+
+    t, x = reader.trajectory("x", 2)
+    np.testing.assert_allclose(x, time * 2)
+    assert isinstance(reader.column("x"), np.memmap)
+
+    t, x = reader.trajectory("x", 0)
+    np.testing.assert_allclose(t, [0.0, 0.1, 0.2, 0.3, 0.4, 0.5])
+    np.testing.assert_allclose(x, [0.0, 0.4, 0.8, 1.2, 1.6, 2.0])
+    assert np.isnan(reader.column("x")[0, 6:]).all()
+
+    indices, block = next(reader.chunks("x", rows=8))
+    np.testing.assert_array_equal(indices, [0, 2])
+    assert block.shape == (2, 11)
+
+
+def test_runner_writes_store(simulation_fmu, tmp_path):
+    design = FullFactorialDesign([ParameterRange("h0", 1.0, 2.0)], levels=3)
+    experiment = Experiment(start_time=0.0, stop_time=1.0, output_interval=0.01)
+    store = ResultStore.create(
+        tmp_path / "store", ["h", "v"], len(design), experiment.grid()
+    )
+
+    runner = StudyRunner(
+        simulation_fmu, design, n_workers=2, experiment=experiment, store=store
+    )
+    results = []
+    runner.run(on_result=results.append)
+
+    assert all(r.ok and r.trajectory is None for r in results)
+    assert store.count("ok") == 3
+    np.testing.assert_allclose(store.column("h")[:, 0], [1.0, 1.5, 2.0])
+    assert store.lengths[0] == 101
+    assert store.column("v")[2, 1] == pytest.approx(-0.0981)
@@ -0,0 +1,95 @@
+import pytest
+
+from app.study.doe import FullFactorialDesign, ParameterRange
+from app.study.runner import StudyRunner, _SampleWorker
+from app.study.telemetry import SampleTiming
+
+
+@pytest.fixture
+def design():
+    return FullFactorialDesign([ParameterRange("h0", 1.0, 6.0)], levels=6)
+
+
+def test_run_samples(simulation_fmu, design):
+    runner = StudyRunner(simulation_fmu, design, n_workers=2, outputs=["h"])
+
+    results = {}
+    completed = runner.run(on_result=lambda r: results.update({r.index: r}))
+
+    assert completed == 6
+    assert sorted(results) == list(range(6))
+    for i, r in results.items():
+        assert r.ok, r.error
+        assert r.trajectory["h"][0] == pytest.approx(1.0 + i)
+
+
+def test_run_subset(simulation_fmu, design):
+    runner = StudyRunner(simulation_fmu, design, n_workers=1)
+
+    results = {}
+    runner.run([5, 2], on_result=lambda r: results.update({r.index: r}))
+
+    assert sorted(results) == [2, 5]
+
+
+def test_failed_sample_does_not_stop_study(simulation_fmu, design):
+    design.fixed["no_such_variable"] = 1.0
+    runner = StudyRunner(simulation_fmu, design, n_workers=1)
+
+    results = []
+    completed = runner.run(on_result=results.append)
+
+    assert completed == 6
+    assert all(r.status == "failed" for r in results)
+
+
+def test_stop(simulation_fmu):
+    design = FullFactorialDesign([ParameterRange("h0", 1.0, 2.0)], levels=1000)
+    runner = StudyRunner(simulation_fmu, design, n_workers=1)
+
+    def on_result(result):
+        runner.stop()
+
+    completed = runner.run(on_result=on_result)
+
+    assert runner.cancelled
+    assert completed < 10
+
+
+def test_sample_timings(simulation_fmu, design, tmp_path):
+    runner = StudyRunner(simulation_fmu, design, n_workers=1, outputs=["h"])
+
+    results = []
+    runner.run(on_result=results.append)
+
+    assert all(r.timing is not None for r in results)
+    # The worker instantiates once, its first sample pays for it
+    assert sum("instantiate" in r.timing.phases for r in results) == 1
+    assert all(r.timing.phases.get("simulate", 0) > 0 for r in results)
+
+    telemetry = runner.telemetry
+    assert telemetry is not None and telemetry.done == 6
+    assert telemetry.rate() > 0 and telemetry.eta() == 0
+    assert 0 < telemetry.utilization() <= 1
+
+
+def test_failed_reset_is_recovery():
+    class Broken:
+        def reset(self):
+            raise RuntimeError("reset failed")
+
+        def freeInstance(self):
+            pass
+
+    worker = _SampleWorker.__new__(_SampleWorker)
+    worker.fmu, worker._dirty = Broken(), True
+    worker._instantiate = lambda: "new instance"
+
+    timing = SampleTiming.begin()
+    worker._reset(timing)
+    timing.finish()
+
+    # Counted inside the sample, neither as a reset nor before the sample
+    assert worker.fmu == "new instance"
+    assert set(timing.phases) == {"recover"}
+    assert timing.phases["recover"] <= timing.duration
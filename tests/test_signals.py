@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.state import AppState
+from app.study import signals
+from app.study.signals import InputSignals, Recording
+
+RESOURCES = Path(__file__).parent.resolve() / "resources"
+
+
+@pytest.fixture
+def road_csv(tmp_path):
+    path = tmp_path / "road.csv"
+    path.write_text("time;road;gear\n0;0;1\n1;2;1\n1;2;2\n\n3;0;3\n")
+    return path
+
+
+def test_csv_columns_are_mapped(road_csv, cache_dir):
+    recording = Recording(road_csv)
+    assert recording.names == ["road", "gear"]
+    assert recording.time.tolist() == [0, 1, 1, 3]
+    assert isinstance(recording.column("road").base, np.memmap)
+    assert len(list((cache_dir / "signals").iterdir())) == 1
+
+    # Converted once, reopening maps the same files
+    assert Recording(road_csv).column("gear").tolist() == [1, 1, 2, 3]
+    assert len(list((cache_dir / "signals").iterdir())) == 1
+
+    with pytest.raises(ValueError, match="no column"):
+        recording.column("speed")
+
+
+def test_failed_conversion_is_reported(road_csv, cache_dir, monkeypatch):
+    def replace(src, dst):
+        raise PermissionError(dst)
+
+    monkeypatch.setattr(signals.os, "replace", replace)
+    with pytest.raises(PermissionError):
+        Recording(road_csv)
+    # Nothing half converted is left behind
+    assert not list((cache_dir / "signals").iterdir())
+
+
+def test_resample(road_csv):
+    recording = Recording(road_csv)
+    grid = np.array([-1.0, 0.5, 1.0, 2.0, 4.0])
+    np.testing.assert_allclose(recording.resample("road", grid), [0, 1, 2, 1, 0])
+    assert recording.resample("gear", grid, discrete=True).tolist() == [1, 1, 2, 2, 3]
+
+
+def test_binary_recording(tmp_path):
+    data = np.zeros(3, dtype=[("t", np.float64), ("u", np.float64)])
+    data["t"] = [0, 1, 2]
+    data["u"] = [1, 2, 3]
+    np.save(tmp_path / "rec.npy", data)
+
+    recording = Recording(tmp_path / "rec.npy")
+    assert recording.names == ["u"]
+    np.testing.assert_allclose(recording.resample("u", np.array([0.5])), [1.5])
+
+    np.save(tmp_path / "plain.npy", np.zeros((3, 2)))
+    with pytest.raises(ValueError, match="structured"):
+        Recording(tmp_path / "plain.npy")
+
+
+def test_input_signals(road_csv, tmp_path):
+    state = AppState()
+    state.load_fmu(RESOURCES / "QuarterCar.fmu")
+    road = state.fmu_variables["roadInput"]
+    grid = np.linspace(0.0, 2.0, 5)
+
+    with pytest.raises(ValueError, match="no recording"):
+        InputSignals.resample([road], grid)
+
+    road.source, road.column = str(road_csv), "road"
+    inputs = InputSignals.resample([road], grid)
+    table = inputs.load()
+    assert table.dtype.names == ("time", "roadInput")
+    np.testing.assert_allclose(table["roadInput"], [0, 1, 2, 1.5, 1])
+
+    # Content addressed: the same signals resolve to the same file
+    assert InputSignals.resample([road], grid) == inputs
+    road.column = "gear"
+    assert InputSignals.resample([road], grid).digest != inputs.digest
@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.schemas.experiment import Experiment
+from app.schemas.metrics_spec import STATISTICS
+from app.study.doe import FullFactorialDesign, ParameterRange
+from app.study.metrics import MetricPlan
+from app.study.results import ResultStore
+from app.study.runner import StudyRunner
+from app.study.sim_cache import SimulationCache
+
+EXPERIMENT = Experiment(start_time=0.0, stop_time=1.0, output_interval=0.01)
+
+
+@pytest.fixture
+def design():
+    return FullFactorialDesign([ParameterRange("h0", 1.0, 2.0)], levels=4)
+
+
+def _cache(fmu, tmp_path, **kwargs):
+    return SimulationCache.for_study(fmu, EXPERIMENT, root=tmp_path / "sims", **kwargs)
+
+
+def test_key_is_exact_and_order_free(simulation_fmu, tmp_path):
+    cache = _cache(simulation_fmu, tmp_path)
+
+    assert cache.key({"h0": 1.0, "e": 0.7}) == cache.key({"e": 0.7, "h0": 1.0})
+    assert cache.key({"h0": 1.0}) != cache.key({"h0": 1.0 + 1e-15})
+    assert cache.key({"h0": 1.0}) != cache.key({"h0": 1})
+    other = SimulationCache.for_study(
+        simulation_fmu, Experiment(stop_time=2.0), root=tmp_path / "sims"
+    )
+    assert cache.key({"h0": 1.0}) != other.key({"h0": 1.0})
+
+
+def test_rerun_only_simulates_misses(simulation_fmu, tmp_path, design):
+    plan = MetricPlan(("h", "v"), ("max", "integral"), (None, None), (None, None))
+
+    def run(name, indices=None, metrics=plan):
+        store = ResultStore.create(
+            tmp_path / name, ["h"], len(design), EXPERIMENT.grid(), metrics.names
+        )
+        runner = StudyRunner(
+            simulation_fmu,
+            design,
+            n_workers=1,
+            store=store,
+            metrics=metrics,
+            cache=_cache(simulation_fmu, tmp_path),
+        )
+        runner.run(indices)
+        return runner, store
+
+    first, partial = run("a", [0, 2])
+    assert first.cache_hits == 0
+
+    second, full = run("b")
+    assert second.cache_hits == 2
+    assert full.count("ok") == 4
+    for i in (0, 2):
+        np.testing.assert_array_equal(full.column("h")[i], partial.column("h")[i])
+        np.testing.assert_array_equal(full.metric_values[i], partial.metric_values[i])
+
+    # A different metric on the same samples is served from the cache too
+    plan2 = MetricPlan(("h",) * len(STATISTICS), STATISTICS, (None,) * 6, (None,) * 6)
+    third, again = run("c", metrics=plan2)
+    assert third.cache_hits == 4
+    assert np.isfinite(again.metric_values).all()
+
+
+def test_prune_evicts_least_recently_used(tmp_path, simulation_fmu):
+    cache = _cache(simulation_fmu, tmp_path, max_bytes=0)
+    trajectory = np.zeros(100, dtype=[("time", float), ("h", float)])
+
+    keys = [cache.key({"h0": float(i)}) for i in range(3)]
+    for k, key in enumerate(keys):
+        cache.put(key, trajectory)
+        os.utime(cache._path(key), ns=(k * 10**9, k * 10**9))
+    cache.get(keys[0], ["h"])  # touched, now the most recent
+
+    size = cache._path(keys[0]).stat().st_size
+    cache = _cache(simulation_fmu, tmp_path, max_bytes=size)
+    assert cache.prune() == 2
+    assert cache.get(keys[0], ["h"]) is not None
+    assert cache.get(keys[1], ["h"]) is None
+    assert cache.get(keys[0], ["v"]) is None  # signal not recorded
+
+
+def test_cached_samples_stop_early_too(simulation_fmu, tmp_path):
+    design = FullFactorialDesign([ParameterRange("h0", 0.2, 1.0)], levels=4)
+    # Dropped from above about 0.62 the ball hits the ground faster than 3.5 m/s
+    plan = MetricPlan(("v", "h"), ("min", "max"), (-3.5, None), (None, None))
+
+    def run(name, early_stop):
+        store = ResultStore.create(
+            tmp_path / name, ["h"], len(design), EXPERIMENT.grid(), plan.names
+        )
+        runner = StudyRunner(
+            simulation_fmu,
+            design,
+            n_workers=1,
+            store=store,
+            metrics=plan,
+            early_stop=early_stop,
+            cache=_cache(simulation_fmu, tmp_path),
+        )
+        runner.run()
+        return runner, store
+
+    _, fresh = run("fresh", early_stop=True)
+    # Complete runs of every sample, all of them end up in the cache
+    run("complete", early_stop=False)
+    again, cached = run("cached", early_stop=True)
+
+    assert again.cache_hits == 4
+    assert fresh.count("infeasible") == 2
+    np.testing.assert_array_equal(cached.status, fresh.status)
+    np.testing.assert_array_equal(cached.lengths, fresh.lengths)
+    np.testing.assert_array_equal(cached.cut_times, fresh.cut_times)
+    np.testing.assert_array_equal(cached.metric_values, fresh.metric_values)
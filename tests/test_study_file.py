@@ -0,0 +1,70 @@
+import numpy as np
+
+from app.schemas.metrics_spec import MetricSpec
+from app.state import AppState
+from app.study_file import load_study, save_study
+
+
+def test_roundtrip(simulation_fmu, tmp_path):
+    state = AppState()
+    state.load_fmu(simulation_fmu)
+    h0 = state.fmu_variables["h0"]
+    h0.lower, h0.upper, h0.distribution = 1.0, 2.0, "Normal"
+    e = state.fmu_variables["e"]
+    e.value = 0.7
+    state.parameters = {"h0": h0, "e": e}
+    state.doe_settings.update(method="Latin Hypercube", n_samples=7, seed=3)
+    state.experiment.stop_time = 2.5
+    state.metrics.append(MetricSpec(state.fmu_variables["h"], "min", lower=0.0))
+
+    path = tmp_path / "study" / "bounce.toml"
+    path.parent.mkdir()
+    save_study(state, path)
+    loaded = load_study(path)
+
+    assert loaded.fmu_path == simulation_fmu.resolve()
+    assert loaded.experiment == state.experiment
+    assert loaded.doe_settings == state.doe_settings
+    assert loaded.parameters["e"].fixed_value == 0.7
+    assert (loaded.parameters["h0"].lower, loaded.parameters["h0"].distribution) == (
+        1.0,
+        "Normal",
+    )
+    [m] = loaded.metrics
+    assert (m.signal.name, m.statistic, m.lower, m.upper) == ("h", "min", 0.0, None)
+    assert (
+        loaded.build_design().points().tolist()
+        == state.build_design().points().tolist()
+    )
+
+
+def test_resume(simulation_fmu, tmp_path):
+    state = AppState()
+    state.load_fmu(simulation_fmu)
+    h0 = state.fmu_variables["h0"]
+    h0.lower, h0.upper = 1.0, 2.0
+    state.parameters["h0"] = h0
+    state.doe_settings.update(method="Full Factorial", levels=4, use_cache=False)
+    state.experiment.stop_time = 0.5
+    state.metrics.append(MetricSpec(state.fmu_variables["h"], "max"))
+
+    path = tmp_path / "bounce.toml"
+    save_study(state, path)
+    assert state.results_root == tmp_path / "bounce.results"
+
+    # Interrupted after two samples
+    runner = state.build_runner(state.results_root, resume=True)
+    assert runner.run([0, 2]) == 2
+
+    loaded = load_study(path)
+    assert loaded.results_root == state.results_root
+    runner = loaded.build_runner(loaded.results_root, resume=True)
+    assert runner.store.missing().tolist() == [1, 3]
+    assert runner.run() == 2
+    assert runner.store.count("ok") == 4
+    np.testing.assert_allclose(runner.store.metric_values[:, 0], [1, 4 / 3, 5 / 3, 2])
+
+    # Different settings never reuse the results
+    loaded.experiment.stop_time = 0.25
+    runner = loaded.build_runner(loaded.results_root, resume=True)
+    assert len(runner.store.missing()) == 4
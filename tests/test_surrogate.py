@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from app.schemas.metrics_spec import MetricSpec
+from app.state import AppState
+from app.study.doe import LatinHypercubeDesign, ParameterRange, PointDesign
+from app.study.results import ResultStore
+from app.study.surrogate import (
+    SURROGATES,
+    Samples,
+    feasibility,
+    fit_surrogate,
+    propose,
+)
+
+RANGES = [ParameterRange("a", 0.0, 2.0), ParameterRange("b", -1.0, 1.0)]
+
+
+def f(x):
+    return np.stack([x[:, 0] ** 2 + np.sin(3 * x[:, 1]), 100 * x[:, 0] * x[:, 1]], 1)
+
+
+@pytest.fixture
+def samples():
+    x = LatinHypercubeDesign(RANGES, n_samples=40, seed=1).points()
+    return Samples(("a", "b"), ("m1", "m2"), x, f(x))
+
+
+@pytest.mark.parametrize("kind", ["RBF", "Gaussian process"])
+def test_interpolating_models(kind, samples):
+    model = fit_surrogate(kind, RANGES, samples)
+    x = LatinHypercubeDesign(RANGES, n_samples=200, seed=7).points()
+    mean, std = model.predict(x)
+
+    rmse = np.sqrt(((mean - f(x)) ** 2).mean(axis=0))
+    assert (rmse / f(x).std(axis=0) < 0.1).all()
+    assert (model.r2 > 0.95).all()
+    # Certain at the samples, less so between them
+    _, at_samples = model.predict(samples.x)
+    assert (at_samples.mean(axis=0) < 0.5 * std.mean(axis=0)).all()
+
+
+def test_polynomial_is_exact_for_quadratics(samples):
+    a, b = samples.x.T
+    quadratic = Samples(("a", "b"), ("q",), samples.x, (1 + a**2 - 3 * a * b)[:, None])
+    model = fit_surrogate("Polynomial", RANGES, quadratic)
+
+    mean, std = model.predict([[0.5, 0.5]])
+    assert mean[0, 0] == pytest.approx(1 + 0.25 - 0.75)
+    assert std[0, 0] == pytest.approx(0.0, abs=1e-6)
+    assert model.r2[0] == pytest.approx(1.0)
+
+
+def test_too_few_samples(samples):
+    few = Samples(samples.names, samples.metrics, samples.x[:2], samples.y[:2])
+    with pytest.raises(ValueError, match="at least"):
+        fit_surrogate("RBF", RANGES, few)
+    assert set(SURROGATES) == {"Polynomial", "RBF", "Gaussian process"}
+
+
+def test_proposals_follow_constraints(samples):
+    model = fit_surrogate("Gaussian process", RANGES, samples)
+
+    x = propose(model, 8, upper=[1.5, None], seed=3)
+    assert x.shape == (8, 2)
+    assert (x >= [0.0, -1.0]).all() and (x <= [2.0, 1.0]).all()
+    # Along the boundary of the feasible region
+    np.testing.assert_allclose(f(x)[:, 0], 1.5, atol=0.1)
+    # Spread out, not all in one spot
+    assert np.ptp(x[:, 0]) > 0.5
+
+    free = propose(model, 8, seed=3)
+    assert not np.allclose(f(free)[:, 0], 1.5, atol=0.1)
+
+
+def test_feasibility():
+    p = feasibility(np.array([0.0, 1.0, 2.0]), np.array([1.0, 1.0, 0.0]), None, 1.0)
+    np.testing.assert_allclose(p, [0.841345, 0.5, 0.0], atol=1e-6)
+    assert feasibility(np.array([0.0]), np.array([1.0]), -1.0, 1.0)[0] == pytest.approx(
+        0.682689, abs=1e-6
+    )
+
+
+def test_samples_from_store(tmp_path):
+    design = PointDesign(RANGES, [[0.0, 0.0], [1.0, 0.5], [2.0, 1.0]])
+    store = ResultStore.create(tmp_path / "s", [], 3, np.linspace(0, 1, 3), ["m"])
+    store.write_metrics(0, [1.0])
+    store.set_status(0, "ok")
+    store.write_metrics(2, [3.0])
+    store.set_status(2, "ok")
+    store.set_status(1, "infeasible")
+
+    samples = Samples.from_store(design, store)
+    assert samples.names == ("a", "b") and samples.metrics == ("m",)
+    np.testing.assert_array_equal(samples.x, [[0.0, 0.0], [2.0, 1.0]])
+    np.testing.assert_array_equal(samples.y, [[1.0], [3.0]])
+
+    more = samples.add(np.array([1.0, 1.0]), np.array([5.0]))
+    assert len(more) == 3 and more.matches(samples)
+    assert design.start_values(1) == {"a": 1.0, "b": 0.5}
+
+
+def test_point_runner(simulation_fmu):
+    state = AppState()
+    state.load_fmu(simulation_fmu)
+    state.parameters["h0"] = state.fmu_variables["h0"]
+    state.parameters["h0"].lower, state.parameters["h0"].upper = 1.0, 6.0
+    state.metrics = [MetricSpec(state.fmu_variables["h"], "max")]
+    state.doe_settings.update(use_cache=False, n_workers=4)
+
+    runner = state.build_point_runner(np.array([[2.0], [5.0]]))
+    assert runner.n_workers == 2
+
+    results = {}
+    runner.run(on_result=lambda r: results.update({r.index: r}))
+    assert results[0].metrics == pytest.approx([2.0])
+    assert results[1].metrics == pytest.approx([5.0])
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from app.study.telemetry import RunTelemetry, SampleTiming, format_eta
+
+
+def timing(worker, start, end, **phases):
+    return SampleTiming(worker, start, end, dict(phases))
+
+
+@pytest.fixture
+def telemetry():
+    t = RunTelemetry(total=4, n_workers=2)
+    t.started = 0.0
+    t.record(0, "ok", timing(1, 0.5, 1.5, instantiate=0.5, simulate=0.8))
+    t.record(1, "failed", timing(2, 0.0, 3.0, setup=0.2, simulate=2.8))
+    t.record(2, "cancelled", None)
+    t.finished = 4.0
+    return t
+
+
+def test_counts(telemetry):
+    assert telemetry.done == 2
+    assert telemetry.counts == {"ok": 1, "failed": 1, "cancelled": 1}
+    assert telemetry.phase_totals["simulate"] == pytest.approx(3.6)
+    # Instantiation counts towards the sample that paid for it
+    assert telemetry.busy == {1: pytest.approx(1.5), 2: pytest.approx(3.0)}
+    assert telemetry.utilization() == pytest.approx(4.5 / 8.0)
+    assert [i for i, _ in telemetry.slowest()] == [1, 0]
+
+
+def test_rate_and_eta():
+    t = RunTelemetry(total=10, n_workers=1)
+    assert t.rate() == 0 and t.eta() is None
+
+    t.started -= 2.0
+    for i in range(4):
+        t.record(i, "ok", None)
+    assert t.rate() == pytest.approx(2.0, rel=0.05)
+    assert t.eta() == pytest.approx(3.0, rel=0.05)
+    assert RunTelemetry(None, 1).eta() is None
+
+
+def test_save(telemetry, tmp_path):
+    telemetry.save(tmp_path / "t.json")
+    data = json.loads((tmp_path / "t.json").read_text())
+
+    assert data["samples"] == 2
+    assert [s["index"] for s in data["sample_timings"]] == [0, 1]
+    assert data["sample_timings"][0]["phases"]["instantiate"] == 0.5
+
+
+def test_trace(telemetry, tmp_path):
+    telemetry.save_trace(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+
+    threads = [e for e in events if e["ph"] == "M"]
+    assert sorted(e["tid"] for e in threads) == [1, 2]
+    slices = {(e["tid"], e["name"]): e for e in events if e["ph"] == "X"}
+    assert slices[(1, "instantiate")]["ts"] == pytest.approx(0.0)
+    assert slices[(1, "sample 0")]["ts"] == pytest.approx(0.5e6)
+    assert slices[(1, "sample 0")]["dur"] == pytest.approx(1e6)
+    # Phases follow each other inside the sample
+    assert slices[(2, "simulate")]["ts"] == pytest.approx(0.2e6)
+
+
+def test_format_eta():
+    assert format_eta(None) == "–"
+    assert format_eta(65.4) == "1:05"
+    assert format_eta(3725) == "1:02:05"
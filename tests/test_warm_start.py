@@ -0,0 +1,107 @@
+import logging
+
+import numpy as np
+import pytest
+
+from app.model_cache import load_model_description
+from app.schemas.experiment import Experiment
+from app.study.doe import FullFactorialDesign, MonteCarloDesign, ParameterRange
+from app.study.metrics import MetricPlan, evaluate_store
+from app.study.results import ResultStore
+from app.study.runner import StudyRunner
+from app.study.warm_start import snap_to_grid, unsupported
+
+EXPERIMENT = Experiment(start_time=0.0, stop_time=2.0, output_interval=0.01)
+
+
+@pytest.fixture
+def design():
+    # x' = -k x, x0 = 2: only the decay rate after t0 differs between samples
+    ranges = [ParameterRange("k", 0.5, 2.0)]
+    return FullFactorialDesign(ranges, levels=4, fixed={"x0": 2.0})
+
+
+def test_unsupported(state_fmu, simulation_fmu, design):
+    md = load_model_description(state_fmu)
+    assert unsupported(md, design, EXPERIMENT, 0.5) is None
+    assert "inside" in unsupported(md, design, EXPERIMENT, 2.0)
+
+    fixed = FullFactorialDesign([ParameterRange("x0", 1.0, 2.0)], levels=2)
+    assert "x0" in unsupported(md, fixed, EXPERIMENT, 0.5)
+
+    md = load_model_description(simulation_fmu)
+    h0 = FullFactorialDesign([ParameterRange("h0", 1.0, 2.0)], levels=2)
+    assert "state" in unsupported(md, h0, EXPERIMENT, 0.5)
+
+    assert snap_to_grid(EXPERIMENT, 0.5032) == pytest.approx(0.5)
+
+
+def test_samples_continue_from_snapshot(state_fmu, design):
+    runner = StudyRunner(
+        state_fmu,
+        design,
+        n_workers=1,
+        outputs=["x"],
+        experiment=EXPERIMENT,
+        warm_start=0.503,
+    )
+    results = []
+    assert runner.run(on_result=results.append) == len(design)
+    assert runner.warm_started
+
+    t, t0 = EXPERIMENT.grid(), 0.5
+    for result in results:
+        assert result.ok, result.error
+        trajectory = result.trajectory
+        np.testing.assert_allclose(trajectory["time"], t, atol=1e-12)
+        # The model default k = 1 up to t0, the sample's rate after it
+        k = design.point(result.index)[0]
+        expected = np.where(
+            t < t0, 2.0 * np.exp(-t), 2.0 * np.exp(-t0) * np.exp(-k * (t - t0))
+        )
+        np.testing.assert_allclose(trajectory["x"], expected, rtol=1e-9)
+
+
+def test_metrics_include_prefix(state_fmu, tmp_path):
+    ranges = [ParameterRange("k", 0.5, 2.0), ParameterRange("u", -1.0, 1.0)]
+    design = MonteCarloDesign(ranges, n_samples=6, seed=4)
+    plan = MetricPlan(
+        signals=("x", "x", "x"),
+        statistics=("max", "mean", "final"),
+        lower=(None,) * 3,
+        upper=(None,) * 3,
+    )
+    store = ResultStore.create(
+        tmp_path / "store", ["x"], len(design), EXPERIMENT.grid(), metrics=plan.names
+    )
+    runner = StudyRunner(
+        state_fmu,
+        design,
+        n_workers=2,
+        experiment=EXPERIMENT,
+        store=store,
+        metrics=plan,
+        warm_start=1.0,
+    )
+    runner.run()
+
+    assert runner.warm_started and store.count("ok") == len(design)
+    # Online metrics over prefix and sample match those of the stored runs
+    np.testing.assert_allclose(store.metric_values, evaluate_store(plan, store))
+    assert store.metric_values[:, 0] == pytest.approx(1.0)
+
+
+def test_falls_back_to_normal_runs(simulation_fmu, caplog):
+    design = FullFactorialDesign([ParameterRange("h0", 1.0, 2.0)], levels=3)
+    runner = StudyRunner(
+        simulation_fmu, design, n_workers=1, outputs=["h"], warm_start=0.5
+    )
+    results = []
+    with caplog.at_level(logging.WARNING, logger="fmu_insight"):
+        assert runner.run(on_result=results.append) == 3
+
+    assert not runner.warm_started
+    assert "No warm start" in caplog.text
+    for result in results:
+        assert result.ok
+        assert result.trajectory["h"][0] == pytest.approx(design.point(result.index)[0])